@@ -0,0 +1,75 @@
+"""
+Worker boot time benchmark.
+
+Runs what a gunicorn worker does before its first request (Django setup and
+URLconf load) in fresh interpreters under `python -X importtime`, and reports
+the wall time, the slowest top-level imports and which heavy dependencies
+were imported although no request needed them.
+
+Usage (from the repository root):
+    python benchmarks/import_time.py [--repeat 5] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from config.preload import HEAVY_MODULES  # noqa: E402
+
+BOOT = (
+    "import sys, django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "print(','.join(sorted(sys.modules)))"
+)
+
+
+def boot():
+    """Boot once and get (wall seconds, {top-level module: cumulative microseconds}, loaded module names)"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - started
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; only top-level ones add up to the total
+        if not name.startswith('  '):
+            imports[name.strip()] = int(cumulative)
+    return wall, imports, set(result.stdout.strip().split(','))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Boots to measure")
+    parser.add_argument('--top', type=int, default=15, help="Slowest top-level imports to list")
+    options = parser.parse_args()
+
+    runs = [boot() for _ in range(options.repeat)]
+    walls = [wall for wall, _, _ in runs]
+    _, imports, loaded = runs[-1]
+
+    print(f"boot wall time: median {statistics.median(walls):.3f}s, min {min(walls):.3f}s ({options.repeat} runs)")
+    print(f"import time: {sum(imports.values()) / 1e6:.3f}s")
+    print("\nslowest top-level imports (cumulative):")
+    for name, micros in sorted(imports.items(), key=lambda item: -item[1])[:options.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    print(f"\nheavy modules imported at boot: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Preloading of the heavy dependencies.
+
+Views and utilities import pandas, scipy, shapely, h3 and the scraper
+libraries inside the functions that use them, so worker boots and management
+commands don't pay for them. The first request that needs one pays instead.
+preload() imports them up front; gunicorn.conf.py calls it in the master
+process when PRELOAD_HEAVY_MODULES=True, and forked workers inherit the
+loaded modules (shared copy-on-write memory, no per-worker import time).
+
+This module must not import Django: it runs before Django is set up.
+"""
+
+import importlib
+import time
+
+HEAVY_MODULES = (
+    'numpy',
+    'pandas',
+    'scipy.stats',
+    'scipy.spatial',
+    'shapely',
+    'h3',
+    'geojson',
+    'aiohttp',
+    'bs4',
+    'pyarrow',
+)
+
+
+def preload(modules=HEAVY_MODULES):
+    """
+    Import modules, skipping the ones that are not installed.
+
+    Returns:
+        Dictionary {module name: import seconds} of the imported modules
+    """
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
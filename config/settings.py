@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,12 +52,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'web.middleware.HealthCheckMiddleware',  # /healthz and /readyz skip everything below
+    'web.middleware.RequestTimingMiddleware',  # outermost timed entry, so the total includes the other middleware
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware - should be as high as possible
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'web.middleware.RequestProfilingMiddleware',  # after authentication: staff-only
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -97,6 +101,79 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# Data version counters live in this cache, so every process must share it:
+# locmem is only correct for a single process (runserver, tests). Use Redis in
+# production, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CACHE_LOCATION=redis://redis:6379/1 (set in docker-compose.prod.yml).
+# Version counters are stored without a TTL and every cached result with one,
+# so Redis must evict with volatile-lru (never allkeys-lru): a counter that is
+# evicted and reseeded is safe, but an evicted counter costs a full cache miss.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'panel-back'),
+    }
+}
+
+# Statistics result cache: results are invalidated through data versions; the
+# current year also gets a short TTL, past years a long one that only lets
+# Redis (volatile-lru) evict them under memory pressure
+STATS_CACHE_CURRENT_YEAR_TIMEOUT = int(os.environ.get('STATS_CACHE_CURRENT_YEAR_TIMEOUT', 300))
+STATS_CACHE_PAST_YEAR_TIMEOUT = int(os.environ.get('STATS_CACHE_PAST_YEAR_TIMEOUT', 30 * 86400))
+
+# Read endpoint response cache: entries are invalidated through data versions,
+# the timeout only evicts entries of versions that can no longer be requested
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 86400))
+
+# Single-flight coalescing of identical expensive requests (seconds): how long
+# the cross-worker lock is held at most, how long waiters wait before computing
+# themselves and how often they poll the cache for the result
+SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.environ.get('SINGLE_FLIGHT_LOCK_TIMEOUT', 60))
+SINGLE_FLIGHT_WAIT_TIMEOUT = int(os.environ.get('SINGLE_FLIGHT_WAIT_TIMEOUT', 30))
+SINGLE_FLIGHT_POLL_INTERVAL = float(os.environ.get('SINGLE_FLIGHT_POLL_INTERVAL', 0.05))
+
+# IDW interpolation defaults: number of nearest stations per hexagon (0 = all)
+# and search radius in kilometers
+IDW_NEIGHBORS = int(os.environ.get('IDW_NEIGHBORS', 0))
+IDW_RADIUS_KM = float(os.environ.get('IDW_RADIUS_KM', 15000))
+
+# Hexagon resolution pyramid: number of coarser H3 resolutions below the area's
+# preferred resolution, target hexagon width on screen and maximum cells per request
+HEX_PYRAMID_LEVELS = int(os.environ.get('HEX_PYRAMID_LEVELS', 3))
+HEX_TARGET_PIXELS = int(os.environ.get('HEX_TARGET_PIXELS', 32))
+HEX_MAX_CELLS = int(os.environ.get('HEX_MAX_CELLS', 3000))
+
+# Hexagon frames precomputed at ingest time; ingests touching more hours than
+# HEX_FRAMES_MAX_INGEST_HOURS only drop frames (rebuild with build_hex_frames)
+HEX_FRAMES_ENABLED = os.environ.get('HEX_FRAMES_ENABLED', 'True') == 'True'
+HEX_FRAMES_MAX_INGEST_HOURS = int(os.environ.get('HEX_FRAMES_MAX_INGEST_HOURS', 72))
+# Recompute the frames of an ingest in a background thread instead of the ingesting request
+HEX_FRAMES_REFRESH_IN_BACKGROUND = os.environ.get('HEX_FRAMES_REFRESH_IN_BACKGROUND', 'True') == 'True'
+
+# Request timing: Server-Timing header and a JSON log line per request on the
+# web.requests logger (DEBUG level; REQUEST_LOG_LEVEL=DEBUG to see them all).
+# Requests slower than SLOW_REQUEST_MS (0 = never) are logged as warnings with
+# their SLOW_REQUEST_SQL_COUNT slowest SQL statements
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'True') == 'True'
+REQUEST_LOG_LEVEL = os.environ.get('REQUEST_LOG_LEVEL', 'INFO')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000))
+SLOW_REQUEST_SQL_COUNT = int(os.environ.get('SLOW_REQUEST_SQL_COUNT', 5))
+
+# Prometheus /metrics endpoint: bearer token expected from the scraper (open
+# when empty). Under gunicorn also set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# On-demand profiling of staff requests (X-Profile header or _profile query
+# parameter): where profiles are stored and the sampling profiler interval
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True') == 'True'
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 1))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -157,8 +234,19 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'EXCEPTION_HANDLER': 'web.exceptions.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'web.renderers.ORJSONRenderer' if find_spec('orjson') else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Binary renderers (selected with the Accept header) are only enabled when
+# their optional dependency is installed
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('web.renderers.MessagePackRenderer')
+if find_spec('pyarrow'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('web.renderers.ArrowIPCRenderer')
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=int(os.environ.get('JWT_TOKEN_LIFETIME_DAYS', 30))),
@@ -229,14 +317,28 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'message': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        'console_message': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
     },
     'loggers': {
+        # One JSON object per line
+        'web.requests': {
+            'handlers': ['console_message'],
+            'level': REQUEST_LOG_LEVEL,
+            'propagate': False,
+        },
         'web': {
             'handlers': ['console'],
             'level': 'DEBUG',
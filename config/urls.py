@@ -3,6 +3,7 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from config.swagger import SwaggerUIView
+from web.views import MetricsView
 
 # Swagger schema view configuration
 
@@ -10,6 +11,8 @@ from config.swagger import SwaggerUIView
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('web.urls')),
+    # Prometheus scrape endpoint (outside /api/, it is not part of the public API)
+    path('metrics', MetricsView.as_view(), name='metrics'),
     
     path('swagger/', SwaggerUIView.with_ui(cache_timeout=0), name='schema-swagger-ui'),
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', SwaggerUIView.without_ui(cache_timeout=0), name='schema-json'),
@@ -44,6 +44,12 @@ for i in range(30):
     echo "PostgreSQL is ready!"
 fi
 
+# Prometheus multiprocess mode: start every container with an empty metrics directory
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Apply database migrations
 echo "Applying database migrations..."
 python manage.py migrate
@@ -0,0 +1,45 @@
+"""
+Gunicorn settings and server hooks.
+
+Gunicorn loads ./gunicorn.conf.py automatically, so the compose commands pick
+this file up without a -c option. Command line options still take precedence.
+"""
+
+import os
+
+# Import pandas, scipy, ... once in the master instead of on first use in every worker
+PRELOAD_HEAVY_MODULES = os.environ.get('PRELOAD_HEAVY_MODULES', 'False') == 'True'
+
+# Build hex grids and prime the chart caches in every worker before it reports ready
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', 'False') == 'True'
+
+# Threaded workers: concurrent identical expensive requests reaching one worker
+# wait for a single computation (see web.utils.single_flight), and slow chart or
+# hex requests don't block the cheap ones behind them
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+
+def on_starting(server):
+    if PRELOAD_HEAVY_MODULES:
+        from config.preload import preload
+
+        timings = preload()
+        server.log.info(
+            "Preloaded %s in %.2fs", ', '.join(timings), sum(timings.values())
+        )
+
+
+def post_worker_init(worker):
+    """Start the warm-up once the worker has loaded the application (see web.utils.warmup)"""
+    if WARMUP_ON_START:
+        from web.utils.warmup import warm_up_in_background
+
+        warm_up_in_background()
+
+
+def child_exit(server, worker):
+    """Drop the Prometheus values of an exited worker (multiprocess mode)"""
+    from web.utils.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
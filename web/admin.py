@@ -6,6 +6,7 @@ from .models import Station, ParameterName, Parameter, GeographicArea
 import os
 from django.utils import timezone
 from django.contrib.admin import SimpleListFilter
+from .utils.ingest_hooks import observations_changed
 
 # Custom filters for day and month
 class DayFilter(SimpleListFilter):
@@ -48,6 +49,28 @@ class ParameterAdmin(admin.ModelAdmin):
     date_hierarchy = 'datetime'
     search_fields = ('station__name', 'station__number', 'parameter_name__name')
 
+    # Admin edits bypass the API, so update derived data here as well
+    def save_model(self, request, obj, form, change):
+        previous = None
+        if change and ('datetime' in form.changed_data or 'station' in form.changed_data):
+            previous = Parameter.objects.select_related('station').get(pk=obj.pk)
+        super().save_model(request, obj, form, change)
+        if previous:
+            observations_changed(previous.station, [previous.datetime])
+        observations_changed(obj.station, [obj.datetime])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        observations_changed(obj.station, [obj.datetime])
+
+    def delete_queryset(self, request, queryset):
+        affected = {}
+        for station_id, dt in queryset.values_list('station_id', 'datetime'):
+            affected.setdefault(station_id, set()).add(dt)
+        super().delete_queryset(request, queryset)
+        for station in Station.objects.filter(id__in=affected.keys()):
+            observations_changed(station, affected[station.id])
+
 class MapPolygonWidget(widgets.Textarea):
     """
     Custom widget that displays a Leaflet map for drawing polygons.
@@ -0,0 +1,101 @@
+import json
+import logging
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from web.utils.benchmarks import (
+    MIN_TIMED_RUNS, build_dataset, compare, default_benchmarks, environment, machine_drift, rerun_slow,
+    run_benchmarks
+)
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = "Time the API hot paths on a synthetic dataset in a test database and compare with a JSON baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stations', type=int, default=5, help="Synthetic stations")
+        parser.add_argument('--years', type=int, default=1, help="Years of hourly data per station")
+        parser.add_argument('--seed', type=int, default=0, help="Dataset seed")
+        parser.add_argument('--resolution', type=int, default=5, help="H3 resolution of the benchmark area")
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help=f"Timed runs per benchmark (timings are compared from {MIN_TIMED_RUNS} runs)"
+        )
+        parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+        parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+        parser.add_argument('--output', help="Also write the results to this JSON file")
+        parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown of the median (fraction)")
+        parser.add_argument('--keepdb', action='store_true', help="Keep and reuse the test database (and its dataset)")
+
+    def handle(self, *args, **options):
+        dataset = {key: options[key] for key in ('stations', 'years', 'seed', 'resolution')}
+        benchmarks = [b for b in default_benchmarks() if not options['filter'] or options['filter'] in b.name]
+        if not benchmarks:
+            raise CommandError("No benchmarks match the filter")
+        if options['save_baseline'] and options['repeat'] < MIN_TIMED_RUNS:
+            raise CommandError(f"A baseline needs at least {MIN_TIMED_RUNS} runs per benchmark (--repeat)")
+
+        baseline_path = Path(options['baseline'])
+        baseline = {}
+        if baseline_path.exists():
+            stored = json.loads(baseline_path.read_text())
+            if stored.get('dataset') == dataset:
+                baseline = stored['results']
+            else:
+                self.stdout.write(self.style.WARNING("Baseline was made with another dataset, not comparing"))
+        if baseline and options['repeat'] < MIN_TIMED_RUNS:
+            self.stdout.write(self.style.WARNING(
+                f"Fewer than {MIN_TIMED_RUNS} runs per benchmark, only comparing queries and statuses"
+            ))
+
+        # Request and slow request logging would dominate the timings of small requests
+        logging.disable(logging.WARNING)
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            from web.models import Station
+            if not Station.objects.exists():
+                self.stdout.write("Generating dataset...")
+                build_dataset(**dataset)
+            results = run_benchmarks(benchmarks, options['repeat'])
+            drift = machine_drift(results, baseline)
+            if not options['save_baseline']:
+                rerun = rerun_slow(benchmarks, results, baseline, options['threshold'], options['repeat'], drift)
+                if rerun:
+                    self.stdout.write(f"Ran again to confirm slower timings: {', '.join(rerun)}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+            logging.disable(logging.NOTSET)
+
+        report = {'dataset': dataset, 'environment': environment(), 'results': results}
+        rows = compare(results, baseline, options['threshold'], drift)
+        if drift > 1 + options['threshold']:
+            self.stdout.write(self.style.WARNING(
+                f"The run is {drift:.2f}x slower than the baseline overall: a busier machine or a slowdown of every path"
+            ))
+        self.stdout.write(f"{'benchmark':<26}{'status':>7}{'queries':>9}{'median ms':>11}{'baseline':>10}{'ratio':>8}")
+        for name, result, before, problems in rows:
+            base = f"{before['median_ms']:.1f}" if before else '-'
+            ratio = f"{result['median_ms'] / before['median_ms']:.2f}" if before and before['median_ms'] else '-'
+            line = f"{name:<26}{result['status']:>7}{result['queries']:>9}{result['median_ms']:>11.1f}{base:>10}{ratio:>8}"
+            self.stdout.write(self.style.ERROR(line + '  ' + '; '.join(problems)) if problems else line)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {baseline_path}"))
+            return
+
+        regressions = [name for name, _, _, problems in rows if problems]
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("No regressions"))
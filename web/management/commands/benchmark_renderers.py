@@ -0,0 +1,82 @@
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from web.renderers import ORJSONRenderer, orjson
+
+
+def chart_payload(hours):
+    """Envelope of an hourly chart response (like /api/charts/<station>)"""
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    items = [
+        {'datetime': start + timedelta(hours=hour), 'temp': round(float(value), 2)}
+        for hour, value in enumerate(rng.normal(15, 8, hours))
+    ]
+    return {
+        'status': 200,
+        'success': True,
+        'result': {'items': items, 'count': len(items), 'unit': '°C', 'period': 'year'},
+        'detail': None,
+    }
+
+
+def hexdata_payload(cells, columns=False):
+    """Envelope of a hexdata response, as rows or as NumPy columns"""
+    rng = np.random.default_rng(0)
+    hex_ids = [f"86{i:013x}" for i in range(cells)]
+    values = np.round(rng.normal(15, 8, cells), 2)
+    if columns:
+        hexagons = {'hex_ids': hex_ids, 'values': values}
+    else:
+        hexagons = {'hexagons': [{'hex_id': h, 'value': float(v)} for h, v in zip(hex_ids, values)]}
+    return {
+        'status': 200,
+        'success': True,
+        'result': {**hexagons, 'metadata': {'parameter_slug': 'temp', 'resolution': 6}},
+        'detail': None,
+    }
+
+
+def best_time(renderer, data, repeat):
+    """Best wall time of rendering data (seconds)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        renderer.render(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer with ORJSONRenderer on chart and hexdata payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (best is reported)")
+        parser.add_argument('--hours', type=int, default=8760, help="Chart items (hourly values)")
+        parser.add_argument('--cells', type=int, default=10000, help="Hexagons in the hexdata payload")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed")
+
+        payloads = {
+            'chart': chart_payload(options['hours']),
+            'hexdata rows': hexdata_payload(options['cells']),
+            # The stdlib renderer needs the NumPy array as a list
+            'hexdata columns': hexdata_payload(options['cells'], columns=True),
+        }
+
+        self.stdout.write(f"{'payload':<18}{'size KB':>10}{'json ms':>10}{'orjson ms':>11}{'speedup':>9}")
+        for name, data in payloads.items():
+            stdlib_data = data
+            if name == 'hexdata columns':
+                stdlib_data = {**data, 'result': {**data['result'], 'values': data['result']['values'].tolist()}}
+
+            size = len(ORJSONRenderer().render(data)) / 1024
+            before = best_time(JSONRenderer(), stdlib_data, options['repeat'])
+            after = best_time(ORJSONRenderer(), data, options['repeat'])
+            self.stdout.write(
+                f"{name:<18}{size:>10.0f}{before * 1000:>10.1f}{after * 1000:>11.1f}{before / after:>8.1f}x"
+            )
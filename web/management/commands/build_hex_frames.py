@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from web.models import GeographicArea, Parameter
+from web.utils.hex_frames import compute_frames, floor_hour, ONE_HOUR
+
+
+class Command(BaseCommand):
+    help = "Precompute interpolated hexagon frames for every hour with observations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First local (UTC+5) date, YYYY-MM-DD (defaults to the first observation)")
+        parser.add_argument('--end', help="Last local (UTC+5) date, YYYY-MM-DD (defaults to the last observation)")
+
+    def parse_date(self, value, name):
+        try:
+            local = datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            raise CommandError(f"Invalid {name} date: {value}")
+        # Local midnight to UTC
+        return local - timedelta(hours=5)
+
+    def handle(self, *args, **options):
+        areas = list(GeographicArea.objects.all())
+        if not areas:
+            raise CommandError("No geographic areas found")
+
+        observations = Parameter.objects.order_by('datetime').values_list('datetime', flat=True)
+        first, last = observations.first(), observations.last()
+        if first is None:
+            raise CommandError("No observations found")
+
+        start = self.parse_date(options['start'], 'start') if options['start'] else floor_hour(first)
+        end = self.parse_date(options['end'], 'end') + timedelta(days=1) - ONE_HOUR if options['end'] else last
+        if start > end:
+            raise CommandError("start must not be after end")
+
+        hour = floor_hour(start)
+        hours = frames = 0
+        while hour <= end:
+            frames += compute_frames(hour, areas)
+            hours += 1
+            hour += ONE_HOUR
+
+        self.stdout.write(self.style.SUCCESS(f"{frames} hex frames stored for {hours} hours"))
@@ -0,0 +1,54 @@
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from web.utils.synthetic_data import PARAMETER_NAMES, generate
+
+
+class Command(BaseCommand):
+    help = "Fill the database with synthetic stations and hourly parameters for load tests and benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stations', type=int, default=10, help="Number of stations")
+        parser.add_argument(
+            '--parameter',
+            action='append',
+            dest='parameters',
+            choices=list(PARAMETER_NAMES),
+            help="Parameter name slug (can be repeated, defaults to all)"
+        )
+        parser.add_argument('--years', type=int, default=1, help="Years of hourly data per station")
+        parser.add_argument('--start', default='2020-01-01', help="First UTC date, YYYY-MM-DD")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (same seed, same data)")
+        parser.add_argument('--gap-rate', type=float, default=0.02, help="Expected fraction of missing hours")
+        parser.add_argument('--first-number', type=int, default=90001, help="Number of the first station")
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d')
+        except ValueError:
+            raise CommandError(f"Invalid start date: {options['start']}")
+        if options['stations'] < 1 or options['years'] < 1:
+            raise CommandError("stations and years must be positive")
+
+        def progress(station, rows):
+            self.stdout.write(f"Station {station.number}: {rows} parameters")
+
+        started = time.perf_counter()
+        try:
+            total = generate(
+                stations=options['stations'],
+                slugs=options['parameters'],
+                years=options['years'],
+                start=start,
+                seed=options['seed'],
+                gap_rate=options['gap_rate'],
+                first_number=options['first_number'],
+                progress=progress
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} parameters created in {elapsed:.1f}s; run build_hex_frames to precompute map frames"
+        ))
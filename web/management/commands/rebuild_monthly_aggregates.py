@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from web.models import Station
+from web.utils.aggregates import rebuild_monthly_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute monthly aggregates from raw parameters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--station',
+            type=int,
+            action='append',
+            dest='stations',
+            help="Station number (can be repeated, defaults to all stations)"
+        )
+
+    def handle(self, *args, **options):
+        stations = Station.objects.all()
+        if options['stations']:
+            stations = stations.filter(number__in=options['stations'])
+            if not stations.exists():
+                raise CommandError("No matching stations found")
+
+        for station in stations:
+            months = rebuild_monthly_aggregates(station)
+            self.stdout.write(f"Station {station.number}: {months} months aggregated")
+
+        self.stdout.write(self.style.SUCCESS("Monthly aggregates rebuilt"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from web.utils.warmup import WARMUP_STEPS, warm_up
+
+
+class Command(BaseCommand):
+    help = "Build the hex grids and prime the response cache with the current charts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--step',
+            action='append',
+            dest='steps',
+            choices=[name for name, _ in WARMUP_STEPS],
+            help="Warm-up step to run (can be repeated, defaults to all steps)"
+        )
+
+    def handle(self, *args, **options):
+        steps = [(name, step) for name, step in WARMUP_STEPS if not options['steps'] or name in options['steps']]
+        results = warm_up(steps)
+
+        for name, result in results.items():
+            if 'error' in result:
+                self.stderr.write(f"{name}: failed after {result['seconds']}s: {result['error']}")
+            else:
+                self.stdout.write(f"{name}: {result['items']} items in {result['seconds']}s")
+
+        if any('error' in result for result in results.values()):
+            raise CommandError("Warm-up finished with errors")
+        self.stdout.write(self.style.SUCCESS("Warm-up finished"))
@@ -1,9 +1,232 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .utils import health, profiling, request_metrics
+from .utils.metrics import observe_request
+from .utils.request_metrics import RequestMetrics
+from .utils.response_cache import CACHE_HEADER
+
 """
-JWT Authentication Middleware
+Project middleware.
 
 Note: The JWTCookieMiddleware class has been removed as the application
 now uses token-based authentication instead of cookie-based authentication.
+Authentication is handled by the CustomJWTAuthentication class, which looks
+for JWT tokens in the Authorization header.
+"""
+
+logger = logging.getLogger('web.requests')
+
+
+class HealthCheckMiddleware:
+    """
+    Answer /healthz (liveness) and /readyz (readiness) directly.
+
+    Must be the first entry of MIDDLEWARE: probes then skip sessions,
+    authentication, CSRF, host validation and the request timing, and
+    /healthz does no I/O at all. /readyz answers 503 until the checks in
+    web.utils.health pass.
+    """
+
+    HEALTHZ_PATH = '/healthz'
+    READYZ_PATH = '/readyz'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == self.HEALTHZ_PATH:
+            return JsonResponse({'status': health.OK})
+        if request.path == self.READYZ_PATH:
+            ready, checks = health.readiness()
+            return JsonResponse(
+                {'status': health.OK if ready else 'unavailable', 'checks': checks},
+                status=200 if ready else 503
+            )
+        return self.get_response(request)
+
+
+class RequestTimingMiddleware:
+    """
+    Measure every request and report the measurements.
+
+    Total time, database time and query count, render (serialization) time
+    and result cache hits/misses are sent in a Server-Timing header, which
+    browsers show in the network panel, and logged as one JSON object on the
+    web.requests logger, and recorded in the Prometheus request histograms.
+    Requests slower than SLOW_REQUEST_MS are logged as
+    warnings together with their slowest SQL statements.
+
+    Must come right after HealthCheckMiddleware so the total covers the
+    other middleware too. Disabled with REQUEST_TIMING_ENABLED=False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(settings.SLOW_REQUEST_SQL_COUNT)
+        token = request_metrics.activate(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            request_metrics.deactivate(token)
+
+        total_seconds = metrics.elapsed()
+        match = request.resolver_match
+        observe_request(
+            request.method, match.view_name if match else None, response.status_code,
+            total_seconds, metrics.db_seconds, metrics.queries
+        )
+        response['Server-Timing'] = self.server_timing(metrics, total_seconds, response)
+        self.log(request, response, metrics, total_seconds)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the render of template and DRF responses, which Django runs right after this hook"""
+        metrics = request_metrics.current()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_seconds += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def server_timing(metrics, total_seconds, response):
+        """Build the Server-Timing header value"""
+        entries = [
+            f"total;dur={total_seconds * 1000:.1f}",
+            f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+            f"render;dur={metrics.render_seconds * 1000:.1f}",
+        ]
+        if metrics.cache_hits or metrics.cache_misses:
+            entries.append(f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"')
+        if response.has_header(CACHE_HEADER):
+            entries.append(f'response-cache;desc="{response[CACHE_HEADER]}"')
+        return ', '.join(entries)
+
+    @staticmethod
+    def log(request, response, metrics, total_seconds):
+        total_ms = total_seconds * 1000
+        slow = 0 < settings.SLOW_REQUEST_MS <= total_ms
+        level = logging.WARNING if slow else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+
+        match = request.resolver_match
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'event': 'slow_request' if slow else 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(metrics.db_seconds * 1000, 2),
+            'queries': metrics.queries,
+            'render_ms': round(metrics.render_seconds * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'response_cache': response.get(CACHE_HEADER),
+        }
+        if slow:
+            record['slowest_sql'] = [{'ms': ms, 'sql': sql} for ms, sql in metrics.slowest_queries()]
+        logger.log(level, json.dumps(record, ensure_ascii=False, default=str))
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile single requests on demand.
+
+    A staff user (session or JWT) enables profiling with the X-Profile header
+    or the _profile query parameter, set to a profiler from
+    profiling.PROFILERS ('1' means cprofile). The profile and the request's
+    SQL are stored (see web.utils.profiling) and the response gets an
+    X-Profile-Id header; staff download the files from /api/profiles/<id>.
+    Flags of other users are ignored. Profiled requests bypass the response
+    and statistics caches.
+
+    Unflagged requests only pay for a header and query string lookup;
+    PROFILING_ENABLED=False removes the middleware entirely. Placed after
+    AuthenticationMiddleware so session users are known.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        flag = request.META.get('HTTP_X_PROFILE')
+        if flag is None and profiling.PROFILE_PARAM in request.META.get('QUERY_STRING', ''):
+            flag = request.GET.get(profiling.PROFILE_PARAM)
+        if not flag:
+            return self.get_response(request)
+
+        kind = 'cprofile' if flag == '1' else flag
+        user = self.staff_user(request) if kind in profiling.PROFILERS else None
+        if user is None:
+            return self.get_response(request)
+        return self.profile(request, kind, user)
+
+    @staticmethod
+    def staff_user(request):
+        """Get the staff user of the request (session or JWT) or None"""
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                authenticated = JWTAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return None
+            user = authenticated[0] if authenticated else None
+        return user if user is not None and user.is_staff else None
+
+    def profile(self, request, kind, user):
+        profile_id = profiling.new_profile_id()
+        profiling.mark_profiled(request)
+        profiler = profiling.create_profiler(kind)
+        queries = profiling.QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        total_ms = (time.perf_counter() - started) * 1000
+
+        profiling.save_profile(profile_id, kind, profiler, {
+            'id': profile_id,
+            'profiler': kind,
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'user': user.username,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(sum(query['ms'] for query in queries.queries), 2),
+            'queries_count': len(queries.queries),
+            'queries': queries.queries,
+        })
+        logger.info(json.dumps({'event': 'profile', 'id': profile_id, 'path': request.path, 'profiler': kind}))
+        response['X-Profile-Id'] = profile_id
+        return response
 
-Authentication is now handled by the CustomJWTAuthentication class,
-which looks for JWT tokens in the Authorization header.
-""" 
\ No newline at end of file
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:27
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Aggregates are keyed by local (UTC+5) months (web.utils.data_version.LOCAL_OFFSET)
+LOCAL_OFFSET = timedelta(hours=5)
+
+# Values left out of the aggregates (web.utils.aggregates.SENTINEL_VALUES)
+SENTINEL_VALUES = {
+    'rainfall': -1,
+    'wind_direction': -1,
+}
+
+
+def populate_monthly_aggregates(apps, schema_editor):
+    Station = apps.get_model('web', 'Station')
+    ParameterName = apps.get_model('web', 'ParameterName')
+    Parameter = apps.get_model('web', 'Parameter')
+    MonthlyAggregate = apps.get_model('web', 'MonthlyAggregate')
+
+    sentinels = {
+        parameter_name.id: SENTINEL_VALUES[parameter_name.slug]
+        for parameter_name in ParameterName.objects.filter(slug__in=SENTINEL_VALUES)
+    }
+
+    # One station at a time: {(parameter_name_id, year, month): [count, total, minimum, maximum]}
+    for station_id in Station.objects.values_list('id', flat=True):
+        months = {}
+        rows = Parameter.objects.filter(station_id=station_id).order_by().values_list('parameter_name_id', 'datetime', 'value')
+        for parameter_name_id, dt, value in rows.iterator(chunk_size=10000):
+            if sentinels.get(parameter_name_id) == value:
+                continue
+            local = dt + LOCAL_OFFSET
+            aggregate = months.get((parameter_name_id, local.year, local.month))
+            if aggregate is None:
+                months[(parameter_name_id, local.year, local.month)] = [1, value, value, value]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += value
+                aggregate[2] = min(aggregate[2], value)
+                aggregate[3] = max(aggregate[3], value)
+
+        MonthlyAggregate.objects.bulk_create(
+            [
+                MonthlyAggregate(
+                    station_id=station_id,
+                    parameter_name_id=parameter_name_id,
+                    year=year,
+                    month=month,
+                    count=count,
+                    total=total,
+                    minimum=minimum,
+                    maximum=maximum
+                )
+                for (parameter_name_id, year, month), (count, total, minimum, maximum) in months.items()
+            ],
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0007_rename_parametertype_parametername_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('minimum', models.FloatField(blank=True, null=True)),
+                ('maximum', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('parameter_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_aggregates', to='web.parametername')),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_aggregates', to='web.station')),
+            ],
+            options={
+                'ordering': ['year', 'month'],
+                'indexes': [models.Index(fields=['parameter_name', 'station', 'year', 'month'], name='web_monthly_paramet_ded1b8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('station', 'parameter_name', 'year', 'month'), name='unique_monthly_aggregate')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:30
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+
+# Aggregates are keyed by local (UTC+5) months (web.utils.data_version.LOCAL_OFFSET)
+LOCAL_OFFSET = timedelta(hours=5)
+
+# Values left out of the aggregates (web.utils.aggregates.SENTINEL_VALUES)
+SENTINEL_VALUES = {
+    'rainfall': -1,
+    'wind_direction': -1,
+}
+
+
+def populate_sketches(apps, schema_editor):
+    from web.utils.quantile_sketch import TDigest
+
+    ParameterName = apps.get_model('web', 'ParameterName')
+    Parameter = apps.get_model('web', 'Parameter')
+    MonthlyAggregate = apps.get_model('web', 'MonthlyAggregate')
+
+    sentinels = {
+        parameter_name.id: SENTINEL_VALUES[parameter_name.slug]
+        for parameter_name in ParameterName.objects.filter(slug__in=SENTINEL_VALUES)
+    }
+
+    station_ids = MonthlyAggregate.objects.order_by().values_list('station_id', flat=True).distinct()
+    for station_id in list(station_ids):
+        values = defaultdict(list)
+        rows = Parameter.objects.filter(station_id=station_id).order_by().values_list('parameter_name_id', 'datetime', 'value')
+        for parameter_name_id, dt, value in rows.iterator(chunk_size=10000):
+            if sentinels.get(parameter_name_id) == value:
+                continue
+            local = dt + LOCAL_OFFSET
+            values[(parameter_name_id, local.year, local.month)].append(value)
+
+        aggregates = list(MonthlyAggregate.objects.filter(station_id=station_id, sketch__isnull=True))
+        for aggregate in aggregates:
+            month_values = values.get((aggregate.parameter_name_id, aggregate.year, aggregate.month))
+            if month_values:
+                aggregate.sketch = TDigest.from_values(month_values).to_bytes()
+        MonthlyAggregate.objects.bulk_update(aggregates, ['sketch'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0008_monthlyaggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyaggregate',
+            name='sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_sketches, migrations.RunPython.noop),
+    ]
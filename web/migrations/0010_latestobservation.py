@@ -0,0 +1,64 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def populate_latest_observations(apps, schema_editor):
+    Parameter = apps.get_model('web', 'Parameter')
+    LatestObservation = apps.get_model('web', 'LatestObservation')
+
+    latest = Parameter.objects.order_by().values('station_id', 'parameter_name_id').annotate(latest=Max('datetime'))
+    observations = {}
+    for row in latest:
+        parameter = Parameter.objects.filter(
+            station_id=row['station_id'],
+            parameter_name_id=row['parameter_name_id'],
+            datetime=row['latest']
+        ).order_by('-id').first()
+        observations[(row['station_id'], row['parameter_name_id'])] = LatestObservation(
+            station_id=row['station_id'],
+            parameter_name_id=row['parameter_name_id'],
+            datetime=parameter.datetime,
+            value=parameter.value
+        )
+    LatestObservation.objects.bulk_create(observations.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0009_monthlyaggregate_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestObservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime', models.DateTimeField()),
+                ('value', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='parameter',
+            index=models.Index(fields=['station', 'parameter_name', 'datetime'], name='web_paramet_station_75e4c0_idx'),
+        ),
+        migrations.AddField(
+            model_name='latestobservation',
+            name='parameter_name',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_observations', to='web.parametername'),
+        ),
+        migrations.AddField(
+            model_name='latestobservation',
+            name='station',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_observations', to='web.station'),
+        ),
+        migrations.AddConstraint(
+            model_name='latestobservation',
+            constraint=models.UniqueConstraint(fields=('station', 'parameter_name'), name='unique_latest_observation'),
+        ),
+        migrations.RunPython(populate_latest_observations, migrations.RunPython.noop),
+    ]
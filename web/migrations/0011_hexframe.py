@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0010_latestobservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HexFrame',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('values', models.BinaryField()),
+                ('stations_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hex_frames', to='web.geographicarea')),
+                ('parameter_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hex_frames', to='web.parametername')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='web_hexfram_hour_93d7d1_idx')],
+                'constraints': [models.UniqueConstraint(fields=('area', 'resolution', 'parameter_name', 'hour'), name='unique_hex_frame')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0011_hexframe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hexframe',
+            name='idw_neighbors',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='hexframe',
+            name='idw_radius_km',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
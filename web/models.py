@@ -43,6 +43,66 @@ class Parameter(models.Model):
 
     class Meta:
         ordering = ['-datetime']
+        indexes = [
+            models.Index(fields=['station', 'parameter_name', 'datetime']),
+        ]
+
+class LatestObservation(models.Model):
+    """
+    Latest parameter value of each station, upserted at ingest time.
+    """
+    station = models.ForeignKey('Station', on_delete=models.CASCADE, related_name='latest_observations')
+    parameter_name = models.ForeignKey('ParameterName', on_delete=models.CASCADE, related_name='latest_observations')
+    datetime = models.DateTimeField()
+    value = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.station_id} - {self.parameter_name_id} - {self.datetime}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'parameter_name'],
+                name='unique_latest_observation'
+            )
+        ]
+
+class MonthlyAggregate(models.Model):
+    """
+    Monthly aggregate of a station's parameter values, keyed by local (UTC+5) year and month.
+    Maintained at ingest time so that multi-year analyses do not scan raw parameters.
+    """
+    station = models.ForeignKey('Station', on_delete=models.CASCADE, related_name='monthly_aggregates')
+    parameter_name = models.ForeignKey('ParameterName', on_delete=models.CASCADE, related_name='monthly_aggregates')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0)
+    minimum = models.FloatField(null=True, blank=True)
+    maximum = models.FloatField(null=True, blank=True)
+    # Serialized t-digest of the month's values (see web.utils.quantile_sketch)
+    sketch = models.BinaryField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.station_id} - {self.parameter_name_id} - {self.year}-{self.month:02d}"
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    class Meta:
+        ordering = ['year', 'month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'parameter_name', 'year', 'month'],
+                name='unique_monthly_aggregate'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['parameter_name', 'station', 'year', 'month']),
+        ]
 
 class GeographicArea(models.Model):
     """
@@ -95,3 +155,35 @@ class GeographicArea(models.Model):
     class Meta:
         verbose_name = "Geographic Area"
         verbose_name_plural = "Geographic Areas"
+
+class HexFrame(models.Model):
+    """
+    Interpolated values of an area's hexagons for one parameter name and hour.
+    Computed at ingest time so that /api/hexdata for a past hour is a read (see web.utils.hex_frames).
+    """
+    area = models.ForeignKey('GeographicArea', on_delete=models.CASCADE, related_name='hex_frames')
+    resolution = models.PositiveSmallIntegerField()
+    parameter_name = models.ForeignKey('ParameterName', on_delete=models.CASCADE, related_name='hex_frames')
+    # UTC hour the frame was interpolated at
+    hour = models.DateTimeField()
+    # float32 values aligned with the hex_ids of the area's HexIndex at resolution
+    values = models.BinaryField()
+    stations_count = models.PositiveIntegerField(default=0)
+    # IDW settings the frame was interpolated with (frames of other settings are not served)
+    idw_radius_km = models.FloatField(null=True, blank=True)
+    idw_neighbors = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.area_id} - {self.resolution} - {self.parameter_name_id} - {self.hour}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['area', 'resolution', 'parameter_name', 'hour'],
+                name='unique_hex_frame'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
@@ -0,0 +1,163 @@
+import datetime
+import json
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from web.utils.response_utils import json_default, to_builtin
+
+# Optional dependencies: the renderers are only registered in settings when these are installed.
+# pyarrow is slow to import and only imported by ArrowIPCRenderer when it renders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+"""
+Response renderers.
+
+ORJSONRenderer is the default JSON renderer: orjson serializes floats,
+datetimes, dicts and NumPy arrays natively, and everything else goes through
+json_default (pandas objects, Decimal, lazy strings, ...).
+
+Binary renderers for bulk endpoints are selected with the Accept header
+(or ?format=msgpack / ?format=arrow). Both keep the custom_response envelope:
+- MessagePack encodes the whole {status, success, result, detail} object.
+- Arrow IPC sends the tabular part of the result (result['items'],
+  result['hexagons'], or parallel columns such as hex_ids/values) as a record
+  batch stream. status, success, detail and the rest of the result are stored
+  as JSON in the schema metadata.
+"""
+
+# Keys of the result that hold a list of records
+TABLE_KEYS = ('items', 'hexagons')
+
+
+def _json(value):
+    return json.dumps(value, default=json_default, ensure_ascii=False).encode('utf-8')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Output matches JSONRenderer except that NaN/Infinity become null instead of failing.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=json_default, option=option)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render the response envelope as MessagePack"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=json_default, use_bin_type=True)
+
+
+def _split_result(result):
+    """
+    Split a result into table columns and the remaining (non-tabular) result.
+
+    Returns:
+        Tuple (dict of column name -> values, remaining result)
+    """
+    result = to_builtin(result)
+    if isinstance(result, list):
+        return _records_to_columns(result), None
+    if not isinstance(result, dict):
+        return {}, result
+
+    result = {key: to_builtin(value) for key, value in result.items()}
+    for key in TABLE_KEYS:
+        if isinstance(result.get(key), list):
+            rest = {k: v for k, v in result.items() if k != key}
+            return _records_to_columns(result[key]), rest
+
+    # Columnar results: parallel lists of scalars with the same length
+    lists = {k: v for k, v in result.items() if isinstance(v, list) and not any(isinstance(x, (dict, list)) for x in v)}
+    if lists and len({len(v) for v in lists.values()}) == 1:
+        rest = {k: v for k, v in result.items() if k not in lists}
+        return lists, rest
+
+    return {}, result
+
+
+def _records_to_columns(records):
+    """Turn a list of dicts into {key: [values]}, keeping key order of first appearance"""
+    columns = {}
+    for record in records:
+        if isinstance(record, dict):
+            for key in record:
+                columns.setdefault(key, None)
+    return {key: [record.get(key) if isinstance(record, dict) else None for record in records] for key in columns}
+
+
+def _arrow_array(values):
+    """
+    Build an Arrow array with compact types.
+
+    Numbers become float32 (int64 if all are integers), datetimes become
+    millisecond timestamps (int64), other objects are encoded as JSON strings.
+    """
+    import pyarrow as pa
+
+    values = [to_builtin(v) for v in values]
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return pa.array(values, type=pa.bool_())
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return pa.array(values, type=pa.int64())
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return pa.array(values, type=pa.float32())
+    if present and all(isinstance(v, datetime.datetime) for v in present):
+        return pa.array(values, type=pa.timestamp('ms'))
+    if present and all(isinstance(v, datetime.date) for v in present):
+        return pa.array(values, type=pa.date32())
+    if all(isinstance(v, str) for v in present):
+        return pa.array(values, type=pa.string())
+    return pa.array([None if v is None else _json(v).decode('utf-8') for v in values], type=pa.string())
+
+
+class ArrowIPCRenderer(BaseRenderer):
+    """Render the tabular part of the response as an Arrow IPC stream"""
+
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        import pyarrow as pa
+
+        columns, rest = _split_result(data.get('result'))
+        table = pa.table({str(name): _arrow_array(values) for name, values in columns.items()})
+        table = table.replace_schema_metadata({
+            'status': _json(data.get('status')),
+            'success': _json(data.get('success')),
+            'detail': _json(data.get('detail')),
+            'result': _json(rest),
+        })
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
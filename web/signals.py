@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+from .models import Station, ParameterName, GeographicArea
+from .utils.data_version import bump_meta_version
+from .utils.hex_frames import drop_station_frames
+from .utils.registry import REGISTRIES
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=ParameterName)
+@receiver(post_delete, sender=ParameterName)
+@receiver(post_save, sender=GeographicArea)
+@receiver(post_delete, sender=GeographicArea)
+def invalidate_metadata(sender, **kwargs):
+    """Station, parameter name or area changes invalidate every cached result that embeds them"""
+    bump_meta_version()
+    if sender in REGISTRIES:
+        REGISTRIES[sender].changed()
+
+
+@receiver(pre_save, sender=Station)
+def drop_frames_of_moved_station(sender, instance, raw=False, **kwargs):
+    """Frames interpolated with the old position of a station are stale"""
+    if raw or instance.pk is None:
+        return
+    position = Station.objects.filter(pk=instance.pk).values_list('lat', 'lon').first()
+    if position is not None and position != (instance.lat, instance.lon):
+        drop_station_frames(instance)
+
+
+@receiver(pre_delete, sender=Station)
+def drop_frames_of_deleted_station(sender, instance, **kwargs):
+    """Frames that include observations of a deleted station are stale (its parameters cascade)"""
+    drop_station_frames(instance)
@@ -0,0 +1,61 @@
+from django.test import TestCase
+from web.utils import health, warmup
+
+
+class HealthCheckTests(TestCase):
+    """Test cases for the /healthz and /readyz endpoints"""
+
+    def tearDown(self):
+        warmup._state['status'] = warmup.COLD
+
+    def test_healthz(self):
+        """Test that liveness needs no authentication, no session and no database"""
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+        self.assertNotIn('Set-Cookie', response.headers)
+        self.assertNotIn('Server-Timing', response.headers)
+
+    def test_readyz(self):
+        """Test that readiness reports every check"""
+        response = self.client.get('/readyz')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'status': 'ok',
+            'checks': {'database': 'ok', 'cache': 'ok', 'migrations': 'ok', 'warmup': warmup.COLD}
+        })
+
+    def test_readyz_bypasses_csrf(self):
+        """Test that probes are answered whatever the method, without a CSRF token"""
+        self.client = self.client_class(enforce_csrf_checks=True)
+        self.assertEqual(self.client.post('/readyz').status_code, 200)
+
+    def test_readyz_unavailable_while_warming(self):
+        """Test that a worker is not ready until its warm-up finished"""
+        warmup._start()
+
+        with self.assertLogs('django.request', 'ERROR'):
+            response = self.client.get('/readyz')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'unavailable')
+        self.assertEqual(response.json()['checks']['warmup'], warmup.WARMING)
+
+    def test_failing_check(self):
+        """Test that a check that raises is reported as failed"""
+        def broken():
+            raise RuntimeError("database is down")
+
+        checks = health.READINESS_CHECKS
+        health.READINESS_CHECKS = (('database', broken),)
+        try:
+            with self.assertLogs('web.utils.logger', 'ERROR'):
+                ready, results = health.readiness()
+        finally:
+            health.READINESS_CHECKS = checks
+
+        self.assertFalse(ready)
+        self.assertEqual(results, {'database': 'failed'})
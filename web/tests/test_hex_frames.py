@@ -0,0 +1,184 @@
+from datetime import datetime
+from django.urls import reverse
+from django.test import TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import GeographicArea, Station, ParameterName, Parameter, HexFrame
+from web.utils.hex_frames import wait_for_refresh
+from web.utils.ingest_hooks import observations_changed
+import json
+
+
+@override_settings(HEX_FRAMES_REFRESH_IN_BACKGROUND=False)
+class HexFrameTests(APITestCase):
+    """Test cases for hexagon frames precomputed at ingest time"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="frameuser",
+            password="framepassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.area = GeographicArea.objects.create(
+            name="Frame Area",
+            north=42.0,
+            south=40.0,
+            east=71.0,
+            west=68.0,
+            preferred_resolution=5,
+            coordinates=json.dumps([[68.0, 40.0], [71.0, 40.0], [71.0, 42.0], [68.0, 42.0]])
+        )
+        Station.objects.create(number=860, name="Frame Station", lat=41.0, lon=69.0)
+        Station.objects.create(number=861, name="Other Frame Station", lat=40.5, lon=70.5)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        ParameterName.objects.create(name="Namlik", slug="humidity", unit="%")
+
+        self.post(860, [{'datetime': '2024-05-01 10:00:00', 'temp': 20, 'humidity': 40}])
+        self.post(861, [{'datetime': '2024-05-01 10:00:00', 'temp': 30}])
+
+    def post(self, number, items, commit=True):
+        # Frames are computed once the ingest transaction commits
+        with self.captureOnCommitCallbacks(execute=commit):
+            response = self.client.post(reverse('web:parameters_by_station', args=[number]), {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def hexdata(self, **params):
+        return self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp', **params})
+
+    def test_frames_stored_at_ingest(self):
+        """Test that frames are stored for every parameter at the hours around the observation"""
+        # 10:00 local is 05:00 UTC; the default tolerance is one hour
+        hours = set(HexFrame.objects.values_list('hour', flat=True))
+        self.assertEqual(hours, {datetime(2024, 5, 1, h) for h in (4, 5, 6)})
+
+        frame = HexFrame.objects.get(parameter_name__slug='temp', hour=datetime(2024, 5, 1, 5))
+        self.assertEqual(frame.stations_count, 2)
+        self.assertEqual(frame.resolution, 5)
+        self.assertTrue(HexFrame.objects.filter(parameter_name__slug='humidity').exists())
+
+    def test_frame_matches_live_interpolation(self):
+        """Test that a request for an hour is served from the frame with the live values"""
+        precomputed = self.hexdata(datetime='2024-05-01 10:00:00')
+        # A non-default tolerance bypasses the frame
+        live = self.hexdata(datetime='2024-05-01 10:00:00', tolerance=30)
+
+        self.assertEqual(precomputed.status_code, status.HTTP_200_OK)
+        self.assertTrue(precomputed.data['result']['metadata']['precomputed'])
+        self.assertFalse(live.data['result']['metadata']['precomputed'])
+        self.assertEqual(precomputed.data['result']['metadata']['stations_count'], 2)
+
+        live_values = {h['hex_id']: h['value'] for h in live.data['result']['hexagons']}
+        for hexagon in precomputed.data['result']['hexagons']:
+            self.assertAlmostEqual(hexagon['value'], live_values[hexagon['hex_id']], delta=0.011)
+
+    def test_frame_coarse_level(self):
+        """Test that coarser zoom levels are aggregated from the frame"""
+        precomputed = self.hexdata(datetime='2024-05-01 10:00:00', zoom=3)
+        live = self.hexdata(datetime='2024-05-01 10:00:00', zoom=3, tolerance=30)
+
+        self.assertTrue(precomputed.data['result']['metadata']['precomputed'])
+        self.assertLess(precomputed.data['result']['metadata']['resolution'], 5)
+        live_values = {h['hex_id']: h['value'] for h in live.data['result']['hexagons']}
+        for hexagon in precomputed.data['result']['hexagons']:
+            self.assertAlmostEqual(hexagon['value'], live_values[hexagon['hex_id']], delta=0.011)
+
+    def test_ingest_updates_frames(self):
+        """Test that new observations recompute the frames of their hours"""
+        self.post(861, [{'datetime': '2024-05-01 10:00:00', 'temp': 10}])
+
+        response = self.hexdata(datetime='2024-05-01 10:00:00')
+        self.assertTrue(response.data['result']['metadata']['precomputed'])
+        values = [h['value'] for h in response.data['result']['hexagons']]
+        # Both stations are now at or below 20
+        self.assertLessEqual(max(values), 20.01)
+
+    def test_frames_computed_after_commit(self):
+        """Test that the ingest transaction only drops the affected frames and the commit recomputes them"""
+        self.post(861, [{'datetime': '2024-05-01 12:00:00', 'temp': 10}], commit=False)
+
+        # 12:00 local is 07:00 UTC: the 06:00 frame is stale, 04:00 and 05:00 are untouched
+        self.assertEqual(set(HexFrame.objects.values_list('hour', flat=True)), {datetime(2024, 5, 1, h) for h in (4, 5)})
+        response = self.hexdata(datetime='2024-05-01 11:00:00')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['result']['metadata']['precomputed'])
+
+        self.post(861, [{'datetime': '2024-05-01 12:00:00', 'temp': 10}])
+        hours = set(HexFrame.objects.values_list('hour', flat=True))
+        self.assertEqual(hours, {datetime(2024, 5, 1, h) for h in (4, 5, 6, 7, 8)})
+
+    @override_settings(HEX_FRAMES_MAX_INGEST_HOURS=2)
+    def test_bulk_ingest_drops_frames(self):
+        """Test that ingests over many hours drop the affected frames instead of computing them"""
+        self.post(860, [
+            {'datetime': '2024-05-01 09:00:00', 'temp': 21},
+            {'datetime': '2024-05-01 11:00:00', 'temp': 22},
+        ])
+
+        self.assertFalse(HexFrame.objects.exists())
+        response = self.hexdata(datetime='2024-05-01 10:00:00')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['result']['metadata']['precomputed'])
+
+    def test_station_move_and_delete_drop_frames(self):
+        """Test that frames are dropped when a station they were interpolated from moves or is deleted"""
+        station = Station.objects.get(number=861)
+        station.name = "Renamed Frame Station"
+        station.save()
+        self.assertEqual(HexFrame.objects.count(), 6)
+
+        station.lat = 41.5
+        station.save()
+        self.assertFalse(HexFrame.objects.exists())
+
+        self.post(860, [{'datetime': '2024-05-01 10:00:00', 'temp': 20}])
+        self.assertTrue(HexFrame.objects.exists())
+        station.delete()
+        self.assertFalse(HexFrame.objects.exists())
+
+    def test_idw_settings_change_invalidates_frames(self):
+        """Test that frames computed with other IDW settings are not served"""
+        with override_settings(IDW_NEIGHBORS=1):
+            response = self.hexdata(datetime='2024-05-01 10:00:00')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['result']['metadata']['precomputed'])
+
+    def test_area_edit_invalidates_frames(self):
+        """Test that frames computed before the area was edited are not used"""
+        self.area.preferred_resolution = 4
+        self.area.save()
+
+        response = self.hexdata(datetime='2024-05-01 10:00:00')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['result']['metadata']['precomputed'])
+        self.assertEqual(response.data['result']['metadata']['resolution'], 4)
+
+
+class HexFrameRefreshTests(TransactionTestCase):
+    """Test cases for recomputing hexagon frames in the background"""
+
+    def test_frames_computed_in_background(self):
+        """Test that committed ingests have their frames computed by the background thread"""
+        GeographicArea.objects.create(
+            name="Background Area",
+            north=42.0,
+            south=40.0,
+            east=71.0,
+            west=68.0,
+            preferred_resolution=4,
+            coordinates=json.dumps([[68.0, 40.0], [71.0, 40.0], [71.0, 42.0], [68.0, 42.0]])
+        )
+        station = Station.objects.create(number=870, name="Background Station", lat=41.0, lon=69.0)
+        temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        dt = datetime(2024, 5, 1, 5)
+        Parameter.objects.create(station=station, parameter_name=temp, datetime=dt, value=20)
+
+        with self.settings(HEX_FRAMES_REFRESH_IN_BACKGROUND=True):
+            observations_changed(station, [dt])
+            wait_for_refresh()
+
+        hours = set(HexFrame.objects.values_list('hour', flat=True))
+        self.assertEqual(hours, {datetime(2024, 5, 1, h) for h in (4, 5, 6)})
@@ -0,0 +1,131 @@
+from django.urls import reverse
+from django.test import override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import GeographicArea, Station, ParameterName
+import h3
+import json
+
+
+class HexViewportTests(APITestCase):
+    """Test cases for viewport-clipped hexgrid and hexdata requests"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="viewportuser",
+            password="viewportpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        GeographicArea.objects.create(
+            name="Viewport Area",
+            north=42.0,
+            south=40.0,
+            east=71.0,
+            west=68.0,
+            preferred_resolution=5,
+            coordinates=json.dumps([[68.0, 40.0], [71.0, 40.0], [71.0, 42.0], [68.0, 42.0]])
+        )
+        self.station = Station.objects.create(number=820, name="Viewport Station", lat=41.0, lon=69.5)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        self.client.post(reverse('web:parameters_by_station', args=[820]), {'items': [
+            {'datetime': '2024-05-01 10:00:00', 'temp': 25},
+        ]}, format='json')
+
+        self.bbox = {'west': 69.0, 'south': 40.8, 'east': 69.6, 'north': 41.2}
+        self.bbox_param = '69.0,40.8,69.6,41.2'
+
+    def test_hexgrid_clipped_to_bbox(self):
+        """Test that only hexagons intersecting the viewport are returned"""
+        full = self.client.get(reverse('web:hex-grid'))
+        clipped = self.client.get(reverse('web:hex-grid'), {'bbox': self.bbox_param})
+
+        self.assertEqual(clipped.status_code, status.HTTP_200_OK)
+        full_ids = {feature['id'] for feature in full.data['result']['features']}
+        clipped_ids = {feature['id'] for feature in clipped.data['result']['features']}
+        self.assertTrue(clipped_ids)
+        self.assertLess(len(clipped_ids), len(full_ids))
+        self.assertTrue(clipped_ids <= full_ids)
+
+        # Every hexagon whose center is inside the viewport must be included
+        for hex_id in full_ids:
+            lat, lng = h3.h3_to_geo(hex_id)
+            if self.bbox['south'] <= lat <= self.bbox['north'] and self.bbox['west'] <= lng <= self.bbox['east']:
+                self.assertIn(hex_id, clipped_ids)
+
+    def test_hexdata_clipped_to_bbox(self):
+        """Test that hexdata only interpolates hexagons in the viewport"""
+        grid = self.client.get(reverse('web:hex-grid'), {'bbox': self.bbox_param})
+        response = self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp', 'bbox': self.bbox_param})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hex_ids = {item['hex_id'] for item in response.data['result']['hexagons']}
+        self.assertEqual(hex_ids, {feature['id'] for feature in grid.data['result']['features']})
+
+    def test_invalid_bbox(self):
+        """Test validation of the bbox parameter"""
+        response = self.client.get(reverse('web:hex-grid'), {'bbox': '69.6,40.8,69.0'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_zoom_selects_coarser_resolution(self):
+        """Test that zooming out returns fewer, coarser hexagons"""
+        fine = self.client.get(reverse('web:hex-grid'), {'zoom': 12})
+        coarse = self.client.get(reverse('web:hex-grid'), {'zoom': 5})
+
+        self.assertEqual(fine.data['result']['resolution'], 5)
+        self.assertLess(coarse.data['result']['resolution'], 5)
+        self.assertLess(len(coarse.data['result']['features']), len(fine.data['result']['features']))
+
+    @override_settings(HEX_MAX_CELLS=10)
+    def test_cell_count_is_bounded(self):
+        """Test that a coarser level is used when the zoom level would return too many cells"""
+        response = self.client.get(reverse('web:hex-grid'), {'zoom': 12})
+
+        self.assertLessEqual(len(response.data['result']['features']), 10)
+
+    def test_parent_values_aggregate_children(self):
+        """Test that coarse hexagon values are the mean of their base children"""
+        base = self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp', 'neighbors': 1, 'radius': 10})
+        coarse = self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp', 'neighbors': 1, 'radius': 10, 'zoom': 5})
+
+        resolution = coarse.data['result']['metadata']['resolution']
+        children = {}
+        for item in base.data['result']['hexagons']:
+            children.setdefault(h3.h3_to_parent(item['hex_id'], resolution), []).append(item['value'])
+        for item in coarse.data['result']['hexagons']:
+            expected = sum(children[item['hex_id']]) / len(children[item['hex_id']])
+            self.assertAlmostEqual(item['value'], expected, places=1)
+
+    def test_hexgrid_ids_output(self):
+        """Test that ids and compact outputs describe the same cells as GeoJSON"""
+        full = self.client.get(reverse('web:hex-grid'))
+        ids = self.client.get(reverse('web:hex-grid'), {'output': 'ids'})
+        compact = self.client.get(reverse('web:hex-grid'), {'output': 'compact'})
+
+        expected = {feature['id'] for feature in full.data['result']['features']}
+        self.assertEqual(set(ids.data['result']['hex_ids']), expected)
+
+        resolution = compact.data['result']['resolution']
+        self.assertLessEqual(len(compact.data['result']['hex_ids']), len(expected))
+        self.assertEqual(set(h3.uncompact(compact.data['result']['hex_ids'], resolution)), expected)
+
+    def test_hexdata_columns_output(self):
+        """Test that the columnar output matches the row output"""
+        rows = self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp'})
+        columns = self.client.get(reverse('web:hex-data'), {'parameter_name': 'temp', 'output': 'columns'})
+
+        self.assertEqual(columns.status_code, status.HTTP_200_OK)
+        result = columns.data['result']
+        self.assertEqual(
+            dict(zip(result['hex_ids'], result['values'])),
+            {item['hex_id']: item['value'] for item in rows.data['result']['hexagons']}
+        )
+
+    def test_invalid_output(self):
+        """Test validation of the output parameter"""
+        response = self.client.get(reverse('web:hex-grid'), {'output': 'svg'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
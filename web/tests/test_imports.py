@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
+from config.preload import HEAVY_MODULES, preload
+
+# Imported at boot on purpose: numpy is cheap and used by the ingest hooks
+BOOT_MODULES = {'numpy'}
+
+BOOT = (
+    "import sys, django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "print(','.join(sorted(sys.modules)))"
+)
+
+
+class LazyImportTests(SimpleTestCase):
+    """Test cases for the lazy imports of heavy dependencies"""
+
+    def test_boot_does_not_import_heavy_modules(self):
+        """Test that Django setup and URLconf load (a worker boot) leave the heavy modules unimported"""
+        result = subprocess.run(
+            [sys.executable, '-c', BOOT],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'},
+            capture_output=True, text=True, check=True
+        )
+        loaded = set(result.stdout.strip().split(','))
+        imported = [name for name in HEAVY_MODULES if name in loaded and name not in BOOT_MODULES]
+        self.assertEqual(imported, [], "imported at boot; import them where they are used")
+
+    def test_preload(self):
+        """Test that preload imports the given modules and skips missing ones"""
+        timings = preload(('json', 'no_such_module_for_preload'))
+        self.assertEqual(list(timings), ['json'])
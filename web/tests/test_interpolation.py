@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+from web.utils.idw_interpolation import IDWInterpolator
+import numpy as np
+
+
+class IDWInterpolatorTests(SimpleTestCase):
+    """Test cases for the KD-tree backed IDW interpolator"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        rng = np.random.default_rng(42)
+        self.points = [
+            {'lat': lat, 'lng': lng, 'value': value}
+            for lat, lng, value in zip(rng.uniform(37, 45, 50), rng.uniform(56, 73, 50), rng.uniform(0, 40, 50))
+        ]
+        self.lats = rng.uniform(38, 44, 100)
+        self.lngs = rng.uniform(57, 72, 100)
+
+    def brute_force(self, interpolator, lat, lng):
+        """Reference IDW over all stations"""
+        distances = np.array([interpolator._haversine_distance(lat, lng, p[0], p[1]) for p in interpolator.points])
+        weights = 1.0 / np.power(distances + interpolator.smoothing, interpolator.power)
+        return np.sum(weights * interpolator.values) / np.sum(weights)
+
+    def test_all_stations_matches_brute_force(self):
+        """Test that the default mode uses every station"""
+        interpolator = IDWInterpolator(self.points)
+        values = interpolator.interpolate_many(self.lats, self.lngs)
+
+        expected = [self.brute_force(interpolator, lat, lng) for lat, lng in zip(self.lats, self.lngs)]
+        np.testing.assert_allclose(values, expected, rtol=1e-9)
+
+    def test_exact_station_location(self):
+        """Test that a target on a station gets the station value"""
+        interpolator = IDWInterpolator(self.points, k=5)
+        point = self.points[7]
+
+        self.assertAlmostEqual(interpolator.interpolate(point['lat'], point['lng']), point['value'])
+
+    def test_radius_limit(self):
+        """Test that targets without stations in the radius get 0"""
+        interpolator = IDWInterpolator(self.points, radius=1000, k=4)
+
+        self.assertEqual(interpolator.interpolate(0.0, 0.0), 0)
+
+    def test_k_nearest_uses_only_nearest(self):
+        """Test that k=1 returns the value of the nearest station"""
+        interpolator = IDWInterpolator(self.points, k=1)
+        lat, lng = self.lats[0], self.lngs[0]
+
+        distances = [interpolator._haversine_distance(lat, lng, p['lat'], p['lng']) for p in self.points]
+        self.assertAlmostEqual(interpolator.interpolate(lat, lng), self.points[int(np.argmin(distances))]['value'])
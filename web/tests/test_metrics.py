@@ -0,0 +1,69 @@
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import Station
+from web.utils import metrics
+
+if metrics.available():
+    from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@skipUnless(metrics.available(), "prometheus_client is not installed")
+class MetricsTests(APITestCase):
+    """Test cases for the Prometheus metrics"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        self.user = User.objects.create_user(username="metricsuser", password="metricspassword")
+        self.client.force_authenticate(user=self.user)
+        Station.objects.create(number=100, name="Metrics Station", lat=41.3, lon=69.2)
+
+    def test_request_and_cache_metrics(self):
+        """Test that requests are recorded per URL name and cache lookups per cache"""
+        labels = {'method': 'GET', 'view': 'web:stations_list', 'status': '200'}
+        requests_before = sample('panel_http_request_duration_seconds_count', **labels)
+        misses_before = sample('panel_result_cache_requests_total', cache='response', result='miss')
+        hits_before = sample('panel_result_cache_requests_total', cache='response', result='hit')
+
+        self.client.get(reverse('web:stations_list'))
+        self.client.get(reverse('web:stations_list'))
+
+        self.assertEqual(sample('panel_http_request_duration_seconds_count', **labels), requests_before + 2)
+        self.assertEqual(sample('panel_result_cache_requests_total', cache='response', result='miss'), misses_before + 1)
+        self.assertEqual(sample('panel_result_cache_requests_total', cache='response', result='hit'), hits_before + 1)
+        self.assertGreater(sample('panel_http_request_db_queries_count', view='web:stations_list'), 0)
+
+    def test_unresolved_requests_share_one_label(self):
+        """Test that unknown URLs and methods do not create new label values"""
+        labels = {'method': 'GET', 'view': metrics.UNRESOLVED_VIEW, 'status': '404'}
+        before = sample('panel_http_request_duration_seconds_count', **labels)
+        self.client.get('/no-such-page-1')
+        self.client.get('/no-such-page-2')
+        self.assertEqual(sample('panel_http_request_duration_seconds_count', **labels), before + 2)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the Prometheus text format"""
+        self.client.get(reverse('web:stations_list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('panel_http_request_duration_seconds_bucket', body)
+        self.assertIn('panel_result_cache_requests_total', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Test that /metrics requires the bearer token when one is configured"""
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
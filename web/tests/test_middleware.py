@@ -0,0 +1,79 @@
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import Station
+from web.utils.request_metrics import RequestMetrics
+
+
+def timing_entries(response):
+    """Parse a Server-Timing header into {name: entry}"""
+    return {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+
+
+class RequestTimingMiddlewareTests(APITestCase):
+    """Test cases for the request timing middleware"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        self.user = User.objects.create_user(username="timinguser", password="timingpassword")
+        self.client.force_authenticate(user=self.user)
+        Station.objects.create(number=100, name="Timing Station", lat=41.3, lon=69.2)
+        self.url = reverse('web:stations_list')
+
+    def test_server_timing_header(self):
+        """Test that responses report total, database, render and cache timings"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        entries = timing_entries(response)
+        self.assertIn('total;dur=', entries['total'])
+        self.assertRegex(entries['db'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"$')
+        self.assertIn('render', entries)
+        self.assertEqual(entries['cache'], 'cache;desc="hit=0 miss=1"')
+        self.assertEqual(entries['response-cache'], 'response-cache;desc="MISS"')
+
+        response = self.client.get(self.url)
+        entries = timing_entries(response)
+        self.assertEqual(entries['cache'], 'cache;desc="hit=1 miss=0"')
+        self.assertEqual(entries['response-cache'], 'response-cache;desc="HIT"')
+
+    @override_settings(SLOW_REQUEST_MS=0.001, SLOW_REQUEST_SQL_COUNT=2)
+    def test_slow_request_logs_slowest_sql(self):
+        """Test that slow requests are logged as warnings with their slowest statements"""
+        with self.assertLogs('web.requests', level='WARNING') as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['event'], 'slow_request')
+        self.assertEqual(record['view'], 'web:stations_list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertLessEqual(len(record['slowest_sql']), 2)
+        self.assertTrue(all('SELECT' in query['sql'] for query in record['slowest_sql']))
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_fast_requests_are_not_warnings(self):
+        """Test that requests are only logged at debug level when the slow threshold is off"""
+        with self.assertLogs('web.requests', level='DEBUG') as logs:
+            self.client.get(self.url)
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG'])
+        self.assertEqual(json.loads(logs.records[0].getMessage())['event'], 'request')
+
+
+class RequestMetricsTests(SimpleTestCase):
+    """Test cases for the per-request measurements"""
+
+    def test_keeps_slowest_queries(self):
+        """Test that only the slowest statements are kept, slowest first"""
+        metrics = RequestMetrics(slow_sql_count=2)
+        for i, seconds in enumerate([0.003, 0.001, 0.004, 0.002]):
+            metrics.record_query(f"SELECT {i}", seconds)
+
+        self.assertEqual(metrics.queries, 4)
+        self.assertAlmostEqual(metrics.db_seconds, 0.01)
+        self.assertEqual(metrics.slowest_queries(), [(4.0, "SELECT 2"), (3.0, "SELECT 0")])
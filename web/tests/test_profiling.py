@@ -0,0 +1,100 @@
+import json
+import pstats
+import shutil
+import tempfile
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from web.models import Station
+
+
+class RequestProfilingTests(APITestCase):
+    """Test cases for on-demand request profiling"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(username="profilestaff", password="profilepassword", is_staff=True)
+        self.user = User.objects.create_user(username="profileuser", password="profilepassword")
+        Station.objects.create(number=100, name="Profile Station", lat=41.3, lon=69.2)
+        self.url = reverse('web:stations_list')
+
+    def auth(self, user):
+        """Authorization header of a real JWT (the middleware runs before DRF authentication)"""
+        return {'HTTP_AUTHORIZATION': f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+    def test_cprofile_with_header(self):
+        """Test that a staff request with X-Profile stores a pstats profile and its SQL"""
+        response = self.client.get(self.url, HTTP_X_PROFILE='cprofile', **self.auth(self.staff))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response['X-Profile-Id']
+
+        stats = pstats.Stats(str(Path(self.profile_dir) / f"{profile_id}.prof"))
+        self.assertGreater(stats.total_calls, 0)
+
+        record = json.loads((Path(self.profile_dir) / f"{profile_id}.json").read_text())
+        self.assertEqual(record['path'], self.url)
+        self.assertEqual(record['user'], 'profilestaff')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries_count'], len(record['queries']))
+        self.assertTrue(any('web_station' in query['sql'] for query in record['queries']))
+
+    def test_sampling_profile_with_query_flag(self):
+        """Test that _profile=sample stores a speedscope profile"""
+        response = self.client.get(self.url, {'_profile': 'sample'}, **self.auth(self.staff))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        profile = json.loads((Path(self.profile_dir) / f"{response['X-Profile-Id']}.speedscope.json").read_text())
+        sampled = profile['profiles'][0]
+        self.assertEqual(sampled['type'], 'sampled')
+        self.assertEqual(len(sampled['samples']), len(sampled['weights']))
+        frame_count = len(profile['shared']['frames'])
+        self.assertTrue(all(0 <= frame < frame_count for sample in sampled['samples'] for frame in sample))
+
+    def test_profiled_requests_bypass_cache(self):
+        """Test that profiled requests run the view instead of reading or filling the response cache"""
+        self.assertEqual(self.client.get(self.url, **self.auth(self.user))['X-Response-Cache'], 'MISS')
+
+        for flags in ({'HTTP_X_PROFILE': '1'}, {'data': {'_profile': '1'}}):
+            response = self.client.get(self.url, **flags, **self.auth(self.staff))
+            self.assertEqual(response['X-Response-Cache'], 'BYPASS')
+            record = json.loads((Path(self.profile_dir) / f"{response['X-Profile-Id']}.json").read_text())
+            self.assertTrue(any('web_station' in query['sql'] for query in record['queries']))
+
+        self.assertEqual(self.client.get(self.url, **self.auth(self.user))['X-Response-Cache'], 'HIT')
+        cache.clear()
+        self.client.get(self.url, {'_profile': '1'}, **self.auth(self.staff))
+        self.assertEqual(self.client.get(self.url, **self.auth(self.user))['X-Response-Cache'], 'MISS')
+
+    def test_flag_ignored_for_other_users(self):
+        """Test that the flag of non-staff and anonymous users is ignored"""
+        for headers in (self.auth(self.user), {}):
+            response = self.client.get(self.url, HTTP_X_PROFILE='1', **headers)
+            self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list(Path(self.profile_dir).iterdir()), [])
+
+    def test_download_profile(self):
+        """Test that staff can download the stored files and others cannot"""
+        profile_id = self.client.get(self.url, HTTP_X_PROFILE='1', **self.auth(self.staff))['X-Profile-Id']
+        url = reverse('web:profile', args=[profile_id])
+
+        response = self.client.get(url, {'file': 'sql'}, **self.auth(self.staff))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['id'], profile_id)
+
+        self.assertEqual(self.client.get(url, **self.auth(self.user)).status_code, status.HTTP_403_FORBIDDEN)
+        missing = reverse('web:profile', args=['20240101-000000-00000000'])
+        self.assertEqual(self.client.get(missing, **self.auth(self.staff)).status_code, status.HTTP_404_NOT_FOUND)
+        invalid = reverse('web:profile', args=['..'])
+        self.assertEqual(self.client.get(invalid, **self.auth(self.staff)).status_code, status.HTTP_404_NOT_FOUND)
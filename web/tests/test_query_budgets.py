@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import GeographicArea, Station, ParameterName, Parameter
+from web.utils.ingest_hooks import observations_changed
+from web.utils.hex_frames import compute_frames
+
+# Dataset sizes: (stations, days of hourly data)
+SIZES = [(2, 2), (6, 9)]
+
+# First UTC hour of the data; 2024-03-01 05:00 local
+START = datetime(2024, 3, 1)
+
+SLUGS = ['temp', 'humidity', 'wind_direction', 'rainfall']
+
+# (name, url name, url args, query parameters, query budget)
+# Date ranges cover the whole largest dataset. Budgets are the current counts:
+# lower them when a view gets cheaper, never raise them to make a test pass.
+ENDPOINTS = [
+    ('stations', 'stations_list', [], {}, 1),
+    ('stations.detail', 'stations_detail', ['700'], {}, 1),
+    ('stations.current', 'stations_current', [], {}, 2),
+    ('stations.snapshot', 'stations_snapshot', [], {'datetime': '2024-03-02 10:00:00'}, 4),
+    ('parameter_names', 'parameter_names', [], {}, 1),
+    ('parameters.station', 'parameters_by_station', ['700'], {
+        'start_date': '2024-03-01 00:00:00', 'end_date': '2024-03-11 00:00:00'
+    }, 3),
+    ('parameters.all', 'parameters_all', [], {
+        'start_date': '2024-03-01 00:00:00', 'end_date': '2024-03-11 00:00:00'
+    }, 4),
+    ('parameters.avg', 'parameters_by_station', ['avg'], {
+        'start_date': '2024-03-01 00:00:00', 'end_date': '2024-03-11 00:00:00'
+    }, 2),
+    ('charts.station.month', 'parameter_charts', ['700'], {'parameter_name': 'temp', 'period': 'month', 'date': '2024-03'}, 5),
+    ('charts.station.year', 'parameter_charts', ['700'], {'parameter_name': 'temp', 'period': 'year', 'date': '2024'}, 5),
+    ('charts.avg.month', 'parameter_charts_avg', [], {'parameter_name': 'temp', 'period': 'month', 'date': '2024-03'}, 4),
+    ('charts.all.month', 'parameter_charts_all', [], {'parameter_name': 'temp', 'period': 'month', 'date': '2024-03'}, 5),
+    ('charts.all.year', 'parameter_charts_all', [], {'parameter_name': 'temp', 'period': 'year', 'date': '2024'}, 5),
+    ('stats', 'stats', [], {'parameter_name': 'temp', 'year': '2024', 'station_number': '700'}, 10),
+    ('stats.correlation', 'correlation', [], {'year': '2024', 'station_number': '700'}, 3),
+    ('stats.trend', 'trend', [], {'parameter_name': 'temp'}, 3),
+    ('stats.percentile', 'percentile', [], {'parameter_name': 'temp', 'start': '2024-03', 'end': '2024-03'}, 2),
+    ('hexgrid', 'hex-grid', [], {}, 1),
+    ('hexdata.latest', 'hex-data', [], {'parameter_name': 'temp'}, 3),
+    ('hexdata.datetime', 'hex-data', [], {'parameter_name': 'temp', 'datetime': '2024-03-02 10:00:00'}, 3),
+    ('hexdata.datetime.live', 'hex-data', [], {
+        'parameter_name': 'temp', 'datetime': '2024-03-02 10:30:00', 'tolerance': 30
+    }, 5),
+]
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Query budgets of the read endpoints.
+
+    Every endpoint is requested on a small and a large dataset (more stations
+    and more days). The number of queries must stay within the budget and be
+    the same for both sizes, so it cannot grow with the data.
+    """
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_superuser(username="budgetuser", password="budgetpassword")
+        self.client.force_authenticate(user=self.user)
+
+        GeographicArea.objects.create(
+            name="Budget Area",
+            north=42.0,
+            south=40.0,
+            east=71.0,
+            west=68.0,
+            preferred_resolution=4,
+            coordinates=json.dumps([[68.0, 40.0], [71.0, 40.0], [71.0, 42.0], [68.0, 42.0]])
+        )
+        self.parameter_names = [
+            ParameterName.objects.create(name=slug, slug=slug, unit="-") for slug in SLUGS
+        ]
+        self.stations = 0
+        self.days = 0
+
+    def grow(self, stations, days):
+        """Grow the dataset to the given number of stations and days of hourly data"""
+        for i in range(stations):
+            station, _ = Station.objects.get_or_create(
+                number=700 + i,
+                defaults={'name': f"Budget Station {i}", 'lat': 40.2 + 0.3 * i, 'lon': 68.2 + 0.4 * i}
+            )
+            first_day = self.days if i < self.stations else 0
+            hours = [START + timedelta(hours=h) for h in range(first_day * 24, days * 24)]
+            Parameter.objects.bulk_create([
+                Parameter(station=station, parameter_name=parameter_name, datetime=dt, value=(h + i) % 30)
+                for parameter_name in self.parameter_names
+                for h, dt in enumerate(hours)
+            ])
+            observations_changed(station, hours)
+        # Bulk loads only drop hex frames; rebuild the one hexdata.datetime uses (2024-03-02 10:00 local)
+        compute_frames(datetime(2024, 3, 2, 5))
+        self.stations, self.days = stations, days
+
+    def count_queries(self, url_name, args, params):
+        """Request an endpoint with an empty cache and get (response, captured queries)"""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'web:{url_name}', args=args), params)
+        return response, queries
+
+    def assertWithinBudget(self, name, queries, budget):
+        if len(queries) > budget:
+            sql = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(queries.captured_queries, 1))
+            self.fail(f"{name} made {len(queries)} queries (budget {budget}):\n{sql}")
+
+    def test_query_budgets(self):
+        """Test that every endpoint stays within its budget, independent of the dataset size"""
+        counts = {}
+        for stations, days in SIZES:
+            self.grow(stations, days)
+            for name, url_name, args, params, budget in ENDPOINTS:
+                with self.subTest(endpoint=name, stations=stations, days=days):
+                    response, queries = self.count_queries(url_name, args, params)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+                    self.assertWithinBudget(name, queries, budget)
+                    counts.setdefault(name, []).append(len(queries))
+
+        for name, sizes in counts.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(len(set(sizes)), 1, f"{name} query count grows with the data: {sizes}")
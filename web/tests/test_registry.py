@@ -0,0 +1,105 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from web.models import Station, ParameterName
+from web.utils import registry
+from web.utils.data_version import bump_meta_version
+
+
+class RegistryTests(TransactionTestCase):
+    """
+    Test cases for the station and parameter name registries.
+
+    TransactionTestCase: inside TestCase's transaction every lookup goes to the
+    database, because the test's writes are never committed.
+    """
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        self.station = Station.objects.create(number=840, name="Registry Station", lat=41.0, lon=69.5)
+        self.temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+
+    def test_lookups_without_queries(self):
+        """Test that lookups are answered from the process copy once it is loaded"""
+        registry.stations.all()
+        registry.parameter_names.all()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.stations.get(number='840').name, "Registry Station")
+            self.assertEqual(registry.stations.get(id=self.station.id).number, 840)
+            self.assertEqual(registry.parameter_names.get(slug='temp').unit, "°C")
+            self.assertEqual(list(registry.stations.in_bulk([840], field='number')), [840])
+            with self.assertRaises(Station.DoesNotExist):
+                registry.stations.get(number='abc')
+        # A value missing from the copy is checked in the database once
+        with self.assertNumQueries(1):
+            self.assertEqual(list(registry.stations.in_bulk([840, 999], field='number')), [840])
+
+    def test_save_and_delete_invalidate(self):
+        """Test that saves and deletes are seen by the next lookup"""
+        registry.stations.all()
+
+        self.station.name = "Renamed Station"
+        self.station.save()
+        self.assertEqual(registry.stations.get(number=840).name, "Renamed Station")
+
+        self.station.delete()
+        with self.assertRaises(Station.DoesNotExist):
+            registry.stations.get(number=840)
+
+    def test_version_bump_from_another_process(self):
+        """Test that a metadata version bump (e.g. a save in another worker) reloads the table"""
+        registry.stations.all()
+        Station.objects.filter(id=self.station.id).update(name="Changed Elsewhere")
+        bump_meta_version()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.stations.get(number=840).name, "Changed Elsewhere")
+
+    def test_row_added_without_version_bump(self):
+        """Test that a row the registry cannot know about (no signal, no version bump) is found in the database"""
+        registry.stations.all()
+        Station.objects.bulk_create([Station(number=842, name="Unseen Station", lat=41.0, lon=69.0)])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.stations.get(number=842).name, "Unseen Station")
+        self.assertEqual(set(registry.stations.in_bulk([840, 842], field='number')), {840, 842})
+        with self.assertNumQueries(1):
+            with self.assertRaises(Station.DoesNotExist):
+                registry.stations.get(number=843)
+
+    def test_rolled_back_write_is_not_kept(self):
+        """Test that rows of a rolled back transaction are not kept in the registry"""
+        class Rollback(Exception):
+            pass
+
+        with self.assertRaises(Rollback):
+            with transaction.atomic():
+                Station.objects.create(number=841, name="Uncommitted Station", lat=41.0, lon=69.0)
+                self.assertEqual(registry.stations.get(number=841).name, "Uncommitted Station")
+                raise Rollback
+
+        with self.assertRaises(Station.DoesNotExist):
+            registry.stations.get(number=841)
+
+    def test_views_do_not_query_metadata(self):
+        """Test that a chart request reads stations and parameter names from the registry"""
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username="registryuser", password="registrypassword"))
+        registry.stations.all()
+        registry.parameter_names.all()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('web:parameter_charts', args=['840']), {
+                'parameter_name': 'temp', 'period': 'month', 'date': '2024-03'
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tables = ['"web_station"', '"web_parametername"']
+        self.assertEqual([q['sql'] for q in queries if any(f"FROM {table}" in q['sql'] for table in tables)], [])
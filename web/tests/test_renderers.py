@@ -0,0 +1,114 @@
+from importlib.util import find_spec
+from unittest import skipUnless
+from datetime import datetime
+from decimal import Decimal
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from web.models import Station, ParameterName
+from web.utils import custom_response
+import numpy as np
+import pandas as pd
+import json
+
+
+class BinaryRendererTests(APITestCase):
+    """Test cases for the MessagePack and Arrow IPC renderers"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="rendereruser",
+            password="rendererpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        Station.objects.create(number=830, name="Renderer Station", lat=41.0, lon=69.0)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        self.client.post(reverse('web:parameters_by_station', args=[830]), {'items': [
+            {'datetime': '2024-05-01 10:00:00', 'temp': 20.5},
+            {'datetime': '2024-05-01 11:00:00', 'temp': 21.5},
+        ]}, format='json')
+
+        self.url = reverse('web:parameter_charts', args=[830])
+        self.params = {'parameter_name': 'temp', 'period': 'day', 'date': '2024-05-01'}
+
+    @skipUnless(find_spec('msgpack'), "msgpack is not installed")
+    def test_messagepack_keeps_envelope(self):
+        """Test that MessagePack encodes the same envelope as JSON"""
+        import msgpack
+
+        json_response = self.client.get(self.url, self.params)
+        response = self.client.get(self.url, self.params, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), json.loads(json_response.content))
+
+    @skipUnless(find_spec('pyarrow'), "pyarrow is not installed")
+    def test_arrow_items_table(self):
+        """Test that Arrow IPC sends result items as a table and the envelope as metadata"""
+        import pyarrow as pa
+
+        json_result = self.client.get(self.url, self.params).data['result']
+        response = self.client.get(self.url, self.params, HTTP_ACCEPT='application/vnd.apache.arrow.stream')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = pa.ipc.open_stream(response.content).read_all()
+        metadata = table.schema.metadata
+        self.assertEqual(json.loads(metadata[b'status']), 200)
+        self.assertTrue(json.loads(metadata[b'success']))
+        self.assertEqual(json.loads(metadata[b'result'])['parameter']['slug'], 'temp')
+        self.assertEqual(table.num_rows, len(json_result['items']))
+
+    @skipUnless(find_spec('pyarrow'), "pyarrow is not installed")
+    def test_arrow_error_envelope(self):
+        """Test that errors keep status and detail in Arrow responses"""
+        import pyarrow as pa
+
+        response = self.client.get(self.url, {'period': 'day'}, HTTP_ACCEPT='application/vnd.apache.arrow.stream')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.num_rows, 0)
+        self.assertFalse(json.loads(table.schema.metadata[b'success']))
+        self.assertIsNotNone(json.loads(table.schema.metadata[b'detail']))
+
+
+@skipUnless(find_spec('orjson'), "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    """Test cases for the default orjson renderer"""
+
+    def test_matches_drf_json_renderer(self):
+        """Test that plain payloads render to the same JSON as DRF's renderer"""
+        from web.renderers import ORJSONRenderer
+
+        data = {
+            'status': 200,
+            'success': True,
+            'result': {'items': [{'datetime': datetime(2024, 5, 1, 10), 'value': 1.25, 'name': "Toshkent"}], 7: Decimal('2.5')},
+            'detail': None,
+        }
+
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_numpy_and_pandas_payloads(self):
+        """Test that NumPy and pandas objects can be passed to custom_response directly"""
+        from web.renderers import ORJSONRenderer
+
+        frame = pd.DataFrame({'datetime': pd.to_datetime(['2024-05-01 10:00', None]), 'value': [1.5, np.nan]})
+        response = custom_response({
+            'values': np.array([1.5, np.nan], dtype=np.float32),
+            'count': np.int64(2),
+            'items': frame,
+            'series': pd.Series([1, 2]),
+        })
+
+        result = json.loads(ORJSONRenderer().render(response.data))['result']
+        self.assertEqual(result['values'], [1.5, None])
+        self.assertEqual(result['count'], 2)
+        self.assertEqual(result['items'], [{'datetime': '2024-05-01T10:00:00', 'value': 1.5}, {'datetime': None, 'value': None}])
+        self.assertEqual(result['series'], [1, 2])
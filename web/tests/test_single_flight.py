@@ -0,0 +1,183 @@
+import runpy
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from web.models import Station, ParameterName, Parameter
+from web.utils import single_flight as sf
+from web.views.chart import ParameterAvgChartView
+
+
+@override_settings(SINGLE_FLIGHT_POLL_INTERVAL=0.01, SINGLE_FLIGHT_WAIT_TIMEOUT=5)
+class SingleFlightTests(SimpleTestCase):
+    """Test cases for single-flight coalescing"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        sf.metrics.reset()
+
+    def test_concurrent_callers_compute_once(self):
+        """Test that concurrent callers of the same key share one computation"""
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {'value': 42}
+
+        results = []
+
+        def call():
+            results.append(sf.single_flight('key', compute, lambda: None))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(1)
+        followers = [threading.Thread(target=call) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 42}] * 5)
+        self.assertEqual(sf.metrics.computed, 1)
+        self.assertEqual(sf.metrics.coalesced, 4)
+        self.assertEqual(sf.metrics.fallbacks, 0)
+
+    def test_waits_for_other_process(self):
+        """Test that a caller waits for the result stored by the holder of the shared lock"""
+        cache.add(f"{sf.LOCK_KEY_PREFIX}:key", 'other-process')
+        timer = threading.Timer(0.1, cache.set, args=('result', {'value': 7}))
+        timer.start()
+
+        def compute():
+            self.fail("The value should come from the other process")
+
+        value = sf.single_flight('key', compute, lambda: cache.get('result'))
+        timer.join()
+
+        self.assertEqual(value, {'value': 7})
+        self.assertEqual(sf.metrics.remote_waits, 1)
+        self.assertEqual(sf.metrics.computed, 0)
+
+    def test_computes_when_lock_released_without_result(self):
+        """Test that a caller computes the value itself if the lock holder stored nothing"""
+        lock_key = f"{sf.LOCK_KEY_PREFIX}:key"
+        cache.add(lock_key, 'other-process')
+        timer = threading.Timer(0.05, cache.delete, args=(lock_key,))
+        timer.start()
+
+        value = sf.single_flight('key', lambda: 'computed', lambda: None)
+        timer.join()
+
+        self.assertEqual(value, 'computed')
+        self.assertEqual(sf.metrics.fallbacks, 1)
+
+    def test_follower_computes_when_leader_fails(self):
+        """Test that a follower computes the value itself when the leader's computation raises"""
+        started = threading.Event()
+
+        def failing_compute():
+            started.set()
+            time.sleep(0.2)
+            raise RuntimeError("boom")
+
+        errors = []
+
+        def lead():
+            try:
+                sf.single_flight('key', failing_compute, lambda: None)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(1)
+        value = sf.single_flight('key', lambda: 'computed', lambda: None)
+        leader.join()
+
+        self.assertEqual(value, 'computed')
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(sf.metrics.fallbacks, 1)
+
+    def test_error_raised_and_lock_released(self):
+        """Test that a failed computation raises and releases the lock"""
+        def compute():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            sf.single_flight('key', compute, lambda: None)
+
+        self.assertIsNone(cache.get(f"{sf.LOCK_KEY_PREFIX}:key"))
+        self.assertNotIn('key', sf._in_flight)
+
+
+@override_settings(SINGLE_FLIGHT_POLL_INTERVAL=0.01, SINGLE_FLIGHT_WAIT_TIMEOUT=5)
+class SingleFlightServerTests(LiveServerTestCase):
+    """Test cases for coalescing concurrent HTTP requests in a threaded server"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        sf.metrics.reset()
+
+        user = User.objects.create_user(username="flightuser", password="flightpassword")
+        self.token = str(AccessToken.for_user(user))
+        station = Station.objects.create(number=860, name="Flight Station", lat=41.0, lon=69.0)
+        temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        Parameter.objects.bulk_create([
+            Parameter(station=station, parameter_name=temp, datetime=datetime(2024, 5, 1) + timedelta(hours=h), value=20 + h)
+            for h in range(24)
+        ])
+
+    def _request(self):
+        url = f"{self.live_server_url}{reverse('web:parameter_charts_avg')}?parameter_name=temp&period=day&date=2024-05-01"
+        request = urllib.request.Request(url, headers={'Authorization': f"Bearer {self.token}"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.headers['X-Response-Cache'], response.read()
+
+    def test_gunicorn_workers_are_threaded(self):
+        """Test that the gunicorn config runs several threads per worker, so requests can be coalesced"""
+        config = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertGreater(config['threads'], 1)
+
+    def test_concurrent_requests_run_view_once(self):
+        """Test that two concurrent identical requests run the view once and share its response"""
+        original = ParameterAvgChartView._get_day_chart_data
+        calls = []
+        started = threading.Event()
+
+        def slow_day_chart_data(view, *args):
+            calls.append(1)
+            started.set()
+            # Keep the first request in flight until the second one waits for it
+            time.sleep(0.3)
+            return original(view, *args)
+
+        ParameterAvgChartView._get_day_chart_data = slow_day_chart_data
+        self.addCleanup(setattr, ParameterAvgChartView, '_get_day_chart_data', original)
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(self._request()))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        results.append(self._request())
+        leader.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(cache_status for _, cache_status, _ in results), ['COALESCED', 'MISS'])
+        self.assertEqual({status_code for status_code, _, _ in results}, {200})
+        self.assertEqual(results[0][2], results[1][2])
+        self.assertEqual(sf.metrics.coalesced, 1)
@@ -1,9 +1,10 @@
 from django.urls import reverse
 from django.contrib.auth.models import User, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 from rest_framework import status
-from web.models import Station
+from web.models import Station, ParameterName, LatestObservation
 import json
 
 
@@ -270,4 +271,161 @@ class StationDetailViewTests(APITestCase):
         
         # Should be rejected
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertFalse(response.data['success']) 
\ No newline at end of file
+        self.assertFalse(response.data['success']) 
+
+class StationCurrentViewTests(APITestCase):
+    """Test cases for the StationCurrentView and latest observations"""
+    
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="currentuser",
+            password="currentpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.station = Station.objects.create(number=800, name="Current Station", lat=41.0, lon=69.0)
+        self.empty_station = Station.objects.create(number=801, name="Empty Station", lat=41.5, lon=69.5)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        ParameterName.objects.create(name="Shamol yo'nalishi", slug="wind_direction", unit="°")
+        
+        self.post_url = reverse('web:parameters_by_station', args=[800])
+        self.client.post(self.post_url, {'items': [
+            {'datetime': '2024-05-01 10:00:00', 'temp': 20, 'wind_direction': 90},
+            {'datetime': '2024-05-01 11:00:00', 'temp': 21, 'wind_direction': -1},
+        ]}, format='json')
+        
+        self.current_url = reverse('web:stations_current')
+    
+    def test_current_conditions(self):
+        """Test that the latest value of each parameter is returned"""
+        response = self.client.get(self.current_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        items = {item['number']: item for item in response.data['result']['items']}
+        self.assertEqual(items[800]['parameters']['temp']['value'], 21)
+        self.assertIsNone(items[800]['parameters']['wind_direction']['value'])
+        self.assertEqual(items[801]['parameters'], {})
+    
+    def test_delete_latest_falls_back(self):
+        """Test that deleting the latest parameter restores the previous one"""
+        self.client.delete(self.post_url + '?datetime=2024-05-01 11:00:00')
+        
+        latest = LatestObservation.objects.get(station=self.station, parameter_name__slug='temp')
+        self.assertEqual(latest.value, 20)
+
+
+class StationSnapshotViewTests(APITestCase):
+    """Test cases for the StationSnapshotView"""
+    
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="snapshotuser",
+            password="snapshotpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.station = Station.objects.create(number=810, name="Snapshot Station", lat=41.0, lon=69.0)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        ParameterName.objects.create(name="Namlik", slug="humidity", unit="%")
+        
+        self.client.post(reverse('web:parameters_by_station', args=[810]), {'items': [
+            {'datetime': '2024-05-01 09:30:00', 'temp': 19, 'humidity': 60},
+            {'datetime': '2024-05-01 10:00:00', 'temp': 20},
+            {'datetime': '2024-05-01 10:40:00', 'temp': 22},
+        ]}, format='json')
+        
+        self.url = reverse('web:stations_snapshot')
+    
+    def test_closest_value_per_parameter(self):
+        """Test that the closest observation on either side of the time is used"""
+        response = self.client.get(self.url, {'datetime': '2024-05-01 10:25:00'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        parameters = response.data['result']['items'][0]['parameters']
+        self.assertEqual(parameters['temp']['value'], 22)
+        self.assertEqual(parameters['humidity']['value'], 60)
+    
+    def test_tolerance_and_parameter_filter(self):
+        """Test that observations outside the tolerance are not used"""
+        response = self.client.get(self.url, {'datetime': '2024-05-01 10:25:00', 'tolerance': 30, 'parameter_name': 'humidity'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['result']['items'][0]['parameters'], {})
+    
+    def test_invalid_tolerance(self):
+        """Test validation of the tolerance parameter"""
+        response = self.client.get(self.url, {'datetime': '2024-05-01 10:25:00', 'tolerance': 'abc'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ResponseCacheTests(APITestCase):
+    """Test cases for the read endpoint response cache"""
+    
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        
+        self.user = User.objects.create_user(
+            username="responsecacheuser",
+            password="responsecachepassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        Station.objects.create(number=840, name="Cache Station", lat=41.0, lon=69.0)
+        Station.objects.create(number=841, name="Other Station", lat=41.5, lon=69.5)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        self.client.post(reverse('web:parameters_by_station', args=[840]), {'items': [
+            {'datetime': '2024-05-01 10:00:00', 'temp': 20},
+        ]}, format='json')
+    
+    def test_metadata_change_invalidates(self):
+        """Test that the station list is cached until a station changes"""
+        url = reverse('web:stations_list')
+        first = self.client.get(url)
+        second = self.client.get(url)
+        
+        self.assertEqual(first['X-Response-Cache'], 'MISS')
+        self.assertEqual(second['X-Response-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+        
+        Station.objects.create(number=842, name="New Station", lat=42.0, lon=70.0)
+        third = self.client.get(url)
+        self.assertEqual(third['X-Response-Cache'], 'MISS')
+        self.assertEqual(len(third.data['result']['items']), 3)
+    
+    def test_ingest_invalidates(self):
+        """Test that a bulk POST invalidates responses built from observations"""
+        url = reverse('web:stations_current')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Response-Cache'], 'HIT')
+        
+        self.client.post(reverse('web:parameters_by_station', args=[840]), {'items': [
+            {'datetime': '2024-05-01 11:00:00', 'temp': 25},
+        ]}, format='json')
+        
+        response = self.client.get(url)
+        self.assertEqual(response['X-Response-Cache'], 'MISS')
+        items = {item['number']: item for item in response.data['result']['items']}
+        self.assertEqual(items[840]['parameters']['temp']['value'], 25)
+    
+    def test_other_station_ingest_keeps_station_cache(self):
+        """Test that per-station responses survive ingest for another station"""
+        url = reverse('web:parameters_by_station', args=[840]) + '?start_date=2024-05-01&end_date=2024-05-02'
+        self.client.get(url)
+        
+        self.client.post(reverse('web:parameters_by_station', args=[841]), {'items': [
+            {'datetime': '2024-05-01 10:00:00', 'temp': 30},
+        ]}, format='json')
+        
+        self.assertEqual(self.client.get(url)['X-Response-Cache'], 'HIT')
+    
+    def test_query_parameters_are_normalized(self):
+        """Test that parameter order doesn't create separate cache entries"""
+        url = reverse('web:stations_snapshot')
+        self.client.get(url + '?datetime=2024-05-01 15:00:00&tolerance=60')
+        response = self.client.get(url + '?tolerance=60&datetime=2024-05-01 15:00:00')
+        
+        self.assertEqual(response['X-Response-Cache'], 'HIT')
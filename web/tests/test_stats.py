@@ -0,0 +1,212 @@
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import Station, ParameterName, Parameter, MonthlyAggregate
+from web.utils.aggregates import rebuild_monthly_aggregates
+from datetime import datetime, timedelta
+import numpy as np
+
+
+class CorrelationViewTests(APITestCase):
+    """Test cases for the CorrelationView"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="statsuser",
+            password="statspassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.stations = [
+            Station.objects.create(number=500 + i, name=f"Stats Station {i}", lat=41.0 + i, lon=69.0 + i)
+            for i in range(2)
+        ]
+        self.temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        self.humidity = ParameterName.objects.create(name="Namlik", slug="humidity", unit="%")
+
+        # 48 hourly observations: humidity mirrors temperature, second station follows the first
+        start = datetime(2023, 6, 1)
+        rows = []
+        for hour in range(48):
+            dt = start + timedelta(hours=hour)
+            temp_value = 20 + (hour % 12)
+            rows.append(Parameter(station=self.stations[0], parameter_name=self.temp, datetime=dt, value=temp_value))
+            rows.append(Parameter(station=self.stations[0], parameter_name=self.humidity, datetime=dt, value=100 - temp_value))
+            rows.append(Parameter(station=self.stations[1], parameter_name=self.temp, datetime=dt, value=temp_value * 2))
+        Parameter.objects.bulk_create(rows)
+
+        self.url = reverse('web:correlation')
+
+    def test_parameter_correlation_matrix(self):
+        """Test the full parameter matrix for a single station"""
+        response = self.client.get(self.url, {'year': 2023, 'station_number': 500})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['result']
+        self.assertEqual(set(result['parameters'].keys()), {'temp', 'humidity'})
+
+        items = {item['parameter_name']: item for item in result['items']}
+        self.assertEqual(items['Harorat']['temp'], 1.0)
+        self.assertEqual(items['Harorat']['humidity'], -1.0)
+        self.assertEqual(items['Namlik']['temp'], -1.0)
+
+    def test_station_correlation_matrix(self):
+        """Test cross-station mode for one parameter"""
+        response = self.client.get(self.url, {'year': 2023, 'mode': 'stations', 'parameter_name': 'temp'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['result']
+        self.assertEqual(set(result['stations'].keys()), {'500', '501'})
+        self.assertEqual(result['items'][0]['501'], 1.0)
+
+    def test_daily_resample(self):
+        """Test correlation on daily resampled values"""
+        response = self.client.get(self.url, {'year': 2023, 'station_number': 500, 'resample': 'day'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['result']['resample'], 'day')
+
+    def test_invalid_mode(self):
+        """Test validation of the mode parameter"""
+        response = self.client.get(self.url, {'year': 2023, 'mode': 'invalid'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StatsCacheTests(APITestCase):
+    """Test cases for the statistics result cache"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username="cacheuser",
+            password="cachepassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.station = Station.objects.create(number=600, name="Cache Station", lat=41.0, lon=69.0)
+        self.temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+        Parameter.objects.bulk_create([
+            Parameter(station=self.station, parameter_name=self.temp, datetime=datetime(2022, 3, 1) + timedelta(hours=h), value=10 + h)
+            for h in range(24)
+        ])
+
+        self.url = reverse('web:mode_stats')
+        self.params = {'year': 2022, 'station_number': 600, 'parameter_name': 'temp'}
+
+    def test_second_request_is_served_from_cache(self):
+        """Test that an identical request hits the cache"""
+        first = self.client.get(self.url, self.params)
+        second = self.client.get(self.url, self.params)
+
+        self.assertEqual(first['X-Stats-Cache'], 'MISS')
+        self.assertEqual(second['X-Stats-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_ingest_invalidates_cache(self):
+        """Test that adding parameters for the year invalidates cached results"""
+        self.client.get(self.url, self.params)
+
+        post_url = reverse('web:parameters_by_station', args=[600])
+        self.client.post(post_url, {'items': [{'datetime': '2022-03-05 10:00:00', 'temp': 99}]}, format='json')
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response['X-Stats-Cache'], 'MISS')
+
+    def test_other_year_is_not_invalidated(self):
+        """Test that ingest only invalidates the affected station/year"""
+        self.client.get(self.url, self.params)
+
+        post_url = reverse('web:parameters_by_station', args=[600])
+        self.client.post(post_url, {'items': [{'datetime': '2023-03-05 10:00:00', 'temp': 99}]}, format='json')
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response['X-Stats-Cache'], 'HIT')
+
+    def test_cache_rate_endpoint(self):
+        """Test that the hit/miss rate is exposed"""
+        response = self.client.get(reverse('web:stats_cache'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data['result'])
+
+
+class TrendViewTests(APITestCase):
+    """Test cases for the TrendView and monthly aggregates"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        self.user = User.objects.create_user(
+            username="trenduser",
+            password="trendpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.warming = Station.objects.create(number=700, name="Warming Station", lat=41.0, lon=69.0)
+        self.flat = Station.objects.create(number=701, name="Flat Station", lat=41.5, lon=69.5)
+        self.temp = ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+
+        # One observation per day for 6 years: seasonal cycle plus 0.5 °C/year on the first station
+        rows = []
+        for day in range(0, 6 * 365, 5):
+            dt = datetime(2015, 1, 1, 12) + timedelta(days=day)
+            seasonal = 10 * np.sin(2 * np.pi * dt.month / 12)
+            rows.append(Parameter(station=self.warming, parameter_name=self.temp, datetime=dt, value=seasonal + 0.5 * (dt.year - 2015)))
+            rows.append(Parameter(station=self.flat, parameter_name=self.temp, datetime=dt, value=seasonal))
+        Parameter.objects.bulk_create(rows)
+
+        rebuild_monthly_aggregates(self.warming)
+        rebuild_monthly_aggregates(self.flat)
+
+        self.url = reverse('web:trend')
+
+    def test_monthly_aggregates_built(self):
+        """Test that one aggregate per local month is stored"""
+        self.assertEqual(MonthlyAggregate.objects.filter(station=self.warming).count(), 72)
+
+    def test_trend_for_stations(self):
+        """Test that the trend is detected across stations in one request"""
+        response = self.client.get(self.url, {'parameter_name': 'temp', 'station_number': '700,701'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        items = {item['station']['number']: item for item in response.data['result']['items']}
+        self.assertTrue(items['700']['significant'])
+        self.assertAlmostEqual(items['700']['slope_per_year'], 0.5, places=2)
+        self.assertEqual(items['701']['trend'], "Stabil")
+
+    def test_ingest_refreshes_aggregates(self):
+        """Test that bulk POST updates the affected monthly aggregate"""
+        post_url = reverse('web:parameters_by_station', args=[701])
+        before = MonthlyAggregate.objects.get(station=self.flat, parameter_name=self.temp, year=2016, month=3)
+
+        self.client.post(post_url, {'items': [{'datetime': '2016-03-31 22:00:00', 'temp': 100}]}, format='json')
+
+        after = MonthlyAggregate.objects.get(station=self.flat, parameter_name=self.temp, year=2016, month=3)
+        self.assertEqual(after.count, before.count + 1)
+        self.assertEqual(after.maximum, 100)
+
+    def test_percentiles_from_sketches(self):
+        """Test that percentiles over several months and stations are answered from sketches"""
+        response = self.client.get(reverse('web:percentile'), {
+            'parameter_name': 'temp',
+            'station_number': '700,701',
+            'start': '2016-01',
+            'end': '2017-12',
+            'percentiles': '5,50,95'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['result']
+        self.assertEqual(result['months'], 24)
+
+        values = list(Parameter.objects.filter(
+            datetime__gte=datetime(2016, 1, 1) - timedelta(hours=5),
+            datetime__lt=datetime(2018, 1, 1) - timedelta(hours=5)
+        ).values_list('value', flat=True))
+        self.assertEqual(result['count'], len(values))
+        self.assertAlmostEqual(result['percentiles']['p50'], float(np.median(values)), delta=0.5)
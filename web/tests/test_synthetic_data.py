@@ -0,0 +1,58 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from web.models import Station, Parameter, LatestObservation, MonthlyAggregate
+
+
+class SyntheticDataTests(TestCase):
+    """Test cases for the synthetic observations generator"""
+
+    def generate(self, first_number, seed=0):
+        call_command(
+            'generate_synthetic_observations',
+            stations=2,
+            parameters=['temp', 'wind_direction', 'rainfall'],
+            seed=seed,
+            first_number=first_number,
+            stdout=StringIO()
+        )
+
+    def values(self, number):
+        return list(Parameter.objects.filter(station__number=number).order_by(
+            'parameter_name__slug', 'datetime'
+        ).values_list('parameter_name__slug', 'datetime', 'value'))
+
+    def test_hourly_series_with_sentinels_and_gaps(self):
+        """Test that a year of hourly data is created with calms, rainfall sentinels and gaps"""
+        self.generate(first_number=100)
+
+        self.assertEqual(Station.objects.filter(number__in=[100, 101]).count(), 2)
+        temps = Parameter.objects.filter(station__number=100, parameter_name__slug='temp')
+        self.assertGreater(temps.count(), 8000)
+        self.assertLess(temps.count(), 366 * 24)
+        self.assertTrue(Parameter.objects.filter(parameter_name__slug='wind_direction', value=-1).exists())
+        self.assertTrue(Parameter.objects.filter(parameter_name__slug='rainfall', value=-1).exists())
+
+        # Derived tables are built by the ingest hooks; a UTC year touches 13 local (UTC+5) months
+        self.assertEqual(LatestObservation.objects.filter(station__number=100).count(), 3)
+        self.assertEqual(MonthlyAggregate.objects.filter(station__number=100, parameter_name__slug='temp').count(), 13)
+
+    def test_deterministic(self):
+        """Test that the same seed produces the same series"""
+        self.generate(first_number=100)
+        first = [(slug, value) for slug, _, value in self.values(100)]
+        Station.objects.all().delete()
+
+        self.generate(first_number=100)
+        self.assertEqual([(slug, value) for slug, _, value in self.values(100)], first)
+
+        self.generate(first_number=200, seed=1)
+        self.assertNotEqual([(slug, value) for slug, _, value in self.values(200)], first)
+
+    def test_station_numbers_in_use(self):
+        """Test that existing stations are never overwritten"""
+        Station.objects.create(number=101, name="Real Station", lat=41.0, lon=69.0)
+        with self.assertRaises(CommandError):
+            self.generate(first_number=100)
+        self.assertFalse(Parameter.objects.exists())
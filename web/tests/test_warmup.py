@@ -0,0 +1,74 @@
+from datetime import datetime
+from io import StringIO
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from web.models import GeographicArea, Station, ParameterName
+from web.utils import hex_index, warmup
+from web.utils.data_version import LOCAL_OFFSET
+import json
+
+
+class WarmUpTests(APITestCase):
+    """Test cases for the worker warm-up"""
+
+    def setUp(self):
+        """Set up for the tests"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="warmupuser",
+            password="warmuppassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.area = GeographicArea.objects.create(
+            name="Warm-up Area",
+            north=42.0,
+            south=40.0,
+            east=71.0,
+            west=68.0,
+            preferred_resolution=4,
+            coordinates=json.dumps([[68.0, 40.0], [71.0, 40.0], [71.0, 42.0], [68.0, 42.0]])
+        )
+        Station.objects.create(number=830, name="Warm-up Station", lat=41.0, lon=69.5)
+        ParameterName.objects.create(name="Harorat", slug="temp", unit="°C")
+
+    def test_warm_up_builds_grids_and_primes_charts(self):
+        """Test that the warm-up builds the area's hex pyramid and caches the current charts"""
+        results = warmup.warm_up()
+
+        self.assertEqual(results['registries']['items'], 2)
+        self.assertEqual(results['hex_grids']['items'], 1)
+        self.assertEqual(results['charts']['items'], len(warmup.CHART_URL_NAMES) * len(warmup.CHART_PERIODS))
+        self.assertIn((self.area.id, self.area.updated_at, self.area.preferred_resolution), hex_index._pyramids)
+        self.assertEqual(warmup.state()['status'], warmup.WARM)
+
+        today = (datetime.utcnow() + LOCAL_OFFSET).strftime('%Y-%m-%d')
+        response = self.client.get(reverse('web:parameter_charts_avg'), {'parameter_name': 'temp', 'period': 'day', 'date': today})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Response-Cache'], 'HIT')
+
+        response = self.client.get(reverse('web:hex-grid'))
+        self.assertEqual(response['X-Response-Cache'], 'HIT')
+
+    def test_failing_step_is_recorded(self):
+        """Test that a failing step marks the warm-up degraded and the next steps still run"""
+        def broken():
+            raise RuntimeError("broken step")
+
+        with self.assertLogs('web.utils.logger', 'ERROR'):
+            results = warmup.warm_up([('broken', broken), ('hex_grids', warmup.warm_hex_grids)])
+
+        self.assertEqual(results['broken']['error'], "broken step")
+        self.assertEqual(results['hex_grids']['items'], 1)
+        state = warmup.state()
+        self.assertEqual(state['status'], warmup.DEGRADED)
+        self.assertIsNotNone(state['finished_at'])
+
+    def test_command(self):
+        """Test that the warm_up command runs the selected steps"""
+        call_command('warm_up', step=['hex_grids'], stdout=StringIO())
+        self.assertEqual(list(warmup.state()['steps']), ['hex_grids'])
@@ -1,13 +1,14 @@
 from django.urls import path
 from .views import (
     LoginView, UserMeView, 
-    StationView, StationDetailView, ParameterNameView, 
+    StationView, StationDetailView, StationCurrentView, StationSnapshotView, ParameterNameView, 
     ParametersView,
     HexGridAPIView, HexagonDataAPIView, MapView,
     ParameterScrapeView, StationParametersView,
-    ParameterChartView, ParameterAvgChartView, ParameterAllChartView
+    ParameterChartView, ParameterAvgChartView, ParameterAllChartView,
+    ProfileView
 )
-from .views.stats import StatisticsView, MonthlyStatsView, CorrelationView, ModeStatsView
+from .views.stats import StatisticsView, MonthlyStatsView, CorrelationView, ModeStatsView, StatsCacheView, TrendView, PercentileView
 
 app_name = 'web'
 
@@ -17,6 +18,8 @@ urlpatterns = [
     
     # Station endpoints
     path('stations', StationView.as_view(), name='stations_list'),
+    path('stations/current', StationCurrentView.as_view(), name='stations_current'),
+    path('stations/snapshot', StationSnapshotView.as_view(), name='stations_snapshot'),
     path('stations/<str:station_number>', StationDetailView.as_view(), name='stations_detail'),
     path('parameter-names', ParameterNameView.as_view(), name='parameter_names'),
     
@@ -42,4 +45,10 @@ urlpatterns = [
     # path('stats/monthly', MonthlyStatsView.as_view(), name='monthly_stats'),
     path('stats/correlation', CorrelationView.as_view(), name='correlation'),
     path('stats/mode', ModeStatsView.as_view(), name='mode_stats'),
+    path('stats/trend', TrendView.as_view(), name='trend'),
+    path('stats/percentile', PercentileView.as_view(), name='percentile'),
+    path('stats/cache', StatsCacheView.as_view(), name='stats_cache'),
+
+    # Stored request profiles (staff only)
+    path('profiles/<str:profile_id>', ProfileView.as_view(), name='profile'),
 ] 
\ No newline at end of file
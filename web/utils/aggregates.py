@@ -0,0 +1,130 @@
+from datetime import datetime
+import numpy as np
+from django.db.models import Min, Max, Q
+from web.models import Parameter, MonthlyAggregate
+from web.utils.data_version import LOCAL_OFFSET
+from web.utils.quantile_sketch import TDigest
+
+"""
+Monthly aggregates of parameter values.
+
+Aggregates are keyed by local (UTC+5) year and month and are recomputed from
+raw parameters for every month touched by an ingest or delete, so they always
+match the raw data and re-ingesting the same rows is harmless. Each aggregate
+also stores a t-digest of the month's values for quantile queries.
+"""
+
+# Parameters that use -1 as a "no data" / calm sentinel; these values are
+# excluded from aggregates so they don't bias monthly means
+SENTINEL_VALUES = {
+    'rainfall': -1,
+    'wind_direction': -1,
+}
+
+
+def local_months(datetimes):
+    """Get the set of local (year, month) pairs of UTC datetimes"""
+    months = set()
+    for dt in datetimes:
+        local = dt + LOCAL_OFFSET
+        months.add((local.year, local.month))
+    return months
+
+
+def month_range_utc(year, month):
+    """Get the [start, end) UTC range of a local month"""
+    start = datetime(year, month, 1) - LOCAL_OFFSET
+    if month == 12:
+        end = datetime(year + 1, 1, 1) - LOCAL_OFFSET
+    else:
+        end = datetime(year, month + 1, 1) - LOCAL_OFFSET
+    return start, end
+
+
+def sentinel_filter():
+    """Q object excluding sentinel values"""
+    excluded = Q()
+    for slug, value in SENTINEL_VALUES.items():
+        excluded |= Q(parameter_name__slug=slug, value=value)
+    return ~excluded
+
+
+def refresh_monthly_aggregates(station, datetimes):
+    """
+    Recompute the monthly aggregates of a station for the months touched by datetimes.
+
+    Args:
+        station: Station model object
+        datetimes: Iterable of UTC datetimes of changed parameters
+
+    Returns:
+        int: Number of months refreshed
+    """
+    months = local_months(datetimes)
+
+    for year, month in months:
+        start, end = month_range_utc(year, month)
+        rows = Parameter.objects.filter(
+            sentinel_filter(),
+            station=station,
+            datetime__gte=start,
+            datetime__lt=end
+        ).order_by().values_list('parameter_name_id', 'value')
+
+        data = np.array(list(rows), dtype=float).reshape(-1, 2)
+        aggregates = []
+        for parameter_name_id in np.unique(data[:, 0]):
+            values = data[data[:, 0] == parameter_name_id, 1]
+            aggregates.append(
+                MonthlyAggregate(
+                    station=station,
+                    parameter_name_id=int(parameter_name_id),
+                    year=year,
+                    month=month,
+                    count=len(values),
+                    total=float(values.sum()),
+                    minimum=float(values.min()),
+                    maximum=float(values.max()),
+                    sketch=TDigest.from_values(values).to_bytes()
+                )
+            )
+
+        # Drop aggregates of parameters that no longer have data in this month
+        MonthlyAggregate.objects.filter(station=station, year=year, month=month).exclude(
+            parameter_name_id__in=[a.parameter_name_id for a in aggregates]
+        ).delete()
+
+        if aggregates:
+            MonthlyAggregate.objects.bulk_create(
+                aggregates,
+                update_conflicts=True,
+                unique_fields=['station', 'parameter_name', 'year', 'month'],
+                update_fields=['count', 'total', 'minimum', 'maximum', 'sketch', 'updated_at']
+            )
+
+    return len(months)
+
+
+def rebuild_monthly_aggregates(station):
+    """
+    Recompute every monthly aggregate of a station from raw parameters.
+
+    Returns:
+        int: Number of months refreshed
+    """
+    bounds = Parameter.objects.filter(station=station).aggregate(first=Min('datetime'), last=Max('datetime'))
+    MonthlyAggregate.objects.filter(station=station).delete()
+    if not bounds['first']:
+        return 0
+
+    first = bounds['first'] + LOCAL_OFFSET
+    last = bounds['last'] + LOCAL_OFFSET
+
+    # One datetime per local month between the first and last parameter
+    datetimes = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        datetimes.append(datetime(year, month, 1) - LOCAL_OFFSET)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return refresh_monthly_aggregates(station, datetimes)
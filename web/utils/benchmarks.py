@@ -0,0 +1,323 @@
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timedelta
+import django
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from web.models import GeographicArea, Parameter, Station
+from web.utils.hex_frames import compute_frames, wait_for_refresh
+from web.utils.synthetic_data import LAT_RANGE, LON_RANGE, generate
+
+"""
+Benchmarks of the API hot paths.
+
+A Benchmark is one request (or the scraper ingest) run against a synthetic
+dataset. Every run starts from an empty cache, so the response cache and the
+statistics cache do not hide the cost of the view. Each result records the
+wall time statistics and the number of SQL queries; query counts are exact
+and flag regressions even on a noisy machine.
+
+Results are compared with a stored JSON baseline made with the same dataset.
+Timings only count as a regression when every timed run was slower than the
+baseline median by the threshold and the median moved by more than
+NOISE_FLOOR_MS, only with at least MIN_TIMED_RUNS runs, and only if a second
+round of runs is slow too (see rerun_slow): a burst of load on a busy machine
+is not a regression. A machine that is slower as a whole (machine_drift)
+raises the expected timings of every benchmark alike; it is reported, not
+failed, as a slower machine cannot be told from a slowdown of every path.
+"""
+
+# First UTC day of the synthetic dataset
+DATASET_START = datetime(2023, 1, 1)
+FIRST_NUMBER = 90001
+
+# Differences below this are noise, whatever the ratio
+NOISE_FLOOR_MS = 10.0
+
+# Fewer timed runs only compare query counts and statuses
+MIN_TIMED_RUNS = 3
+
+# Fewer compared benchmarks are not corrected for machine drift
+MIN_DRIFT_BENCHMARKS = 5
+
+
+class Benchmark:
+    """
+    One timed request.
+
+    Attributes:
+        name: Unique name used in results and baselines
+        url_name: Name of the URL pattern in the web namespace
+        args: URL arguments
+        params: Query parameters
+    """
+
+    def __init__(self, name, url_name, args=(), params=None):
+        self.name = name
+        self.url_name = url_name
+        self.args = args
+        self.params = params or {}
+
+    def setup(self, context):
+        pass
+
+    def run(self, context):
+        """Run the benchmark once and get the response status"""
+        response = context['client'].get(reverse(f'web:{self.url_name}', args=self.args), self.params)
+        return response.status_code, len(response.content)
+
+    def teardown(self, context):
+        pass
+
+
+class IngestBenchmark(Benchmark):
+    """Ingest one day of scraped rows for a station through ParameterScrapeView._process_weather_data"""
+
+    def __init__(self, name, day):
+        super().__init__(name, None)
+        self.day = day
+
+    def setup(self, context):
+        from web.views.parameters import ParameterScrapeView
+
+        self.view = ParameterScrapeView()
+        self.station = Station.objects.get(number=FIRST_NUMBER)
+        self.frame = scraped_frame(self.day)
+        # The generated data already covers the day; remove it so every run inserts
+        self.teardown(context)
+
+    def run(self, context):
+        added = self.view._process_weather_data(self.station, self.frame.copy())
+        return 200 if added else 204, added
+
+    def teardown(self, context):
+        # Frames are recomputed in the background after each run; don't let them overlap the next run
+        wait_for_refresh()
+        Parameter.objects.filter(
+            station=self.station,
+            datetime__gte=self.day,
+            datetime__lt=self.day + timedelta(days=1)
+        ).delete()
+
+
+def scraped_frame(day):
+    """Rows of one day as returned by weather_scraper.get_weather_data_async (values are strings)"""
+    rng = np.random.default_rng(0)
+    hours = pd.date_range(day, periods=24, freq='h')
+    directions = ['С', 'СВ', 'В', 'ЮВ', 'Ю', 'ЮЗ', 'З', 'СЗ', 'штиль']
+    return pd.DataFrame({
+        'datetime': hours,
+        'temp': [f"{v:.1f}" for v in rng.normal(20, 5, 24)],
+        'wind_speed': [f"{v} {{{v + 4}}}" for v in rng.integers(0, 10, 24)],
+        'wind_direction': rng.choice(directions, 24),
+        'pressure': [f"{v:.1f}" for v in rng.normal(730, 5, 24)],
+        'f': [str(v) for v in rng.integers(20, 90, 24)],
+        'R': ['' if i % 12 else '0.4' for i in range(24)],
+        'Te': [f"{v:.1f}" for v in rng.normal(18, 5, 24)],
+        'phenomena': ['' if i % 7 else 'пыльная буря' for i in range(24)],
+    })
+
+
+def default_benchmarks():
+    """Get the benchmarks of the main API paths"""
+    station = str(FIRST_NUMBER)
+    month = {'start_date': '2023-06-01 00:00:00', 'end_date': '2023-06-30 23:59:59'}
+    day = {'start_date': '2023-06-15 00:00:00', 'end_date': '2023-06-15 23:59:59'}
+    benchmarks = [
+        Benchmark('parameters.station', 'parameters_by_station', [station], month),
+        Benchmark('parameters.all', 'parameters_all', params=month),
+        # One day of the average station: one query averaging every parameter name per hour (TruncHour)
+        Benchmark('parameters.avg', 'parameters_by_station', ['avg'], day),
+    ]
+    for period, date in (('day', '2023-06-15'), ('month', '2023-06'), ('year', '2023')):
+        params = {'parameter_name': 'temp', 'period': period, 'date': date}
+        benchmarks += [
+            Benchmark(f'charts.station.{period}', 'parameter_charts', [station], params),
+            Benchmark(f'charts.avg.{period}', 'parameter_charts_avg', params=params),
+            Benchmark(f'charts.all.{period}', 'parameter_charts_all', params=params),
+        ]
+    benchmarks += [
+        Benchmark('stats', 'stats', params={'parameter_name': 'temp', 'year': '2023', 'station_number': station}),
+        Benchmark('stats.correlation', 'correlation', params={'year': '2023', 'station_number': station}),
+        Benchmark('hexgrid', 'hex-grid'),
+        Benchmark('hexdata.latest', 'hex-data', params={'parameter_name': 'temp'}),
+        Benchmark('hexdata.datetime', 'hex-data', params={'parameter_name': 'temp', 'datetime': '2023-06-15 12:00:00'}),
+        Benchmark('hexdata.datetime.live', 'hex-data', params={
+            'parameter_name': 'temp', 'datetime': '2023-06-15 12:00:00', 'tolerance': 30
+        }),
+        IngestBenchmark('ingest.scraper_day', DATASET_START + timedelta(days=200)),
+    ]
+    return benchmarks
+
+
+def build_dataset(stations, years, seed, resolution):
+    """Generate the benchmark dataset: synthetic observations, an area and the frame used by hexdata.datetime"""
+    generate(stations=stations, years=years, start=DATASET_START, seed=seed, first_number=FIRST_NUMBER)
+    lat_south, lat_north = LAT_RANGE
+    lon_west, lon_east = LON_RANGE
+    GeographicArea.objects.create(
+        name="Benchmark Area",
+        north=lat_north,
+        south=lat_south,
+        east=lon_east,
+        west=lon_west,
+        preferred_resolution=resolution,
+        coordinates=json.dumps([
+            [lon_west, lat_south], [lon_east, lat_south], [lon_east, lat_north], [lon_west, lat_north]
+        ])
+    )
+    # hexdata.datetime asks for 2023-06-15 12:00 local time
+    compute_frames(datetime(2023, 6, 15, 7))
+    User.objects.create_superuser(username='benchmark', password='benchmark')
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries (unlike CaptureQueriesContext, not capped at 9000)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_benchmarks(benchmarks, repeat):
+    """
+    Run benchmarks against the current database.
+
+    Returns:
+        Dictionary {name: result}
+    """
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(username='benchmark'))
+    context = {'client': client}
+
+    results = {}
+    for benchmark in benchmarks:
+        benchmark.setup(context)
+        # Warm-up run: process-level caches (hex grids, imports) are built once per worker in production too
+        cache.clear()
+        benchmark.run(context)
+        benchmark.teardown(context)
+
+        timings = []
+        for _ in range(repeat):
+            cache.clear()
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                status, size = benchmark.run(context)
+                timings.append((time.perf_counter() - started) * 1000)
+            benchmark.teardown(context)
+
+        results[benchmark.name] = {
+            'status': status,
+            'size': size,
+            'queries': queries.count,
+            'min_ms': round(min(timings), 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'runs': repeat,
+        }
+    return results
+
+
+def environment():
+    """Describe the machine and software the results were measured with"""
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def machine_drift(results, baseline):
+    """
+    Get how much slower the whole run is than the baseline.
+
+    Shared machines change speed between runs, which moves every benchmark
+    alike. The median ratio of current to baseline medians measures that
+    (1.0 if the run is not slower, or with fewer than MIN_DRIFT_BENCHMARKS
+    benchmarks to tell a slow machine from a slow benchmark).
+    """
+    ratios = [
+        result['median_ms'] / baseline[name]['median_ms']
+        for name, result in results.items()
+        if name in baseline and baseline[name]['median_ms']
+    ]
+    if len(ratios) < MIN_DRIFT_BENCHMARKS:
+        return 1.0
+    return max(1.0, statistics.median(ratios))
+
+
+def is_slower(result, before, threshold, drift=1.0):
+    """Whether the timings of result regressed against the baseline result before (see compare)"""
+    expected_ms = before['median_ms'] * drift
+    return (
+        result['runs'] >= MIN_TIMED_RUNS
+        and result['median_ms'] - expected_ms > NOISE_FLOOR_MS
+        and result['min_ms'] > expected_ms * (1 + threshold)
+    )
+
+
+def rerun_slow(benchmarks, results, baseline, threshold, repeat, drift=1.0):
+    """
+    Run the benchmarks whose timings regressed once more and keep their faster round.
+
+    Pass the drift of the first round to compare() too: the faster rounds
+    lower the median ratio and would make the other benchmarks look slower.
+
+    Returns:
+        List of the names of the benchmarks run again
+    """
+    slow = [
+        benchmark for benchmark in benchmarks
+        if benchmark.name in baseline and is_slower(results[benchmark.name], baseline[benchmark.name], threshold, drift)
+    ]
+    if not slow:
+        return []
+
+    for name, result in run_benchmarks(slow, repeat).items():
+        if result['median_ms'] < results[name]['median_ms']:
+            results[name] = result
+    return [benchmark.name for benchmark in slow]
+
+
+def compare(results, baseline, threshold, drift=None):
+    """
+    Compare results with a baseline.
+
+    A benchmark regresses if it makes more queries than the baseline, or if
+    it ran at least MIN_TIMED_RUNS times, even its fastest run is more than
+    threshold (fraction) slower than the baseline median scaled by the
+    machine drift (computed from results unless given), and the medians
+    differ by more than NOISE_FLOOR_MS.
+
+    Returns:
+        List of (name, current result, baseline result or None, list of regression messages)
+    """
+    if drift is None:
+        drift = machine_drift(results, baseline)
+    rows = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        problems = []
+        if before:
+            if result['queries'] > before['queries']:
+                problems.append(f"queries {before['queries']} -> {result['queries']}")
+            if is_slower(result, before, threshold, drift):
+                problems.append(f"median {before['median_ms']}ms -> {result['median_ms']}ms (min {result['min_ms']}ms)")
+            if result['status'] != before['status']:
+                problems.append(f"status {before['status']} -> {result['status']}")
+        rows.append((name, result, before, problems))
+    return rows
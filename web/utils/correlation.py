@@ -0,0 +1,65 @@
+import numpy as np
+
+"""
+Correlation helpers for the statistics endpoints.
+
+Observations are pivoted once into a datetime x column matrix (columns are
+parameter slugs or station numbers) and the whole correlation matrix is
+computed in a single call using pairwise-complete observations.
+"""
+
+CORRELATION_METHODS = ('pearson', 'spearman', 'kendall')
+
+# Query value -> pandas offset alias used to align timestamps
+RESAMPLE_RULES = {
+    'hour': 'h',
+    'day': 'D',
+}
+
+
+def build_observation_matrix(rows, resample=None, min_points=2):
+    """
+    Pivot (datetime, column, value) rows into a datetime x column matrix.
+
+    Args:
+        rows: Iterable of (datetime, column_key, value) tuples
+        resample: Optional key of RESAMPLE_RULES to align timestamps
+        min_points: Columns with fewer non-null values are dropped
+
+    Returns:
+        pandas DataFrame indexed by datetime with one column per key
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(list(rows), columns=['datetime', 'column', 'value'])
+    if df.empty:
+        return pd.DataFrame()
+
+    matrix = df.pivot_table(index='datetime', columns='column', values='value', aggfunc='mean')
+
+    if resample:
+        matrix = matrix.resample(RESAMPLE_RULES[resample]).mean()
+
+    counts = matrix.notna().sum()
+    return matrix.loc[:, counts[counts >= min_points].index]
+
+
+def correlation_matrix(matrix, method='pearson', min_periods=2):
+    """
+    Compute the full correlation matrix of a pivoted observation matrix.
+
+    Pairs with fewer than min_periods overlapping observations (or an
+    undefined coefficient) are reported as 0, and the diagonal is always 1.
+
+    Returns:
+        Dictionary {column: {column: rounded coefficient}}
+    """
+    corr = matrix.corr(method=method, min_periods=min_periods)
+    values = np.round(np.nan_to_num(corr.to_numpy(dtype=float), nan=0.0), 2)
+    np.fill_diagonal(values, 1.0)
+
+    columns = list(corr.columns)
+    return {
+        col: {other: float(values[i, j]) for j, other in enumerate(columns)}
+        for i, col in enumerate(columns)
+    }
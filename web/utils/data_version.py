@@ -0,0 +1,118 @@
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
+
+"""
+Data version counters used to invalidate cached results.
+
+Every scope (all observations, one station, a station/year pair, all
+stations for a year, or station and parameter metadata) has a counter stored
+in the Django cache. Ingest and delete code paths bump the counters of the
+scopes they touch, and cache keys embed the current counters, so stale
+entries are simply never read again.
+
+Inside a transaction the counters are bumped right away and again on commit:
+a result computed from pre-commit data in between could otherwise be cached
+under the new version.
+
+Counters are seeded with a nanosecond timestamp, so a counter that is
+evicted from the cache never comes back with a value used before. They are
+stored without a TTL, while every cached result has one, so a Redis running
+with maxmemory-policy volatile-lru evicts results and keeps the counters.
+
+The cache must be shared by every process (Redis in production): a counter
+bumped in a locmem cache is only seen by the process that bumped it.
+"""
+
+VERSION_KEY_PREFIX = 'data-version'
+
+# Scope bumped whenever stations, parameter names or geographic areas change
+META_SCOPE = 'meta'
+
+# Scope bumped whenever any observation changes
+DATA_SCOPE = 'data'
+
+# Observations are stored in UTC, while years and months are local (UTC+5)
+LOCAL_OFFSET = timedelta(hours=5)
+
+
+def station_scope(station_number):
+    """Scope of all observations of one station"""
+    return f"station:{station_number}"
+
+
+def station_year_scope(station_number, year):
+    """Scope of one station's observations in a local year"""
+    return f"station:{station_number}:{year}"
+
+
+def all_stations_year_scope(year):
+    """Scope of all stations' observations in a local year"""
+    return f"all:{year}"
+
+
+def _version_key(scope):
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def get_versions(*scopes):
+    """
+    Get the current version of each scope.
+
+    Returns:
+        List of versions in the same order as the scopes
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            # Seed a missing counter; if another process won the race, use its value
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def _increment(scopes):
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_versions(*scopes):
+    """Increment the version of each scope (again on commit when called inside a transaction)"""
+    scopes = set(scopes)
+    _increment(scopes)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _increment(scopes))
+
+
+def observation_scopes(station_number, datetimes):
+    """
+    Get the scopes touched by observations of a station.
+
+    Args:
+        station_number: Station number
+        datetimes: Iterable of UTC datetimes of the observations
+    """
+    years = {(dt + LOCAL_OFFSET).year for dt in datetimes if dt is not None}
+    scopes = [DATA_SCOPE, station_scope(station_number)]
+    for year in years:
+        scopes.append(station_year_scope(station_number, year))
+        scopes.append(all_stations_year_scope(year))
+    return scopes
+
+
+def bump_observation_versions(station_number, datetimes):
+    """Invalidate cached results that depend on the given observations"""
+    bump_versions(*observation_scopes(station_number, datetimes))
+
+
+def bump_meta_version():
+    """Invalidate cached results that include station or parameter metadata"""
+    bump_versions(META_SCOPE)
@@ -0,0 +1,90 @@
+import uuid
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from web.utils import warmup
+from web.utils.logger import logger
+
+"""
+Liveness and readiness checks.
+
+Liveness only means the worker answers. Readiness also needs the database
+and the cache to answer, no unapplied migrations and a finished warm-up (see
+warmup); a load balancer or the compose healthcheck uses it to route traffic
+to the container.
+
+The checks are cheap enough to run every few seconds: one SELECT 1, one cache
+set/get, and the migration plan only until it was found empty once (the code,
+and so the set of migrations, cannot change in a running process).
+"""
+
+CACHE_PING_KEY = 'health:ping'
+
+OK = 'ok'
+FAILED = 'failed'
+
+_migrated = False
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return OK
+
+
+def check_cache():
+    # A unique value, so an old entry of another process does not pass for this one
+    value = uuid.uuid4().hex
+    cache.set(CACHE_PING_KEY, value, timeout=60)
+    return OK if cache.get(CACHE_PING_KEY) == value else FAILED
+
+
+def check_migrations():
+    global _migrated
+    if not _migrated:
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        _migrated = not executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return OK if _migrated else 'pending'
+
+
+def check_warmup():
+    return warmup.state()['status']
+
+
+READINESS_CHECKS = (
+    ('database', check_database),
+    ('cache', check_cache),
+    ('migrations', check_migrations),
+    ('warmup', check_warmup),
+)
+
+# Results of each check that let the process receive traffic
+READY_RESULTS = {
+    'database': {OK},
+    'cache': {OK},
+    'migrations': {OK},
+    # A process that was never warmed (WARMUP_ON_START=False) builds its caches lazily
+    'warmup': {warmup.COLD, warmup.WARM, warmup.DEGRADED},
+}
+
+
+def readiness():
+    """
+    Run the readiness checks.
+
+    A check that raises is logged and reported as failed.
+
+    Returns:
+        tuple: (ready, {check name: result})
+    """
+    results = {}
+    for name, check in READINESS_CHECKS:
+        try:
+            results[name] = check()
+        except Exception as e:
+            logger.error(f"Readiness check {name} failed: {e}")
+            results[name] = FAILED
+    ready = all(result in READY_RESULTS[name] for name, result in results.items())
+    return ready, results
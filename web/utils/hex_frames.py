@@ -0,0 +1,287 @@
+import json
+import queue
+import threading
+from collections import defaultdict
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, Min
+from web.models import GeographicArea, HexFrame, Parameter, Station
+from web.utils.hex_index import get_hex_index
+from web.utils.idw_interpolation import IDWInterpolator
+from web.utils.logger import logger
+from web.utils.metrics import INTERPOLATION_SECONDS
+from web.utils.snapshot import snapshot_at, DEFAULT_TOLERANCE
+
+"""
+Precomputed hexagon frames.
+
+Once the observations around an hour are known, the interpolated surface of
+that hour is fully determined. The ingest hook drops the frames of every hour
+whose snapshot (observations within DEFAULT_TOLERANCE) can contain a changed
+observation and, once the ingest transaction committed, a background thread
+of the process recomputes them for every parameter name and area (see
+refresh_hex_frames_later), storing the values of the area's base hexagons as
+a float32 blob. Coarser pyramid levels are
+aggregated from the base values on read, which is a cheap bincount.
+
+/api/hexdata serves a frame when the request matches the frame's inputs (an
+exact hour, the default tolerance and the IDW settings the frame was computed
+with); any other request is interpolated live as before. Deleting or moving a
+station drops the frames of its observation period (see web.signals), and
+deleting an area or a parameter name deletes its frames.
+"""
+
+FRAME_DTYPE = np.float32
+ONE_HOUR = timedelta(hours=1)
+
+# Datetimes of committed ingests whose frames the background thread recomputes
+_refresh_queue = queue.Queue()
+_refresh_thread = None
+_refresh_lock = threading.Lock()
+
+
+def floor_hour(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def affected_hours(datetimes, tolerance=DEFAULT_TOLERANCE):
+    """
+    Get the hours whose snapshot can include an observation at one of datetimes.
+
+    Returns:
+        Sorted list of UTC hours
+    """
+    hours = set()
+    for dt in datetimes:
+        hour = floor_hour(dt - tolerance)
+        if hour < dt - tolerance:
+            hour += ONE_HOUR
+        while hour <= dt + tolerance:
+            hours.add(hour)
+            hour += ONE_HOUR
+    return sorted(hours)
+
+
+def _interpolators(hour):
+    """Get {parameter_name_id: IDWInterpolator} for the snapshot at hour"""
+    snapshot = snapshot_at(hour, tolerance=DEFAULT_TOLERANCE)
+    stations = Station.objects.in_bulk({station_id for station_id, _ in snapshot})
+
+    points = defaultdict(list)
+    for (station_id, parameter_name_id), (_, value) in snapshot.items():
+        station = stations[station_id]
+        points[parameter_name_id].append({'lat': station.lat, 'lng': station.lon, 'value': value})
+
+    return {
+        parameter_name_id: IDWInterpolator(
+            station_points,
+            value_field='value',
+            radius=settings.IDW_RADIUS_KM * 1000,
+            k=settings.IDW_NEIGHBORS or None
+        )
+        for parameter_name_id, station_points in points.items()
+    }
+
+
+def compute_frames(hour, areas=None):
+    """
+    Compute and store the frames of every parameter name at an hour.
+
+    Frames of the hour are replaced, so parameter names without observations
+    near the hour lose their frame.
+
+    Args:
+        hour: UTC datetime on the hour
+        areas: Optional list of GeographicArea objects (all if None)
+
+    Returns:
+        int: Number of frames stored
+    """
+    areas = list(GeographicArea.objects.all()) if areas is None else areas
+    interpolators = _interpolators(hour)
+
+    frames = []
+    for area in areas:
+        try:
+            index = get_hex_index(area)
+        except json.JSONDecodeError as e:
+            logger.error(f"Skipping hex frames of area {area.id}: {e}")
+            continue
+
+        for parameter_name_id, interpolator in interpolators.items():
+            with INTERPOLATION_SECONDS.labels('frame').time():
+                values = interpolator.interpolate_many(index.lats, index.lngs)
+            frames.append(HexFrame(
+                area=area,
+                resolution=index.resolution,
+                parameter_name_id=parameter_name_id,
+                hour=hour,
+                values=values.astype(FRAME_DTYPE).tobytes(),
+                stations_count=len(interpolator.values),
+                idw_radius_km=settings.IDW_RADIUS_KM,
+                idw_neighbors=settings.IDW_NEIGHBORS
+            ))
+
+    HexFrame.objects.filter(hour=hour).delete()
+    HexFrame.objects.bulk_create(frames)
+    return len(frames)
+
+
+def refresh_hex_frames(datetimes):
+    """
+    Recompute the frames affected by changed observations.
+
+    Bulk loads touching more than HEX_FRAMES_MAX_INGEST_HOURS hours only drop
+    the affected frames (requests fall back to live interpolation); the
+    build_hex_frames command recomputes them.
+
+    Args:
+        datetimes: Iterable of UTC datetimes of the changed parameters
+
+    Returns:
+        int: Number of frames stored
+    """
+    if not settings.HEX_FRAMES_ENABLED:
+        return 0
+
+    areas = list(GeographicArea.objects.all())
+    if not areas:
+        return 0
+
+    hours = affected_hours(datetimes)
+    if len(hours) > settings.HEX_FRAMES_MAX_INGEST_HOURS:
+        HexFrame.objects.filter(hour__gte=hours[0], hour__lte=hours[-1]).delete()
+        logger.info(f"Dropped hex frames from {hours[0]} to {hours[-1]}, run build_hex_frames to recompute them")
+        return 0
+
+    return sum(compute_frames(hour, areas) for hour in hours)
+
+
+def refresh_hex_frames_later(datetimes):
+    """
+    Queue the frames affected by changed observations for the background thread.
+
+    Ingest requests return without waiting for the interpolation; the hours
+    are served by live interpolation meanwhile. With
+    HEX_FRAMES_REFRESH_IN_BACKGROUND=False the frames are computed right away.
+
+    Args:
+        datetimes: Iterable of UTC datetimes of the changed parameters
+    """
+    global _refresh_thread
+
+    if not settings.HEX_FRAMES_REFRESH_IN_BACKGROUND:
+        refresh_hex_frames(datetimes)
+        return
+
+    with _refresh_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_worker, name='hex-frames', daemon=True)
+            _refresh_thread.start()
+    _refresh_queue.put(datetimes)
+
+
+def _refresh_worker():
+    while True:
+        batch = [_refresh_queue.get()]
+        # Ingests queued meanwhile (e.g. the scraper's stations) usually share their hours
+        while True:
+            try:
+                batch.append(_refresh_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        close_old_connections()
+        try:
+            hours = set()
+            for datetimes in batch:
+                ingest_hours = affected_hours(datetimes)
+                # Larger ingests only dropped their frames (see refresh_hex_frames)
+                if len(ingest_hours) <= settings.HEX_FRAMES_MAX_INGEST_HOURS:
+                    hours.update(ingest_hours)
+            if hours and settings.HEX_FRAMES_ENABLED:
+                areas = list(GeographicArea.objects.all())
+                for hour in sorted(hours):
+                    compute_frames(hour, areas)
+        except Exception:
+            logger.exception("Background hex frames refresh failed")
+        finally:
+            close_old_connections()
+            for _ in batch:
+                _refresh_queue.task_done()
+
+
+def wait_for_refresh():
+    """Block until the queued frame refreshes of this process are done"""
+    _refresh_queue.join()
+
+
+def drop_hex_frames(datetimes):
+    """
+    Delete the frames affected by changed observations.
+
+    Until refresh_hex_frames_later (or build_hex_frames) stores them again, requests
+    for those hours are interpolated live.
+
+    Args:
+        datetimes: Iterable of UTC datetimes of the changed parameters
+
+    Returns:
+        int: Number of frames deleted
+    """
+    if not settings.HEX_FRAMES_ENABLED:
+        return 0
+
+    hours = affected_hours(datetimes)
+    if not hours:
+        return 0
+    if len(hours) > settings.HEX_FRAMES_MAX_INGEST_HOURS:
+        frames = HexFrame.objects.filter(hour__gte=hours[0], hour__lte=hours[-1])
+    else:
+        frames = HexFrame.objects.filter(hour__in=hours)
+    return frames.delete()[0]
+
+
+def drop_station_frames(station):
+    """
+    Delete the frames that can include observations of a station.
+
+    Called before the station is deleted (its parameters cascade) or moved.
+
+    Returns:
+        int: Number of frames deleted
+    """
+    bounds = Parameter.objects.filter(station=station).aggregate(first=Min('datetime'), last=Max('datetime'))
+    if bounds['first'] is None:
+        return 0
+    hours = affected_hours([bounds['first'], bounds['last']])
+    return HexFrame.objects.filter(hour__gte=hours[0], hour__lte=hours[-1]).delete()[0]
+
+
+def load_frame(area, index, parameter_name, hour):
+    """
+    Get the stored base values of an area for a parameter name and hour.
+
+    Frames computed before the area was last edited, with other IDW settings
+    or for another grid are ignored.
+
+    Returns:
+        Tuple (NumPy array aligned with index.hex_ids, stations count) or None
+    """
+    frame = HexFrame.objects.filter(
+        area=area,
+        resolution=index.resolution,
+        parameter_name=parameter_name,
+        hour=hour
+    ).only('values', 'stations_count', 'idw_radius_km', 'idw_neighbors', 'updated_at').first()
+    if frame is None or frame.updated_at < area.updated_at:
+        return None
+    if frame.idw_radius_km != settings.IDW_RADIUS_KM or frame.idw_neighbors != settings.IDW_NEIGHBORS:
+        return None
+
+    values = np.frombuffer(frame.values, dtype=FRAME_DTYPE)
+    if len(values) != len(index):
+        return None
+    return values.astype(float), frame.stations_count
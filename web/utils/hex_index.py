@@ -0,0 +1,302 @@
+import json
+import math
+import threading
+import numpy as np
+from django.conf import settings
+from web.utils.idw_interpolation import generate_hexgrid, hexgrid_from_ids
+
+"""
+Cached hexagon grids with a spatial index over hexagon centroids.
+
+Generating a grid (polyfill + GeoJSON boundaries) for a whole GeographicArea is
+done once per area version and resolution and kept in process memory. Viewport
+requests then query an STRtree of centroids with the bbox grown by the largest
+centroid-to-vertex offset, which returns every cell that can intersect the
+viewport without touching the rest of the grid.
+
+A HexPyramid adds coarser levels below the area's preferred (finest)
+resolution. Coarse cells are the h3_to_parent of the fine cells, and their
+values are the mean of their children, so every level shows the same field.
+
+h3 and shapely are imported where they are used (see idw_interpolation).
+"""
+
+# Leaflet (Web Mercator, 256px tiles) ground resolution at zoom 0, meters per pixel
+METERS_PER_PIXEL_ZOOM_0 = 156543.03
+
+# {(area_id, area_updated_at, resolution): HexIndex or HexPyramid}
+_indexes = {}
+_pyramids = {}
+_lock = threading.Lock()
+
+
+def parse_bbox(value):
+    """
+    Parse a "west,south,east,north" bbox string (Leaflet's toBBoxString order).
+
+    Returns:
+        Dictionary with west, south, east, north or None if value is empty
+
+    Raises:
+        ValueError: If value is not four numbers with west <= east and south <= north
+    """
+    if not value:
+        return None
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError(f"Invalid bbox: {value}")
+    west, south, east, north = parts
+    if west > east or south > north:
+        raise ValueError(f"Invalid bbox: {value}")
+    return {'west': west, 'south': south, 'east': east, 'north': north}
+
+
+def parse_zoom(value):
+    """
+    Parse a Leaflet zoom level.
+
+    Returns:
+        int or None if value is empty
+
+    Raises:
+        ValueError: If value is not an integer between 0 and 22
+    """
+    if value in (None, ''):
+        return None
+    zoom = int(value)
+    if not 0 <= zoom <= 22:
+        raise ValueError(f"Invalid zoom: {value}")
+    return zoom
+
+
+class HexIndex:
+    """
+    Hexagon grid of one area and resolution with a centroid spatial index.
+
+    Attributes:
+        hex_ids: Array of H3 indexes
+        lats: Array of centroid latitudes
+        lngs: Array of centroid longitudes
+        features: List of GeoJSON features, aligned with hex_ids
+    """
+
+    def __init__(self, hexgrid, resolution):
+        import h3
+        import shapely
+
+        self.resolution = resolution
+        self.features = list(hexgrid['geojson']['features'])
+        self.hex_ids = np.array(hexgrid['hex_ids'], dtype=object)
+
+        # h3_to_geo returns [lat, lng]
+        centers = np.array([h3.h3_to_geo(hex_id) for hex_id in self.hex_ids], dtype=float).reshape(-1, 2)
+        self.lats = centers[:, 0]
+        self.lngs = centers[:, 1]
+        self.tree = shapely.STRtree(shapely.points(self.lngs, self.lats))
+
+        # Largest offset between a centroid and its vertices, used to grow query boxes
+        self.margin_lat = 0.0
+        self.margin_lng = 0.0
+        for feature, lat, lng in zip(self.features, self.lats, self.lngs):
+            coords = np.array(feature['geometry']['coordinates'][0])
+            self.margin_lng = max(self.margin_lng, float(np.abs(coords[:, 0] - lng).max()))
+            self.margin_lat = max(self.margin_lat, float(np.abs(coords[:, 1] - lat).max()))
+
+    def __len__(self):
+        return len(self.hex_ids)
+
+    def query(self, bbox=None):
+        """
+        Get the positions of cells that may intersect bbox (all cells if bbox is None).
+
+        Returns:
+            Sorted NumPy array of positions into hex_ids
+        """
+        if bbox is None:
+            return np.arange(len(self.hex_ids))
+        import shapely
+        box = shapely.box(
+            bbox['west'] - self.margin_lng,
+            bbox['south'] - self.margin_lat,
+            bbox['east'] + self.margin_lng,
+            bbox['north'] + self.margin_lat
+        )
+        return np.sort(self.tree.query(box))
+
+    def hexgrid(self, positions):
+        """Get a generate_hexgrid-like result for the given positions, including centroids"""
+        return {
+            'geojson': {'type': 'FeatureCollection', 'features': [self.features[i] for i in positions]},
+            'hex_ids': list(self.hex_ids[positions]),
+            'centers': (self.lats[positions], self.lngs[positions]),
+        }
+
+
+class HexPyramid:
+    """
+    Hexagon grids of one area at several resolutions.
+
+    Attributes:
+        base_resolution: Finest resolution (the area's preferred resolution)
+        levels: Dictionary {resolution: HexIndex}
+        parent_positions: Dictionary {resolution: array mapping each base cell to its cell position at that resolution}
+    """
+
+    def __init__(self, base_index, min_resolution):
+        import h3
+
+        self.base_resolution = base_index.resolution
+        self.levels = {self.base_resolution: base_index}
+        self.parent_positions = {self.base_resolution: np.arange(len(base_index))}
+
+        for resolution in range(self.base_resolution - 1, min_resolution - 1, -1):
+            parents = np.array([h3.h3_to_parent(hex_id, resolution) for hex_id in base_index.hex_ids], dtype=object)
+            unique, inverse = np.unique(parents, return_inverse=True)
+            self.levels[resolution] = HexIndex(hexgrid_from_ids(list(unique)), resolution)
+            self.parent_positions[resolution] = inverse
+
+    def resolution_for_zoom(self, zoom):
+        """
+        Get the finest resolution whose hexagons are still at least HEX_TARGET_PIXELS wide at zoom.
+
+        Returns:
+            int: Resolution (the base resolution if zoom is None)
+        """
+        if zoom is None:
+            return self.base_resolution
+        import h3
+
+        base = self.levels[self.base_resolution]
+        latitude = float(base.lats.mean()) if len(base) else 0.0
+        meters_per_pixel = METERS_PER_PIXEL_ZOOM_0 * math.cos(math.radians(latitude)) / 2 ** zoom
+
+        for resolution in sorted(self.levels, reverse=True):
+            if h3.edge_length(resolution, unit='m') * 2 / meters_per_pixel >= settings.HEX_TARGET_PIXELS:
+                return resolution
+        return min(self.levels)
+
+    def select(self, zoom=None, bbox=None):
+        """
+        Select the level for a request.
+
+        The level comes from the zoom; if it would still return more than
+        HEX_MAX_CELLS cells in the bbox, coarser levels are used.
+
+        Returns:
+            Tuple (HexIndex, positions of the cells in bbox)
+        """
+        resolution = self.resolution_for_zoom(zoom)
+        positions = self.levels[resolution].query(bbox)
+        if zoom is not None:
+            while len(positions) > settings.HEX_MAX_CELLS and resolution - 1 in self.levels:
+                resolution -= 1
+                positions = self.levels[resolution].query(bbox)
+        return self.levels[resolution], positions
+
+    def interpolate(self, resolution, positions, interpolator):
+        """
+        Get the values of cells at a resolution.
+
+        Base cells are interpolated; coarser cells get the mean of their base children.
+
+        Returns:
+            NumPy array of values aligned with positions
+        """
+        base = self.levels[self.base_resolution]
+        if resolution == self.base_resolution:
+            return interpolator.interpolate_many(base.lats[positions], base.lngs[positions])
+
+        children = self.children(resolution, positions)
+        child_values = interpolator.interpolate_many(base.lats[children], base.lngs[children])
+        return self._mean_of_children(resolution, positions, children, child_values)
+
+    def aggregate(self, resolution, positions, base_values):
+        """
+        Get the values of cells at a resolution from the values of all base cells (e.g. a stored frame).
+
+        Returns:
+            NumPy array of values aligned with positions
+        """
+        if resolution == self.base_resolution:
+            return base_values[positions]
+
+        children = self.children(resolution, positions)
+        return self._mean_of_children(resolution, positions, children, base_values[children])
+
+    def children(self, resolution, positions):
+        """Get the positions of the base cells whose parents at resolution are at positions"""
+        return np.flatnonzero(np.isin(self.parent_positions[resolution], positions))
+
+    def _mean_of_children(self, resolution, positions, children, child_values):
+        parent_positions = self.parent_positions[resolution]
+        size = len(self.levels[resolution])
+        sums = np.bincount(parent_positions[children], weights=child_values, minlength=size)
+        counts = np.bincount(parent_positions[children], minlength=size)
+        return sums[positions] / counts[positions]
+
+
+def area_polygon(area):
+    """
+    Get the polygon coordinates of an area.
+
+    Raises:
+        json.JSONDecodeError: If the stored coordinates are not valid JSON
+    """
+    return json.loads(area.coordinates) if area.coordinates else None
+
+
+def get_hex_index(area, resolution=None):
+    """
+    Get the cached HexIndex of an area, building it on first use.
+
+    The cache key includes updated_at, so editing the area in the admin builds a new grid.
+
+    Raises:
+        json.JSONDecodeError: If the stored coordinates are not valid JSON
+    """
+    resolution = area.preferred_resolution if resolution is None else resolution
+    key = (area.id, area.updated_at, resolution)
+
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+
+    bounds = {
+        'north': area.north,
+        'south': area.south,
+        'east': area.east,
+        'west': area.west,
+    }
+    index = HexIndex(generate_hexgrid(bounds, resolution, polygon_coords=area_polygon(area)), resolution)
+
+    _store(_indexes, key, index)
+    return index
+
+
+def get_hex_pyramid(area):
+    """
+    Get the cached HexPyramid of an area, building it on first use.
+
+    The pyramid spans the area's preferred resolution and HEX_PYRAMID_LEVELS coarser resolutions.
+
+    Raises:
+        json.JSONDecodeError: If the stored coordinates are not valid JSON
+    """
+    key = (area.id, area.updated_at, area.preferred_resolution)
+
+    pyramid = _pyramids.get(key)
+    if pyramid is not None:
+        return pyramid
+
+    min_resolution = max(0, area.preferred_resolution - settings.HEX_PYRAMID_LEVELS)
+    pyramid = HexPyramid(get_hex_index(area), min_resolution)
+    _store(_pyramids, key, pyramid)
+    return pyramid
+
+
+def _store(cache, key, value):
+    """Store a value for an area version, dropping values of older versions of the same area"""
+    with _lock:
+        for stale in [k for k in cache if k[0] == key[0] and k[1] != key[1]]:
+            del cache[stale]
+        cache[key] = value
@@ -1,8 +1,4 @@
 import numpy as np
-from scipy.spatial import distance
-import h3
-from shapely.geometry import Polygon, Point
-import geojson
 import json
 from web.utils.logger import logger
 
@@ -14,14 +10,37 @@ IMPORTANT NOTE ABOUT COORDINATE SYSTEMS:
 - In the database, we store coordinates as [lng, lat] for GeographicArea polygons
 
 Be careful when converting between these formats!
+
+scipy, h3, shapely and geojson are imported inside the functions that use
+them, so importing this module (the URLconf and the ingest hooks do) stays
+cheap for worker boots and management commands.
 """
 
+EARTH_RADIUS = 6371000  # meters
+
+
+def _unit_vectors(lats, lngs):
+    """Convert lat/lng in degrees to 3D unit vectors"""
+    lats = np.radians(np.asarray(lats, dtype=float))
+    lngs = np.radians(np.asarray(lngs, dtype=float))
+    return np.column_stack([
+        np.cos(lats) * np.cos(lngs),
+        np.cos(lats) * np.sin(lngs),
+        np.sin(lats)
+    ])
+
+
 class IDWInterpolator:
     """
     Inverse Distance Weighting (IDW) interpolation implementation using NumPy.
+    
+    Stations are indexed in a KD-tree over 3D unit vectors, where the straight-line
+    (chord) distance is monotonic with the great-circle distance. Each target only
+    looks at its k nearest stations within the radius, so the cost grows with
+    targets x k instead of targets x stations.
     """
     
-    def __init__(self, points, value_field='value', power=3, smoothing=0.3, radius=15000000):
+    def __init__(self, points, value_field='value', power=3, smoothing=0.3, radius=15000000, k=None):
         """
         Initialize the IDW interpolator with points and parameters.
         
@@ -31,19 +50,23 @@ class IDWInterpolator:
             power: Power parameter for IDW (increased to 3 for stronger influence of closer points)
             smoothing: Smoothing factor (reduced to 0.3 for more pronounced gradients)
             radius: Search radius in meters (increased for wider station influence)
+            k: Maximum number of nearest stations used per target (all stations if None)
         """
-        self.points = np.array([(p['lat'], p['lng']) for p in points])
-        self.values = np.array([p[value_field] for p in points])
+        self.points = np.array([(p['lat'], p['lng']) for p in points], dtype=float).reshape(-1, 2)
+        self.values = np.array([p[value_field] for p in points], dtype=float)
         self.value_field = value_field
         self.power = power
         self.smoothing = smoothing
         self.radius = radius
+        self.k = min(k, len(self.points)) if k else len(self.points)
+        from scipy.spatial import cKDTree
+        self.tree = cKDTree(_unit_vectors(self.points[:, 0], self.points[:, 1])) if len(self.points) else None
         
     def _haversine_distance(self, lat1, lng1, lat2, lng2):
         """
         Calculate haversine distance between two coordinates in meters.
         """
-        R = 6371000  # Earth radius in meters
+        R = EARTH_RADIUS
         
         # Convert to radians
         lat1, lng1, lat2, lng2 = map(np.radians, [lat1, lng1, lat2, lng2])
@@ -56,37 +79,68 @@ class IDWInterpolator:
         
         return R * c
     
-    def interpolate(self, lat, lng):
+    def _chord_radius(self):
+        """Search radius as a chord length on the unit sphere"""
+        angle = self.radius / EARTH_RADIUS
+        if angle >= np.pi:
+            return np.inf
+        # Small margin so stations exactly on the radius are still included
+        return 2 * np.sin(angle / 2) * (1 + 1e-12)
+    
+    def interpolate_many(self, lats, lngs):
         """
-        Interpolate the value at the given coordinates.
+        Interpolate the values at many coordinates at once.
         
         Args:
-            lat: Latitude of the point
-            lng: Longitude of the point
+            lats: Array of latitudes
+            lngs: Array of longitudes
             
         Returns:
-            Interpolated value
+            NumPy array of interpolated values (0 where no station is within the radius)
         """
-        # Calculate distances to all points
-        distances = np.array([self._haversine_distance(lat, lng, p[0], p[1]) for p in self.points])
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=float))
+        result = np.zeros(len(lats))
+        if self.tree is None or not len(lats):
+            return result
         
-        # If target point is the same as a known point
-        if np.any(distances < 1e-10):
-            return self.values[np.argmin(distances)]
+        # Passing k as a list always returns 2D arrays, missing neighbors are inf / len(points)
+        chords, indices = self.tree.query(
+            _unit_vectors(lats, lngs),
+            k=list(range(1, self.k + 1)),
+            distance_upper_bound=self._chord_radius()
+        )
+        found = np.isfinite(chords)
+        
+        # Convert chord lengths back to great-circle distances in meters
+        distances = np.full(chords.shape, np.inf)
+        distances[found] = 2 * EARTH_RADIUS * np.arcsin(np.minimum(chords[found] / 2, 1.0))
+        values = np.where(found, self.values[np.minimum(indices, len(self.values) - 1)], 0.0)
         
-        # Filter points within radius
-        mask = distances <= self.radius
-        if not np.any(mask):
-            return 0
-            
         # Apply IDW formula with smoothing factor
-        filtered_distances = distances[mask]
-        filtered_values = self.values[mask]
+        weights = np.where(found, 1.0 / np.power(np.where(found, distances, 0) + self.smoothing, self.power), 0.0)
+        total = weights.sum(axis=1)
+        has_neighbors = total > 0
+        result[has_neighbors] = (weights * values).sum(axis=1)[has_neighbors] / total[has_neighbors]
+        
+        # If target point is the same as a known point
+        exact = found[:, 0] & (distances[:, 0] < 1e-10)
+        result[exact] = values[exact, 0]
         
-        weights = 1.0 / np.power(filtered_distances + self.smoothing, self.power)
-        normalized_weights = weights / np.sum(weights)
+        return result
+    
+    def interpolate(self, lat, lng):
+        """
+        Interpolate the value at the given coordinates.
         
-        return np.sum(normalized_weights * filtered_values)
+        Args:
+            lat: Latitude of the point
+            lng: Longitude of the point
+            
+        Returns:
+            Interpolated value
+        """
+        return self.interpolate_many([lat], [lng])[0]
 
 def generate_hexgrid(bounds, resolution=4, optimized=True, polygon_coords=None):
     """
@@ -101,7 +155,10 @@ def generate_hexgrid(bounds, resolution=4, optimized=True, polygon_coords=None):
     Returns:
         Dictionary with hexagons as GeoJSON features and their IDs
     """
-    
+    import geojson
+    import h3
+    from shapely.geometry import Polygon, Point
+
     # Create the polygon for filtering
     if polygon_coords and len(polygon_coords) > 2:
         # Use custom polygon coordinates if provided
@@ -223,11 +280,26 @@ def generate_hexgrid(bounds, resolution=4, optimized=True, polygon_coords=None):
         center_hex = h3.geo_to_h3(center_lat, center_lng, resolution)
         filtered_hexagons = [center_hex]
     
+    return hexgrid_from_ids(filtered_hexagons)
+
+def hexgrid_from_ids(hex_ids):
+    """
+    Build GeoJSON features for a list of H3 indexes.
+    
+    Args:
+        hex_ids: Iterable of H3 indexes
+        
+    Returns:
+        Dictionary with hexagons as GeoJSON features and their IDs (same shape as generate_hexgrid)
+    """
+    import geojson
+    import h3
+
     # Convert hexagons to GeoJSON
     features = []
-    hex_ids = []
+    valid_ids = []
     
-    for hex_id in filtered_hexagons:
+    for hex_id in hex_ids:
         try:
             # Get hexagon boundary as a list of [lat, lng] pairs
             boundary = h3.h3_to_geo_boundary(hex_id)
@@ -250,7 +322,7 @@ def generate_hexgrid(bounds, resolution=4, optimized=True, polygon_coords=None):
             )
             
             features.append(feature)
-            hex_ids.append(hex_id)
+            valid_ids.append(hex_id)
         except Exception as e:
             logger.error(f"Error creating GeoJSON for hex_id {hex_id}: {e}")
             continue
@@ -260,7 +332,7 @@ def generate_hexgrid(bounds, resolution=4, optimized=True, polygon_coords=None):
     
     return {
         'geojson': feature_collection,
-        'hex_ids': hex_ids
+        'hex_ids': valid_ids
     }
 
 def calculate_ring_size(bounds, resolution):
@@ -314,34 +386,32 @@ def interpolate_hexgrid(hexgrid, interpolator):
     Interpolate values for each hexagon in the grid.
     
     Args:
-        hexgrid: Result from generate_hexgrid
+        hexgrid: Result from generate_hexgrid (optionally with precomputed 'centers' as (lats, lngs))
         interpolator: IDWInterpolator instance
         
     Returns:
         Dictionary mapping hex_ids to interpolated values
     """
-    hex_data = {}
     value_field = interpolator.value_field
+    hex_ids = hexgrid['hex_ids']
+    if not hex_ids:
+        return {}
     
-    for hex_id in hexgrid['hex_ids']:
-        try:
-            # Get the center of the hexagon
-            lat, lng = h3.h3_to_geo(hex_id)
-            
-            # Interpolate the value at this point
-            value = interpolator.interpolate(lat, lng)
-            
-            # Store the result with appropriate encoding
-            rounded_value = round(value, 2)
-            hex_data[hex_id] = {
-                value_field: rounded_value
-            }
-            
-        except Exception as e:
-            logger.error(f"Error interpolating data for hex_id {hex_id}: {e}")
-            # Provide a default value for this hexagon
-            hex_data[hex_id] = {
-                value_field: 0
-            }
+    # Get the centers of all hexagons ([lat, lng]) and interpolate them in one pass
+    if 'centers' in hexgrid:
+        lats, lngs = hexgrid['centers']
+    else:
+        import h3
+        centers = np.array([h3.h3_to_geo(hex_id) for hex_id in hex_ids])
+        lats, lngs = centers[:, 0], centers[:, 1]
+    try:
+        values = np.round(interpolator.interpolate_many(lats, lngs), 2)
+    except Exception as e:
+        logger.error(f"Error interpolating hexgrid: {e}")
+        # Provide a default value for every hexagon
+        values = np.zeros(len(hex_ids))
     
-    return hex_data 
\ No newline at end of file
+    return {
+        hex_id: {value_field: float(value)}
+        for hex_id, value in zip(hex_ids, values)
+    }
@@ -0,0 +1,53 @@
+from functools import partial
+from django.db import transaction
+from web.utils.aggregates import refresh_monthly_aggregates
+from web.utils.data_version import bump_observation_versions
+from web.utils.hex_frames import drop_hex_frames, refresh_hex_frames_later
+from web.utils.latest_observations import refresh_latest_observations
+
+"""
+Hooks run after parameters of a station are added, changed or deleted.
+
+Every code path that writes parameters (bulk POST, delete, scraper, admin)
+calls observations_changed with the affected UTC datetimes, so derived data
+stays in sync with the raw parameters.
+
+Hex frames are the exception: interpolating up to HEX_FRAMES_MAX_INGEST_HOURS
+hours for every parameter name and area takes seconds, so the stale frames
+are dropped in the transaction and, once it commits, recomputed by a
+background thread instead of the ingesting request. Requests for those hours
+are interpolated live meanwhile.
+"""
+
+
+def _clean_datetimes(datetimes):
+    """Drop missing values and convert pandas timestamps to datetimes"""
+    cleaned = set()
+    for dt in datetimes:
+        # dt != dt is True for NaT
+        if dt is None or dt != dt:
+            continue
+        if hasattr(dt, 'to_pydatetime'):
+            dt = dt.to_pydatetime()
+        cleaned.add(dt)
+    return cleaned
+
+
+def observations_changed(station, datetimes):
+    """
+    Update derived data after parameters of a station changed.
+
+    Args:
+        station: Station model object
+        datetimes: Iterable of UTC datetimes of the changed parameters
+    """
+    datetimes = _clean_datetimes(datetimes)
+    if not datetimes:
+        return
+
+    refresh_monthly_aggregates(station, datetimes)
+    refresh_latest_observations(station.id)
+    drop_hex_frames(datetimes)
+    bump_observation_versions(station.number, datetimes)
+    # A failure is logged and leaves the hours to live interpolation
+    transaction.on_commit(partial(refresh_hex_frames_later, datetimes), robust=True)
@@ -0,0 +1,64 @@
+from django.db.models import Max, Q
+from web.models import Parameter, LatestObservation
+
+"""
+Maintenance of the LatestObservation table.
+
+The latest parameter of every (station, parameter name) pair is recomputed
+from raw parameters whenever a station's parameters change, which also covers
+deletes of the latest row.
+"""
+
+
+def latest_parameter_rows(station_id):
+    """
+    Get the latest (parameter_name_id, datetime, value) rows of a station.
+
+    Uses two indexed queries: the latest datetime per parameter name, then the
+    values at those datetimes.
+    """
+    latest = Parameter.objects.filter(station_id=station_id).order_by().values(
+        'parameter_name_id'
+    ).annotate(latest=Max('datetime'))
+
+    lookup = Q()
+    for row in latest:
+        lookup |= Q(parameter_name_id=row['parameter_name_id'], datetime=row['latest'])
+    if not lookup:
+        return []
+
+    rows = {}
+    for parameter_name_id, dt, value in Parameter.objects.filter(lookup, station_id=station_id).order_by(
+        'id'
+    ).values_list('parameter_name_id', 'datetime', 'value'):
+        # Duplicate rows at the same datetime: the most recently inserted wins
+        rows[parameter_name_id] = (parameter_name_id, dt, value)
+    return list(rows.values())
+
+
+def refresh_latest_observations(station_id):
+    """
+    Upsert the latest observations of a station.
+
+    Returns:
+        int: Number of latest observations stored for the station
+    """
+    rows = latest_parameter_rows(station_id)
+    observations = [
+        LatestObservation(station_id=station_id, parameter_name_id=parameter_name_id, datetime=dt, value=value)
+        for parameter_name_id, dt, value in rows
+    ]
+
+    LatestObservation.objects.filter(station_id=station_id).exclude(
+        parameter_name_id__in=[o.parameter_name_id for o in observations]
+    ).delete()
+
+    if observations:
+        LatestObservation.objects.bulk_create(
+            observations,
+            update_conflicts=True,
+            unique_fields=['station', 'parameter_name'],
+            update_fields=['datetime', 'value', 'updated_at']
+        )
+
+    return len(observations)
@@ -0,0 +1,136 @@
+import os
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Histogram = None
+
+"""
+Prometheus metrics.
+
+Metrics are defined here and recorded by the code paths they describe: the
+request timing middleware (latency, SQL per request), the result caches, the
+single-flight coalescing, hexagon interpolation and the scraper. They are
+exposed in the Prometheus text format by the /metrics view.
+
+Under gunicorn every worker has its own counters. When the
+PROMETHEUS_MULTIPROC_DIR environment variable is set, prometheus_client
+writes the values of each process to files in that directory and render()
+merges them, so a scrape sees the whole server whichever worker answers it
+(gunicorn.conf.py clears the directory on start and marks exited workers).
+
+Without prometheus_client installed every metric is a no-op.
+"""
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Label values of requests that did not resolve to a URL pattern or used another
+# method, so clients cannot create unbounded label values
+UNRESOLVED_VIEW = '<unresolved>'
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class _NoopMetric:
+    """Stand-in accepting the calls made on Prometheus metrics"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    @contextmanager
+    def time(self):
+        yield
+
+
+def _metric(metric_class, *args, **kwargs):
+    if metric_class is None:
+        return _NoopMetric()
+    return metric_class(*args, **kwargs)
+
+
+REQUEST_SECONDS = _metric(
+    Histogram, 'panel_http_request_duration_seconds', "Request latency by URL name",
+    ['method', 'view', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_SECONDS = _metric(
+    Histogram, 'panel_http_request_db_duration_seconds', "Time spent in SQL per request by URL name",
+    ['view'], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = _metric(
+    Histogram, 'panel_http_request_db_queries', "SQL statements per request by URL name",
+    ['view'], buckets=QUERY_COUNT_BUCKETS
+)
+CACHE_REQUESTS = _metric(
+    Counter, 'panel_result_cache_requests', "Result cache lookups by cache and result (hit/miss)",
+    ['cache', 'result']
+)
+SINGLE_FLIGHT_EVENTS = _metric(
+    Counter, 'panel_single_flight_events', "Single-flight outcomes (computed, coalesced, remote_waits, fallbacks)",
+    ['event']
+)
+SINGLE_FLIGHT_WAIT_SECONDS = _metric(
+    Counter, 'panel_single_flight_wait_seconds', "Time spent waiting for coalesced computations"
+)
+INTERPOLATION_SECONDS = _metric(
+    Histogram, 'panel_interpolation_duration_seconds', "IDW interpolation time (live requests or precomputed frames)",
+    ['kind'], buckets=LATENCY_BUCKETS
+)
+SCRAPER_PAGES = _metric(
+    Counter, 'panel_scraper_pages', "Scraper page requests by result (ok, http_error, network_error)",
+    ['result']
+)
+SCRAPER_RETRIES = _metric(
+    Counter, 'panel_scraper_retries', "Scraper page requests retried after an error"
+)
+SCRAPER_PARSE_SECONDS = _metric(
+    Histogram, 'panel_scraper_parse_duration_seconds', "Time spent parsing a scraped page",
+    buckets=LATENCY_BUCKETS
+)
+SCRAPER_ROWS = _metric(
+    Counter, 'panel_scraper_rows_inserted', "Parameters inserted from scraped data by station",
+    ['station']
+)
+
+
+def available():
+    """Whether prometheus_client is installed"""
+    return Counter is not None
+
+
+def observe_request(method, view, status, seconds, db_seconds, queries):
+    """Record one served request"""
+    view = view or UNRESOLVED_VIEW
+    method = method if method in HTTP_METHODS else 'other'
+    REQUEST_SECONDS.labels(method, view, str(status)).observe(seconds)
+    REQUEST_DB_SECONDS.labels(view).observe(db_seconds)
+    REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def render():
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple (body bytes, content type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop the live-only values of an exited worker (gunicorn child_exit hook)"""
+    if available() and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
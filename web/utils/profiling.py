@@ -0,0 +1,177 @@
+import cProfile
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+
+"""
+On-demand profiling of single requests.
+
+RequestProfilingMiddleware runs a request flagged by a staff user under one of
+two profilers and stores the result in PROFILE_DIR under a profile id:
+
+- cprofile: deterministic cProfile, stored as <id>.prof (open with pstats,
+  snakeviz or `python -m pstats`). Exact call counts, but adds overhead to
+  every Python call, so absolute times of call-heavy code are inflated.
+- sample: a sampling profiler reading the stack of the request thread every
+  PROFILE_SAMPLE_INTERVAL_MS, stored as <id>.speedscope.json (open in
+  https://www.speedscope.app). Low overhead, realistic wall times.
+
+Every profile also gets <id>.json with the request, the response status and
+every SQL statement with its duration, in execution order.
+
+Profiled requests skip the response and statistics caches (see is_profiled),
+so the profile shows the work of the view instead of a cache lookup.
+"""
+
+PROFILERS = ('cprofile', 'sample')
+
+# Query parameter flagging a request (besides the X-Profile header); not part of cache keys
+PROFILE_PARAM = '_profile'
+
+# Profile ids are generated here; anything else is rejected before touching the filesystem
+PROFILE_ID_PATTERN = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+
+class SamplingProfiler:
+    """Sample the stack of one thread from a background thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def enable(self):
+        self._thread_id = threading.get_ident()
+        self._last = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._sampler.start()
+
+    def disable(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            # Weight of a sample is the time since the previous one
+            self.samples.append((stack[::-1], now - self._last))
+            self._last = now
+
+    def speedscope(self, name):
+        """Get the samples as a speedscope sampled profile"""
+        frames = []
+        frame_ids = {}
+        samples = []
+        weights = []
+        for stack, seconds in self.samples:
+            sample = []
+            for frame in stack:
+                if frame not in frame_ids:
+                    frame_ids[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                sample.append(frame_ids[frame])
+            samples.append(sample)
+            weights.append(round(seconds * 1000, 3))
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'panel-back',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(weights), 3),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+class QueryRecorder:
+    """Database execute wrapper keeping every statement with its duration"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({'ms': round((time.perf_counter() - started) * 1000, 3), 'sql': sql, 'many': many})
+
+
+def mark_profiled(request):
+    request._profiling = True
+
+
+def is_profiled(request):
+    """Whether the request (Django or DRF) is being profiled"""
+    return getattr(request, '_profiling', False)
+
+
+def new_profile_id():
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def create_profiler(kind):
+    if kind == 'sample':
+        return SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    return cProfile.Profile()
+
+
+def save_profile(profile_id, kind, profiler, record):
+    """
+    Write a finished profile and its request record to PROFILE_DIR.
+
+    Returns:
+        Dictionary {file kind: path}
+    """
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {'sql': directory / f"{profile_id}.json"}
+    if kind == 'sample':
+        paths['profile'] = directory / f"{profile_id}.speedscope.json"
+        paths['profile'].write_text(json.dumps(profiler.speedscope(f"{record['method']} {record['path']}")))
+    else:
+        paths['profile'] = directory / f"{profile_id}.prof"
+        profiler.dump_stats(paths['profile'])
+    paths['sql'].write_text(json.dumps(record, ensure_ascii=False, indent=1, default=str))
+    return paths
+
+
+def profile_path(profile_id, file):
+    """
+    Get the path of a stored profile file.
+
+    Args:
+        profile_id: Profile id from the X-Profile-Id header
+        file: 'profile' or 'sql'
+
+    Returns:
+        Path or None if the id is invalid or the file does not exist
+    """
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    directory = Path(settings.PROFILE_DIR)
+    if file == 'sql':
+        candidates = [directory / f"{profile_id}.json"]
+    else:
+        candidates = [directory / f"{profile_id}.prof", directory / f"{profile_id}.speedscope.json"]
+    return next((path for path in candidates if path.exists()), None)
@@ -0,0 +1,151 @@
+import math
+import numpy as np
+
+"""
+Mergeable quantile sketch (merging t-digest, Dunning & Ertl).
+
+A digest summarizes a set of values as a small number of weighted centroids.
+Centroids near the tails are kept small, so extreme quantiles (p5, p95) stay
+accurate. Digests of disjoint sets can be merged, which lets quantiles of any
+combination of months and stations be answered from stored digests.
+"""
+
+DEFAULT_COMPRESSION = 100
+
+
+def _k(q, compression):
+    """Scale function k1: maps quantile to index space"""
+    return compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+def _k_inverse(k, compression):
+    """Inverse of the scale function"""
+    if k >= compression / 4:
+        return 1.0
+    return (math.sin(k * 2 * math.pi / compression) + 1) / 2
+
+
+class TDigest:
+    """
+    Merging t-digest.
+
+    Attributes:
+        means: Array of centroid means, sorted ascending
+        weights: Array of centroid weights
+        minimum: Smallest value seen
+        maximum: Largest value seen
+    """
+
+    def __init__(self, means=None, weights=None, minimum=None, maximum=None, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        """Build a digest from raw values"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return cls(compression=compression)
+
+        digest = cls(values, np.ones(len(values)), float(values.min()), float(values.max()), compression)
+        digest._compress()
+        return digest
+
+    @classmethod
+    def merge(cls, digests, compression=DEFAULT_COMPRESSION):
+        """Merge several digests into a new one"""
+        digests = [d for d in digests if len(d.means)]
+        if not digests:
+            return cls(compression=compression)
+
+        digest = cls(
+            np.concatenate([d.means for d in digests]),
+            np.concatenate([d.weights for d in digests]),
+            min(d.minimum for d in digests),
+            max(d.maximum for d in digests),
+            compression
+        )
+        digest._compress()
+        return digest
+
+    def _compress(self):
+        """Merge adjacent centroids while they stay within the scale function limits"""
+        order = np.argsort(self.means, kind='mergesort')
+        means = self.means[order]
+        weights = self.weights[order]
+        total = weights.sum()
+
+        new_means = []
+        new_weights = []
+        current_mean = means[0]
+        current_weight = weights[0]
+        weight_so_far = 0.0
+        weight_limit = total * _k_inverse(_k(0.0, self.compression) + 1, self.compression)
+
+        for mean, weight in zip(means[1:], weights[1:]):
+            if weight_so_far + current_weight + weight <= weight_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                weight_so_far += current_weight
+                new_means.append(current_mean)
+                new_weights.append(current_weight)
+                weight_limit = total * _k_inverse(
+                    _k(min(weight_so_far / total, 1.0), self.compression) + 1, self.compression
+                )
+                current_mean = mean
+                current_weight = weight
+
+        new_means.append(current_mean)
+        new_weights.append(current_weight)
+
+        self.means = np.array(new_means)
+        self.weights = np.array(new_weights)
+
+    def quantile(self, q):
+        """
+        Estimate the q-th quantile (0 <= q <= 1).
+
+        Returns:
+            float or None if the digest is empty
+        """
+        if not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+
+        total = self.weights.sum()
+        target = q * total
+        # Cumulative weight at the center of each centroid
+        centers = np.cumsum(self.weights) - self.weights / 2
+
+        if target <= centers[0]:
+            return float(self.minimum + (self.means[0] - self.minimum) * target / centers[0])
+        if target >= centers[-1]:
+            tail = total - centers[-1]
+            return float(self.means[-1] + (self.maximum - self.means[-1]) * (target - centers[-1]) / tail)
+        return float(np.interp(target, centers, self.means))
+
+    def to_bytes(self):
+        """Serialize to bytes: [compression, minimum, maximum, mean0, weight0, ...] as float64"""
+        header = [self.compression, self.minimum, self.maximum] if len(self.means) else [self.compression, np.nan, np.nan]
+        body = np.column_stack([self.means, self.weights]).ravel() if len(self.means) else []
+        return np.concatenate([header, body]).astype('<f8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserialize a digest produced by to_bytes"""
+        array = np.frombuffer(bytes(data), dtype='<f8')
+        compression = int(array[0])
+        if len(array) <= 3:
+            return cls(compression=compression)
+        pairs = array[3:].reshape(-1, 2)
+        return cls(pairs[:, 0], pairs[:, 1], float(array[1]), float(array[2]), compression)
@@ -0,0 +1,150 @@
+import threading
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from web.models import Station, ParameterName
+from web.utils.data_version import META_SCOPE, get_versions
+
+"""
+Process-local registries of the station and parameter name tables.
+
+Nearly every request resolves a parameter name slug or a station number, and
+some need the whole table. Both tables have a handful of rows and rarely
+change, so each process keeps a copy indexed by id and by its natural key and
+answers these lookups without a query.
+
+A copy is valid for one version of the metadata scope (see data_version),
+which the signals bump on every save and delete in any process; each lookup
+checks the version (one cache read) and reloads the table when it moved.
+The signals also clear the local copy right away. A value missing from the
+copy is looked up in the database once before it is reported missing, so a
+row added by a process whose version bump this one cannot see (e.g. with a
+per-process locmem cache) is still found, and the copy is reloaded.
+
+While the current thread has uncommitted writes to a table, its lookups go
+to the database: a copy loaded then could keep rows of a transaction that is
+rolled back later.
+
+The returned instances are shared between requests and threads: read them,
+never modify or save them (load a fresh instance to update a row).
+"""
+
+
+class ModelRegistry:
+    """
+    Cached rows of one model.
+
+    Attributes:
+        model: Model class
+        keys: Indexed field names, e.g. ('id', 'number')
+    """
+
+    def __init__(self, model, *keys):
+        self.model = model
+        self.keys = ('id',) + tuple(key for key in keys if key != 'id')
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _load(self):
+        version = get_versions(META_SCOPE)[0]
+        rows = list(self.model.objects.order_by('pk'))
+        indexes = {key: {getattr(row, key): row for row in rows} for key in self.keys}
+        return {'version': version, 'rows': rows, 'indexes': indexes}
+
+    def _has_uncommitted_writes(self):
+        if not getattr(self._local, 'uncommitted', False):
+            return False
+        if not connection.in_atomic_block:
+            # The transaction ended; if it was rolled back, nothing was stored meanwhile
+            self._local.uncommitted = False
+            return False
+        return True
+
+    def _current(self):
+        """Get the snapshot of the current version, or None if lookups must go to the database"""
+        if self._has_uncommitted_writes():
+            return None
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot['version'] == get_versions(META_SCOPE)[0]:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._load()
+            self._snapshot = snapshot
+        return snapshot
+
+    def _clean(self, key, value):
+        """Convert a lookup value like the database would (e.g. '700' for an integer field)"""
+        try:
+            return self.model._meta.get_field(key).to_python(value)
+        except ValidationError:
+            return None
+
+    def get(self, **lookup):
+        """
+        Get the row matching one indexed field, e.g. get(slug='temp').
+
+        Raises:
+            model.DoesNotExist: If no row matches (also for values of the wrong type)
+        """
+        (key, value), = lookup.items()
+        if key not in self.keys:
+            raise ValueError(f"{self.model.__name__} registry has no index on {key}")
+
+        value = self._clean(key, value)
+        snapshot = self._current()
+        if snapshot is None:
+            return self.model.objects.get(**{key: value})
+        row = snapshot['indexes'][key].get(value)
+        if row is None and value is not None:
+            row = self._missing({value}, key).get(value)
+        if row is None:
+            raise self.model.DoesNotExist(f"{self.model.__name__} matching {key}={value!r} does not exist.")
+        return row
+
+    def in_bulk(self, values, field='id'):
+        """Get {value: row} of the rows whose field is one of values, like QuerySet.in_bulk"""
+        if field not in self.keys:
+            raise ValueError(f"{self.model.__name__} registry has no index on {field}")
+
+        values = {self._clean(field, value) for value in values} - {None}
+        snapshot = self._current()
+        if snapshot is None:
+            return self.model.objects.in_bulk(values, field_name=field)
+        index = snapshot['indexes'][field]
+        rows = {value: index[value] for value in values if value in index}
+        if len(rows) < len(values):
+            rows.update(self._missing(values - rows.keys(), field))
+        return rows
+
+    def _missing(self, values, field):
+        """Look up values missing from the copy in the database; drop the copy if any of them exists"""
+        rows = self.model.objects.in_bulk(values, field_name=field)
+        if rows:
+            self._snapshot = None
+        return rows
+
+    def all(self):
+        """Get all rows ordered by id"""
+        snapshot = self._current()
+        if snapshot is None:
+            return list(self.model.objects.order_by('pk'))
+        return list(snapshot['rows'])
+
+    def changed(self):
+        """Drop the local copy after a save or delete (called by the signals)"""
+        self._snapshot = None
+        if connection.in_atomic_block:
+            self._local.uncommitted = True
+            transaction.on_commit(self._committed)
+
+    def _committed(self):
+        self._local.uncommitted = False
+        self._snapshot = None
+
+
+stations = ModelRegistry(Station, 'number')
+parameter_names = ModelRegistry(ParameterName, 'slug')
+
+REGISTRIES = {Station: stations, ParameterName: parameter_names}
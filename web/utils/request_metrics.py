@@ -0,0 +1,91 @@
+import contextvars
+import heapq
+import itertools
+import time
+
+"""
+Measurements of the request being served.
+
+RequestTimingMiddleware creates a RequestMetrics object per request and makes
+it current for the thread (or task) serving it. The object is also a database
+execute wrapper, so it sees every query of the request; code that wants to
+report something per request (cache lookups, render time) records it on the
+current object, which is a no-op outside a request.
+"""
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Timings and counters of one request.
+
+    Attributes:
+        queries: Number of SQL statements executed
+        db_seconds: Time spent executing them
+        render_seconds: Time spent rendering (serializing) the response
+        cache_hits: Result cache hits (response and statistics caches)
+        cache_misses: Result cache misses
+    """
+
+    def __init__(self, slow_sql_count=5):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._slow_sql_count = slow_sql_count
+        # Min-heap of (seconds, order, sql) holding the slowest statements
+        self._slowest = []
+        self._order = itertools.count()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - started)
+
+    def record_query(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if self._slow_sql_count <= 0:
+            return
+        entry = (seconds, next(self._order), sql)
+        if len(self._slowest) < self._slow_sql_count:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_queries(self):
+        """Get [(milliseconds, sql)] of the slowest statements, slowest first"""
+        return [(round(seconds * 1000, 2), sql) for seconds, _, sql in sorted(self._slowest, reverse=True)]
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Get the RequestMetrics of the request being served, or None"""
+    return _current.get()
+
+
+def activate(metrics):
+    """Make metrics current; pass the returned token to deactivate"""
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def record_cache(hit):
+    """Count a result cache lookup on the current request"""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
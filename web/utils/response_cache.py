@@ -0,0 +1,143 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from .response_utils import custom_response
+from .stats_cache import StatsCacheCounters
+from .single_flight import single_flight
+from .data_version import META_SCOPE, DATA_SCOPE, get_versions, station_scope
+from .profiling import PROFILE_PARAM, is_profiled
+
+"""
+Response cache for read endpoints.
+
+A successful response is cached under the request path, the normalized query
+parameters and the current versions of the data scopes it depends on. Ingest
+and delete paths bump those versions (see data_version), so a cached response
+is never served after its inputs changed and no TTL has to be guessed.
+RESPONSE_CACHE_TIMEOUT only bounds how long unreachable old versions occupy
+the cache.
+
+Expensive endpoints can also coalesce misses: concurrent identical requests
+wait for one computation (see single_flight) instead of each running the view.
+
+Profiled requests (see profiling) run the view without reading or storing the
+cache (X-Response-Cache: BYPASS).
+"""
+
+CACHE_KEY_PREFIX = 'response'
+CACHE_HEADER = 'X-Response-Cache'
+
+counters = StatsCacheCounters('response')
+
+
+def metadata_scopes(request, kwargs):
+    """Results built from stations, parameter names or areas only"""
+    return [META_SCOPE]
+
+
+def data_scopes(request, kwargs):
+    """Results built from observations of any station"""
+    return [DATA_SCOPE, META_SCOPE]
+
+
+def station_data_scopes(request, kwargs):
+    """Results built from observations of the station in the URL ('avg' is the virtual average of all stations)"""
+    if kwargs['station_number'] == 'avg':
+        return [DATA_SCOPE, META_SCOPE]
+    return [station_scope(kwargs['station_number']), META_SCOPE]
+
+
+def build_cache_key(endpoint, request, kwargs, scopes):
+    """
+    Build the cache key of a request.
+
+    Query parameters are sorted and stripped, so parameter order and
+    surrounding whitespace don't create separate entries; the profiling flag
+    is left out.
+    """
+    params = sorted(
+        (name, [value.strip() for value in values])
+        for name, values in request.query_params.lists()
+        if name != PROFILE_PARAM
+    )
+    digest = hashlib.md5(f"{request.path}?{params}".encode('utf-8')).hexdigest()
+    versions = ':'.join(str(version) for version in get_versions(*scopes(request, kwargs)))
+    return f"{CACHE_KEY_PREFIX}:{endpoint}:{digest}:{versions}"
+
+
+def cached_response(endpoint, scopes=data_scopes, coalesce=False):
+    """
+    Decorator caching the envelope of a read view's get method.
+
+    Args:
+        endpoint: Endpoint name used in cache keys
+        scopes: Callable (request, kwargs) -> data version scopes the response depends on
+        coalesce: If True, concurrent misses for the same key run the view once
+
+    Only successful responses are cached. The X-Response-Cache header reports
+    whether the response was served from the cache (HIT), computed (MISS),
+    taken from a concurrent identical request (COALESCED) or computed for a
+    profiled request without the cache (BYPASS).
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if is_profiled(request):
+                response = view_method(self, request, *args, **kwargs)
+                response[CACHE_HEADER] = 'BYPASS'
+                return response
+
+            key = build_cache_key(endpoint, request, kwargs, scopes)
+            cached = cache.get(key)
+            if cached is not None:
+                counters.hit()
+                response = custom_response(data=cached['result'], detail=cached['detail'], status_code=status.HTTP_200_OK)
+                response[CACHE_HEADER] = 'HIT'
+                return response
+
+            counters.miss()
+            if not coalesce:
+                response = view_method(self, request, *args, **kwargs)
+                _store(key, response)
+                response[CACHE_HEADER] = 'MISS'
+                return response
+
+            own = {}
+
+            def compute():
+                response = view_method(self, request, *args, **kwargs)
+                _store(key, response)
+                own['response'] = response
+                return {'status': response.status_code, 'data': response.data}
+
+            def lookup():
+                cached = cache.get(key)
+                if cached is None:
+                    return None
+                return {'status': status.HTTP_200_OK, 'data': custom_response(data=cached['result'], detail=cached['detail']).data}
+
+            shared = single_flight(key, compute, lookup)
+            if 'response' in own:
+                response = own['response']
+                response[CACHE_HEADER] = 'MISS'
+            else:
+                response = Response(shared['data'], status=shared['status'])
+                response[CACHE_HEADER] = 'COALESCED'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _store(key, response):
+    """Cache a successful response envelope"""
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(
+            key,
+            {'result': response.data['result'], 'detail': response.data['detail']},
+            timeout=settings.RESPONSE_CACHE_TIMEOUT
+        )
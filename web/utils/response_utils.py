@@ -1,12 +1,15 @@
+import sys
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
 
 def custom_response(data=None, detail=None, status_code=status.HTTP_200_OK, success=True):
     """
     Create a standardized response format for all API endpoints
     
     Parameters:
-    - data: The result payload to return (default: None)
+    - data: The result payload to return (default: None). May contain NumPy
+      arrays/scalars and pandas objects; renderers convert them (see to_builtin)
     - detail: Error message or detail information (default: None)
     - status_code: HTTP status code (default: 200)
     - success: Boolean indicating if the request was successful (default: True)
@@ -26,4 +29,47 @@ def custom_response(data=None, detail=None, status_code=status.HTTP_200_OK, succ
         'detail': detail
     }
     
-    return Response(response_data, status=status_code) 
\ No newline at end of file
+    return Response(response_data, status=status_code)
+
+
+def to_builtin(obj):
+    """
+    Convert a NumPy or pandas object to built-in Python types (one level; containers keep their items).
+
+    NumPy arrays become lists, NumPy scalars Python scalars, DataFrames a list of
+    record dicts, Series/Index lists and Timestamps datetimes. NaN/NaT in pandas
+    objects become None. Other objects are returned unchanged.
+    """
+    # Without these modules imported, obj can't be one of their types
+    pd = sys.modules.get('pandas')
+    np = sys.modules.get('numpy')
+
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            frame = obj.astype(object).where(obj.notna(), None)
+            return frame.to_dict('records')
+        if isinstance(obj, (pd.Series, pd.Index)):
+            return obj.astype(object).where(obj.notna(), None).tolist()
+        if obj is pd.NaT or obj is pd.NA:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.to_pydatetime()
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    return obj
+
+
+def json_default(obj):
+    """
+    Default hook for JSON/MessagePack encoders.
+
+    Handles NumPy and pandas objects, then falls back to DRF's JSONEncoder
+    (datetimes, Decimal, UUID, lazy strings, querysets, ...).
+    """
+    converted = to_builtin(obj)
+    if converted is not obj:
+        return converted
+    return JSONEncoder().default(obj)
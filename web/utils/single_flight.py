@@ -0,0 +1,156 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from django.conf import settings
+from django.core.cache import cache
+from .metrics import SINGLE_FLIGHT_EVENTS, SINGLE_FLIGHT_WAIT_SECONDS
+
+"""
+Single-flight execution of identical expensive requests.
+
+Within a process, the first caller for a key (the leader) computes the value
+and concurrent callers wait on its Future. Across processes, the leader also
+takes a lock in the shared cache; leaders of other processes then poll the
+cache for the stored result instead of computing it again. If the leader or
+the lock holder fails, or the wait times out, the caller computes the value
+itself, so coalescing never turns into an error: only the caller whose own
+computation failed gets its exception.
+"""
+
+LOCK_KEY_PREFIX = 'single-flight'
+
+
+class SingleFlightMetrics:
+    """Process-local coalescing counters (mirrored to the Prometheus single-flight counters)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.computed = 0
+            self.coalesced = 0
+            self.remote_waits = 0
+            self.fallbacks = 0
+            self.wait_seconds = 0.0
+
+    def add(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+        if name == 'wait_seconds':
+            SINGLE_FLIGHT_WAIT_SECONDS.inc(amount)
+        else:
+            SINGLE_FLIGHT_EVENTS.labels(name).inc(amount)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'computed': self.computed,
+                'coalesced': self.coalesced,
+                'remote_waits': self.remote_waits,
+                'fallbacks': self.fallbacks,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+
+metrics = SingleFlightMetrics()
+
+# {key: Future} of computations in progress in this process
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _wait_for_remote(key, lookup):
+    """
+    Wait for another process holding the lock of key to store its result.
+
+    Returns:
+        The stored value or None if the lock was released without a result or the wait timed out
+    """
+    lock_key = f"{LOCK_KEY_PREFIX}:{key}"
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+        value = lookup()
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            # Released without a result; check once more in case it was stored just before release
+            return lookup()
+    return None
+
+
+def _compute_with_lock(key, compute, lookup):
+    """Compute the value while holding the cross-process lock, or wait for the process that holds it"""
+    lock_key = f"{LOCK_KEY_PREFIX}:{key}"
+    token = uuid.uuid4().hex
+
+    if not cache.add(lock_key, token, timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT):
+        started = time.monotonic()
+        value = _wait_for_remote(key, lookup)
+        metrics.add('wait_seconds', time.monotonic() - started)
+        if value is not None:
+            metrics.add('remote_waits')
+            return value
+        metrics.add('fallbacks')
+        metrics.add('computed')
+        return compute()
+
+    try:
+        metrics.add('computed')
+        return compute()
+    finally:
+        # Only release our own lock (it may have expired and been taken by another process)
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def single_flight(key, compute, lookup):
+    """
+    Run compute once for concurrent callers of the same key.
+
+    Args:
+        key: Key identifying the computation (e.g. the response cache key)
+        compute: Callable computing the value; it should store the value where lookup finds it
+        lookup: Callable returning the stored value or None
+
+    Returns:
+        The value computed by this caller, another thread or another process
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _in_flight[key] = future
+
+    if not leader:
+        started = time.monotonic()
+        try:
+            value = future.result(timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT)
+            metrics.add('coalesced')
+            return value
+        except FutureTimeoutError:
+            metrics.add('fallbacks')
+            metrics.add('computed')
+            return compute()
+        except Exception:
+            # The leader failed; its exception is reported to the leader's caller
+            metrics.add('fallbacks')
+            metrics.add('computed')
+            return compute()
+        finally:
+            metrics.add('wait_seconds', time.monotonic() - started)
+
+    try:
+        value = _compute_with_lock(key, compute, lookup)
+        future.set_result(value)
+        return value
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from web.models import Parameter
+
+"""
+"Snapshot at time T" queries.
+
+For each (station, parameter name) the observation closest to T within a
+tolerance is found with two window-function queries: the last observation at
+or before T and the first one at or after T. Each side is a seek on the
+(station, parameter_name, datetime) index, so only two rows per pair leave the
+database instead of every row in the window.
+"""
+
+DEFAULT_TOLERANCE = timedelta(hours=1)
+MAX_TOLERANCE = timedelta(days=1)
+
+
+def parse_tolerance(value):
+    """
+    Parse a tolerance given in minutes.
+
+    Returns:
+        timedelta (DEFAULT_TOLERANCE if value is empty)
+
+    Raises:
+        ValueError: If value is not a positive number of minutes up to MAX_TOLERANCE
+    """
+    if value in (None, ''):
+        return DEFAULT_TOLERANCE
+    tolerance = timedelta(minutes=int(value))
+    if tolerance <= timedelta(0) or tolerance > MAX_TOLERANCE:
+        raise ValueError(f"Tolerance out of range: {value}")
+    return tolerance
+
+
+def _nearest_on_side(base_filters, descending):
+    """Rank observations on one side of T and keep the nearest per (station, parameter name)"""
+    order = F('datetime').desc() if descending else F('datetime').asc()
+    return Parameter.objects.filter(base_filters).order_by().annotate(
+        rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('station_id'), F('parameter_name_id')],
+            order_by=[order, F('id').desc()]
+        )
+    ).filter(rank=1).values_list('station_id', 'parameter_name_id', 'datetime', 'value')
+
+
+def snapshot_at(target, parameter_names=None, tolerance=DEFAULT_TOLERANCE, station_ids=None):
+    """
+    Get the observation closest to target for each station and parameter name.
+
+    Args:
+        target: UTC datetime
+        parameter_names: Optional iterable of ParameterName objects or ids (all if None)
+        tolerance: Maximum distance from target (timedelta)
+        station_ids: Optional iterable of station ids (all if None)
+
+    Returns:
+        Dictionary {(station_id, parameter_name_id): (datetime, value)}
+    """
+    filters = Q()
+    if parameter_names is not None:
+        filters &= Q(parameter_name__in=list(parameter_names))
+    if station_ids is not None:
+        filters &= Q(station_id__in=list(station_ids))
+
+    before = _nearest_on_side(filters & Q(datetime__gte=target - tolerance, datetime__lte=target), descending=True)
+    after = _nearest_on_side(filters & Q(datetime__gt=target, datetime__lte=target + tolerance), descending=False)
+
+    snapshot = {}
+    for station_id, parameter_name_id, dt, value in list(before) + list(after):
+        key = (station_id, parameter_name_id)
+        # On equal distance the observation before target wins
+        if key not in snapshot or abs(dt - target) < abs(snapshot[key][0] - target):
+            snapshot[key] = (dt, value)
+
+    return snapshot
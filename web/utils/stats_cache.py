@@ -0,0 +1,161 @@
+import hashlib
+import threading
+from datetime import datetime
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from .response_utils import custom_response
+from .request_metrics import record_cache
+from .metrics import CACHE_REQUESTS
+from .profiling import is_profiled
+from .data_version import (
+    META_SCOPE, LOCAL_OFFSET, get_versions, station_year_scope, all_stations_year_scope
+)
+
+"""
+Result cache for the statistics endpoints.
+
+Results are keyed by (endpoint, station, year, options) plus the data versions
+of the station/year (or all stations/year) scope and of the metadata scope.
+Past years get a long TTL (STATS_CACHE_PAST_YEAR_TIMEOUT) because their
+inputs only change when data is back-edited, which bumps the data version;
+the TTL only lets Redis evict them under memory pressure.
+"""
+
+CACHE_KEY_PREFIX = 'stats-result'
+CACHE_HEADER = 'X-Stats-Cache'
+
+
+class StatsCacheCounters:
+    """
+    Process-local hit/miss counters.
+
+    Lookups are also counted on the current request and in the Prometheus
+    cache counter under the given cache name.
+    """
+
+    def __init__(self, name='stats'):
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+        record_cache(True)
+        CACHE_REQUESTS.labels(self.name, 'hit').inc()
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+        record_cache(False)
+        CACHE_REQUESTS.labels(self.name, 'miss').inc()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else None
+            }
+
+
+counters = StatsCacheCounters()
+
+
+def _normalize(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def _station_number(params):
+    return params.get('station_number')
+
+
+def build_cache_key(endpoint, params, options=(), station=_station_number):
+    """
+    Build the cache key for a statistics request.
+
+    Args:
+        endpoint: Endpoint name
+        params: Query parameters of the request
+        options: Query parameter names that change the result
+        station: Callable returning the station number from the params,
+            or None when the result covers all stations
+
+    Returns:
+        tuple: (cache key, year) or None if the request cannot be cached
+    """
+    try:
+        year = int(params.get('year'))
+    except (TypeError, ValueError):
+        return None
+
+    station_number = _normalize(station(params))
+    if station_number:
+        data_scope = station_year_scope(station_number, year)
+    else:
+        station_number = 'all'
+        data_scope = all_stations_year_scope(year)
+
+    data_version, meta_version = get_versions(data_scope, META_SCOPE)
+    option_values = '|'.join(f"{name}={_normalize(params.get(name, ''))}" for name in sorted(options))
+    digest = hashlib.md5(option_values.encode('utf-8')).hexdigest()
+
+    key = f"{CACHE_KEY_PREFIX}:{endpoint}:{station_number}:{year}:{digest}:{data_version}:{meta_version}"
+    return key, year
+
+
+def cache_timeout(year):
+    """Past years are kept until invalidated (or evicted), the current year expires soon"""
+    current_year = (datetime.utcnow() + LOCAL_OFFSET).year
+    if year < current_year:
+        return settings.STATS_CACHE_PAST_YEAR_TIMEOUT
+    return settings.STATS_CACHE_CURRENT_YEAR_TIMEOUT
+
+
+def cached_stats(endpoint, options=(), station=_station_number):
+    """
+    Decorator caching the result of a statistics view's get method.
+
+    Only successful responses are cached. The X-Stats-Cache header reports
+    whether the response was served from the cache; profiled requests skip it
+    (BYPASS).
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if is_profiled(request):
+                response = view_method(self, request, *args, **kwargs)
+                response[CACHE_HEADER] = 'BYPASS'
+                return response
+
+            key_info = build_cache_key(endpoint, request.query_params, options, station)
+            if key_info is None:
+                return view_method(self, request, *args, **kwargs)
+
+            key, year = key_info
+            result = cache.get(key)
+            if result is not None:
+                counters.hit()
+                response = custom_response(data=result, status_code=status.HTTP_200_OK)
+                response[CACHE_HEADER] = 'HIT'
+                return response
+
+            counters.miss()
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data['result'], timeout=cache_timeout(year))
+            response[CACHE_HEADER] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,217 @@
+import io
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from web.models import Station, ParameterName, Parameter
+from web.utils.data_version import LOCAL_OFFSET
+from web.utils.ingest_hooks import observations_changed
+
+"""
+Synthetic hourly observations for load tests and benchmarks.
+
+Series follow the shape of the real station data: seasonal and diurnal
+temperature cycles that depend on latitude and height, humidity anticorrelated
+with temperature, gusty winds with calms reported as wind_direction = -1,
+rainfall reported twice a day (-1 at the other hours, as the scraper stores
+it), rare multi-hour dust storms and station outages. Every station draws from
+its own random stream derived from the seed, so a station's series does not
+depend on how many other stations are generated.
+
+Rows are written with COPY on PostgreSQL and executemany elsewhere, then the
+ingest hooks are run once per station to build the derived tables.
+"""
+
+# slug: (name, unit), as in the bulk POST documentation
+PARAMETER_NAMES = {
+    'temp': ("Harorat", "°C"),
+    'humidity': ("Namlik", "%"),
+    'pressure': ("Bosim", "mm Hg"),
+    'wind_speed': ("Shamol tezligi", "m/s"),
+    'wind_direction': ("Shamol yo'nalishi", "°"),
+    'rainfall': ("Yog'ingarchilik", "mm"),
+    'ef_temp': ("Effektiv harorat", "°C"),
+    'dust_storm': ("Chang bo'roni", "1=ha, 0=yo'q"),
+}
+
+# Local hours at which rainfall is reported
+RAINFALL_HOURS = (8, 20)
+
+# Bounds of the generated station coordinates (Uzbekistan)
+LAT_RANGE = (37.2, 45.5)
+LON_RANGE = (56.0, 73.1)
+
+
+def hourly_index(start, years):
+    """Get the UTC hours of the given number of years from start"""
+    end = datetime(start.year + years, start.month, start.day)
+    return pd.date_range(start, end, freq='h', inclusive='left')
+
+
+def _ar1(rng, size, sigma, phi=0.9):
+    """AR(1) noise with stationary standard deviation sigma"""
+    shocks = rng.normal(0, sigma * np.sqrt(1 - phi ** 2), size)
+    noise = np.empty(size)
+    noise[0] = rng.normal(0, sigma)
+    for i in range(1, size):
+        noise[i] = phi * noise[i - 1] + shocks[i]
+    return noise
+
+
+def _outages(rng, size, gap_rate, mean_length=12):
+    """Boolean mask of hours without any report (gap_rate is the expected fraction of missing hours)"""
+    missing = np.zeros(size, dtype=bool)
+    if gap_rate <= 0:
+        return missing
+    for _ in range(rng.poisson(gap_rate * size / mean_length)):
+        start = rng.integers(0, size)
+        missing[start:start + rng.geometric(1 / mean_length)] = True
+    return missing
+
+
+def station_series(rng, index, lat, height, slugs, gap_rate=0.02):
+    """
+    Generate the hourly series of one station.
+
+    Args:
+        rng: numpy Generator of the station
+        index: DatetimeIndex of UTC hours
+        lat: Station latitude
+        height: Station height in meters
+        slugs: Parameter name slugs to generate
+        gap_rate: Expected fraction of hours lost to outages
+
+    Returns:
+        Dictionary {slug: float array aligned with index, NaN where missing}
+    """
+    size = len(index)
+    local = index + LOCAL_OFFSET
+    hour = local.hour.to_numpy()
+    season = -np.cos(2 * np.pi * (local.dayofyear.to_numpy() - 15) / 365.25)
+    diurnal = -np.cos(2 * np.pi * (hour - 3) / 24)
+
+    temp = 15 - (lat - 41) - height * 0.0065 + 15 * season + 6 * diurnal + _ar1(rng, size, 3)
+    humidity = np.clip(55 - 20 * season - 15 * diurnal + _ar1(rng, size, 10) - (temp - temp.mean()), 5, 100)
+    pressure = 760 - height * 0.086 - 6 * season + _ar1(rng, size, 3, phi=0.98)
+
+    wind_speed = np.round(np.clip(rng.gamma(2, 1.2, size) * (1 + 0.4 * diurnal), 0, None))
+    wind_direction = np.where(wind_speed == 0, -1, np.round(rng.vonmises(np.radians(300), 1.5, size) % (2 * np.pi) * 180 / np.pi) % 360)
+
+    rain_chance = 0.25 + 0.15 * np.cos(2 * np.pi * (local.dayofyear.to_numpy() - 90) / 365.25)
+    rain = np.where(rng.random(size) < rain_chance, np.round(rng.exponential(3, size), 1), 0.0)
+    rainfall = np.where(np.isin(hour, RAINFALL_HOURS), rain, -1)
+
+    # Dust storms start rarely (mostly in warm months) and last a few hours
+    dust_storm = np.zeros(size)
+    for start in np.flatnonzero(rng.random(size) < 0.0005 * (1 + season)):
+        dust_storm[start:start + rng.integers(2, 10)] = 1
+
+    ef_temp = temp - 0.4 * wind_speed - 0.05 * (humidity - 50) * (temp > 20)
+
+    series = {
+        'temp': np.round(temp, 1),
+        'humidity': np.round(humidity),
+        'pressure': np.round(pressure, 1),
+        'wind_speed': wind_speed,
+        'wind_direction': wind_direction,
+        'rainfall': rainfall,
+        'ef_temp': np.round(ef_temp, 1),
+        'dust_storm': dust_storm,
+    }
+
+    missing = _outages(rng, size, gap_rate)
+    result = {}
+    for slug in slugs:
+        values = series[slug].astype(float)
+        # Outages plus scattered single missing values
+        values[missing | (rng.random(size) < gap_rate / 4)] = np.nan
+        result[slug] = values
+    return result
+
+
+def _copy_rows(rows):
+    """Write (station_id, parameter_name_id, datetime, value) rows with the fastest path of the database"""
+    table = Parameter._meta.db_table
+    columns = [Parameter._meta.get_field(name).column for name in ('station', 'parameter_name', 'datetime', 'value')]
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            rows.to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(columns))
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                rows.itertuples(index=False, name=None)
+            )
+
+
+def generate(stations=10, slugs=None, years=1, start=None, seed=0, gap_rate=0.02, first_number=90001, progress=None):
+    """
+    Create synthetic stations and their hourly parameters.
+
+    Args:
+        stations: Number of stations
+        slugs: Parameter name slugs (all of PARAMETER_NAMES if None); missing parameter names are created
+        years: Years of hourly data per station
+        start: First UTC hour (2020-01-01 if None)
+        seed: Seed of the random streams
+        gap_rate: Expected fraction of missing hours
+        first_number: Number of the first station
+        progress: Optional callable(station, rows) called after each station
+
+    Returns:
+        int: Number of parameters created
+
+    Raises:
+        ValueError: If a slug is unknown or a station number is already taken
+    """
+    slugs = list(PARAMETER_NAMES) if slugs is None else list(slugs)
+    unknown = set(slugs) - set(PARAMETER_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown parameter names: {', '.join(sorted(unknown))}")
+
+    numbers = range(first_number, first_number + stations)
+    if Station.objects.filter(number__in=numbers).exists():
+        raise ValueError(f"Station numbers {first_number}-{first_number + stations - 1} are already in use")
+
+    parameter_names = {}
+    for slug in slugs:
+        name, unit = PARAMETER_NAMES[slug]
+        parameter_names[slug], _ = ParameterName.objects.get_or_create(slug=slug, defaults={'name': name, 'unit': unit})
+
+    index = hourly_index(start or datetime(2020, 1, 1), years)
+    timestamps = index.strftime('%Y-%m-%d %H:%M:%S')
+    total = 0
+
+    for i, number in enumerate(numbers):
+        rng = np.random.default_rng([seed, i])
+        lat = round(float(rng.uniform(*LAT_RANGE)), 4)
+        lon = round(float(rng.uniform(*LON_RANGE)), 4)
+        height = round(float(rng.gamma(2, 250)), 1)
+        series = station_series(rng, index, lat, height, slugs, gap_rate)
+
+        with transaction.atomic():
+            station = Station.objects.create(number=number, name=f"Synthetic {number}", height=height, lat=lat, lon=lon)
+
+            frames = []
+            for slug, values in series.items():
+                present = ~np.isnan(values)
+                frames.append(pd.DataFrame({
+                    'station_id': station.id,
+                    'parameter_name_id': parameter_names[slug].id,
+                    'datetime': timestamps[present],
+                    'value': values[present],
+                }))
+            rows = pd.concat(frames, ignore_index=True)
+            _copy_rows(rows)
+
+            observations_changed(station, index.to_pydatetime())
+
+        total += len(rows)
+        if progress:
+            progress(station, len(rows))
+
+    return total
@@ -0,0 +1,95 @@
+import math
+import numpy as np
+
+"""
+Seasonal trend analysis on monthly means.
+
+Implements the seasonal Mann-Kendall test (Hirsch, Slack & Smith, 1982) and
+the seasonal Sen's slope estimator. Each calendar month is a season: pairs are
+only compared within the same month across years, which removes the seasonal
+cycle from the test.
+"""
+
+
+def _mann_kendall_season(years, values):
+    """
+    Mann-Kendall S statistic, its variance and the pairwise slopes of one season.
+    """
+    n = len(values)
+    if n < 2:
+        return 0, 0.0, np.array([])
+
+    i, j = np.triu_indices(n, k=1)
+    diffs = values[j] - values[i]
+    s = int(np.sign(diffs).sum())
+
+    # Variance with correction for tied values
+    _, tie_counts = np.unique(values, return_counts=True)
+    ties = tie_counts[tie_counts > 1]
+    variance = (n * (n - 1) * (2 * n + 5) - np.sum(ties * (ties - 1) * (2 * ties + 5))) / 18.0
+
+    slopes = diffs / (years[j] - years[i])
+    return s, float(variance), slopes
+
+
+def seasonal_mann_kendall(years, months, values, alpha=0.05):
+    """
+    Run the seasonal Mann-Kendall test and Sen's slope over monthly means.
+
+    Args:
+        years: Array of years
+        months: Array of months (1-12), the seasons
+        values: Array of monthly mean values
+        alpha: Significance level
+
+    Returns:
+        Dictionary with s, variance, z, p_value, tau, slope (units per year),
+        intercept and significant flag, or None if there is not enough data
+    """
+    years = np.asarray(years, dtype=float)
+    months = np.asarray(months)
+    values = np.asarray(values, dtype=float)
+
+    s_total = 0
+    var_total = 0.0
+    pairs_total = 0
+    all_slopes = []
+
+    for season in np.unique(months):
+        mask = months == season
+        order = np.argsort(years[mask])
+        season_years = years[mask][order]
+        season_values = values[mask][order]
+
+        s, variance, slopes = _mann_kendall_season(season_years, season_values)
+        s_total += s
+        var_total += variance
+        pairs_total += len(slopes)
+        all_slopes.append(slopes)
+
+    if pairs_total == 0:
+        return None
+
+    if s_total > 0:
+        z = (s_total - 1) / math.sqrt(var_total) if var_total > 0 else 0.0
+    elif s_total < 0:
+        z = (s_total + 1) / math.sqrt(var_total) if var_total > 0 else 0.0
+    else:
+        z = 0.0
+
+    # Two-sided p-value from the standard normal distribution
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+
+    slope = float(np.median(np.concatenate(all_slopes)))
+    intercept = float(np.median(values - slope * years))
+
+    return {
+        's': s_total,
+        'variance': var_total,
+        'z': z,
+        'p_value': p_value,
+        'tau': s_total / pairs_total,
+        'slope': slope,
+        'intercept': intercept,
+        'significant': p_value < alpha,
+    }
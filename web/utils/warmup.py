@@ -0,0 +1,159 @@
+import threading
+import time
+from datetime import datetime
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connections
+from django.urls import resolve, reverse
+from web.models import GeographicArea, ParameterName
+from web.utils import registry
+from web.utils.data_version import LOCAL_OFFSET
+from web.utils.hex_index import get_hex_pyramid
+from web.utils.logger import logger
+
+"""
+Warm-up of the per-process caches.
+
+Hex grids are built lazily per worker and read responses are cached on first
+request, so after a deploy the first map and chart requests pay for both.
+warm_up() runs the WARMUP_STEPS up front: it loads the station and parameter
+name registries, builds the hex pyramid of every GeographicArea and requests
+the map grid and the average/all-stations charts of the current local day,
+month and year, which stores them in the response cache under the same keys
+real requests use.
+
+gunicorn.conf.py runs it in a background thread of every worker when
+WARMUP_ON_START=True; `python manage.py warm_up` runs it once (enough to prime
+a shared cache such as Redis). state() reports the progress of the current
+process for the health checks.
+"""
+
+# Chart periods and the local date format of their 'date' parameter
+CHART_PERIODS = (('day', '%Y-%m-%d'), ('month', '%Y-%m'), ('year', '%Y'))
+CHART_URL_NAMES = ('parameter_charts_avg', 'parameter_charts_all')
+
+COLD = 'cold'
+WARMING = 'warming'
+WARM = 'warm'
+# Finished, but at least one step failed (the worker still builds those caches lazily)
+DEGRADED = 'degraded'
+
+_state = {'status': COLD, 'started_at': None, 'finished_at': None, 'steps': {}}
+_lock = threading.Lock()
+
+
+def _get(url_name, params=None):
+    """Run a GET request through the view of url_name as an authenticated user and get the status code"""
+    from django.test import RequestFactory
+    from rest_framework.test import force_authenticate
+
+    path = reverse(f'web:{url_name}')
+    request = RequestFactory().get(path, params or {})
+    # Unsaved user: the warmed views only check that the request is authenticated
+    force_authenticate(request, user=User(username='warmup'))
+    match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    return response.status_code
+
+
+def warm_registries():
+    """Load the station and parameter name registries"""
+    return len(registry.stations.all()) + len(registry.parameter_names.all())
+
+
+def warm_hex_grids():
+    """Build the hex pyramid (every resolution and its spatial index) of every area"""
+    areas = list(GeographicArea.objects.all())
+    for area in areas:
+        get_hex_pyramid(area)
+    if areas:
+        _get('hex-grid')
+    return len(areas)
+
+
+def warm_charts():
+    """Prime the response cache with the average and all-stations charts of the current local day, month and year"""
+    now = datetime.utcnow() + LOCAL_OFFSET
+    count = 0
+    for slug in ParameterName.objects.values_list('slug', flat=True):
+        for url_name in CHART_URL_NAMES:
+            for period, date_format in CHART_PERIODS:
+                _get(url_name, {'parameter_name': slug, 'period': period, 'date': now.strftime(date_format)})
+                count += 1
+    return count
+
+
+WARMUP_STEPS = (
+    ('registries', warm_registries),
+    ('hex_grids', warm_hex_grids),
+    ('charts', warm_charts),
+)
+
+
+def state():
+    """Get a copy of the warm-up state of this process"""
+    with _lock:
+        return {**_state, 'steps': {name: dict(step) for name, step in _state['steps'].items()}}
+
+
+def is_warming():
+    """Whether a warm-up was started and has not finished yet"""
+    with _lock:
+        return _state['status'] == WARMING
+
+
+def _start():
+    with _lock:
+        _state.update(status=WARMING, started_at=datetime.utcnow(), finished_at=None, steps={})
+
+
+def warm_up(steps=WARMUP_STEPS):
+    """
+    Run the warm-up steps in order.
+
+    A failing step is logged and recorded, and the next steps still run.
+
+    Returns:
+        Dictionary {step name: {'seconds', 'items'} or {'seconds', 'error'}}
+    """
+    if not is_warming():
+        _start()
+
+    results = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            result = {'items': step()}
+        except Exception as e:
+            logger.exception(f"Warm-up step {name} failed")
+            result = {'error': str(e)}
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        results[name] = result
+        with _lock:
+            _state['steps'][name] = dict(result)
+
+    with _lock:
+        _state['status'] = DEGRADED if any('error' in result for result in results.values()) else WARM
+        _state['finished_at'] = datetime.utcnow()
+    return results
+
+
+def warm_up_in_background():
+    """
+    Start warm_up() in a daemon thread.
+
+    The state switches to warming before this returns, so a health check never
+    sees the process as ready before its warm-up ran.
+    """
+    _start()
+
+    def run():
+        close_old_connections()
+        try:
+            results = warm_up()
+            logger.info(f"Warm-up finished: {results}")
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, name='warm-up', daemon=True)
+    thread.start()
+    return thread
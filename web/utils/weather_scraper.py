@@ -5,6 +5,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 import time
 import logging
+from web.utils.metrics import SCRAPER_PAGES, SCRAPER_PARSE_SECONDS, SCRAPER_RETRIES
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -43,19 +44,25 @@ async def scrape_month(session, station_id, year, month, first_day, last_day, se
                     async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
                         if response.status == 200:
                             html = await response.text()
+                            SCRAPER_PAGES.labels('ok').inc()
                             break
                         else:
+                            SCRAPER_PAGES.labels('http_error').inc()
                             if attempt == retries - 1:
                                 logger.warning(f"Failed to retrieve data for {year}-{month:02d}: HTTP {response.status}")
                                 return []
+                            SCRAPER_RETRIES.inc()
                             await asyncio.sleep(2 * (attempt + 1))  # Exponential backoff
                 except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    SCRAPER_PAGES.labels('network_error').inc()
                     if attempt == retries - 1:
                         logger.warning(f"Network error for {year}-{month:02d}: {str(e)}")
                         return []
+                    SCRAPER_RETRIES.inc()
                     await asyncio.sleep(2 * (attempt + 1))  # Exponential backoff
             
-            # Parse the HTML
+            # Parse the HTML (timed until the rows are merged)
+            parse_started = time.perf_counter()
             soup = BeautifulSoup(html, "html.parser")
             
             # Parse the left column table (Time and Date)
@@ -122,6 +129,7 @@ async def scrape_month(session, station_id, year, month, first_day, last_day, se
                         dt = None
                     combined = {**ld, **rd, "month": month, "year": year, "datetime": dt}
                     month_data.append(combined)
+            SCRAPER_PARSE_SECONDS.observe(time.perf_counter() - parse_started)
         
         except Exception as e:
             logger.error(f"Error processing {month}/{year} (days {first_day}-{last_day}): {str(e)}")
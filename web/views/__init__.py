@@ -1,6 +1,6 @@
 from .auth import LoginView
 from .users import UserMeView
-from .stations import StationView, StationDetailView
+from .stations import StationView, StationDetailView, StationCurrentView, StationSnapshotView
 from .parameters import (
     ParameterScrapeView,
     ParameterNameView,
@@ -11,12 +11,16 @@ from .hexgrid import HexGridAPIView
 from .hexdata import HexagonDataAPIView
 from .map import MapView
 from .chart import ParameterChartView, ParameterAvgChartView, ParameterAllChartView
+from .metrics import MetricsView
+from .profiles import ProfileView
 
 __all__ = [
     'LoginView',
     'UserMeView',
     'StationView',
     'StationDetailView',
+    'StationCurrentView',
+    'StationSnapshotView',
     'ParameterScrapeView',
     'ParameterNameView',
     'ParametersView',
@@ -27,4 +31,6 @@ __all__ = [
     'ParameterChartView',
     'ParameterAvgChartView',
     'ParameterAllChartView',
+    'MetricsView',
+    'ProfileView',
 ] 
\ No newline at end of file
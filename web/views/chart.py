@@ -3,13 +3,39 @@ from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ..utils import custom_response
+from ..utils import registry
+from ..utils.response_cache import cached_response, data_scopes
 from ..error_messages import AUTH_ERROR_MESSAGES
 from ..models import Station, ParameterName, Parameter
 from datetime import datetime, timedelta
 from django.db.models import Avg, Min, Max, Q
 from django.utils.dateparse import parse_datetime
 import calendar
-import pandas as pd
+
+
+def highest_values_by_station(stations, parameter_name, start_date, end_date):
+    """
+    Get the highest value of a parameter for each station between start_date and end_date (UTC).
+
+    Uses one grouped query for all stations; stations without data get null.
+
+    Returns:
+        list: [{'number', 'name', <parameter slug>: highest value or None}] in the order of stations
+    """
+    highest = dict(Parameter.objects.filter(
+        parameter_name=parameter_name,
+        datetime__gte=start_date,
+        datetime__lte=end_date
+    ).order_by().values('station_id').annotate(highest=Max('value')).values_list('station_id', 'highest'))
+
+    return [
+        {
+            'number': station.number,
+            'name': station.name,
+            parameter_name.slug: highest.get(station.id)
+        }
+        for station in stations
+    ]
 
 
 class ParameterChartView(APIView):
@@ -110,6 +136,7 @@ class ParameterChartView(APIView):
             404: "Stansiya yoki parametr nomi topilmadi",
         }
     )
+    @cached_response('parameter_charts', scopes=data_scopes, coalesce=True)
     def get(self, request, station_number):
         """Get chart data for a specific station"""
         # Validate and get parameter name
@@ -122,7 +149,7 @@ class ParameterChartView(APIView):
             )
         
         try:
-            parameter_name = ParameterName.objects.get(slug=parameter_slug)
+            parameter_name = registry.parameter_names.get(slug=parameter_slug)
         except ParameterName.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Parametr nomi"),
@@ -150,7 +177,7 @@ class ParameterChartView(APIView):
         
         # Get the specified station
         try:
-            station = Station.objects.get(number=station_number)
+            station = registry.stations.get(number=station_number)
         except Station.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Stansiya"),
@@ -190,33 +217,9 @@ class ParameterChartView(APIView):
                 success=False
             )
         
-        # Get all stations from the database
-        all_stations = Station.objects.all()
-        stations_list = []
-        
-        # For each station, find its highest parameter value or set to null if no data
-        for station_obj in all_stations:
-            station_data = {
-                'number': station_obj.number,
-                'name': station_obj.name
-            }
-            
-            # Try to find parameter data for this station
-            highest_param = Parameter.objects.filter(
-                parameter_name=parameter_name,
-                station=station_obj,
-                datetime__gte=start_date,
-                datetime__lte=end_date
-            ).order_by('-value').first()
-            
-            # Add the parameter value with the parameter name as the key
-            # Set to null if no data is found
-            if highest_param and highest_param.value is not None:
-                station_data[parameter_name.slug] = highest_param.value
-            else:
-                station_data[parameter_name.slug] = None
-                
-            stations_list.append(station_data)
+        # Get all stations
+        all_stations = registry.stations.all()
+        stations_list = highest_values_by_station(all_stations, parameter_name, start_date, end_date)
         
         # Prepare response
         result = {
@@ -296,6 +299,8 @@ class ParameterChartView(APIView):
         Returns:
             list: Chart data items
         """
+        import pandas as pd
+
         # Build filter
         filters = Q(parameter_name=parameter_name)
         filters &= Q(datetime__gte=start_date)
@@ -314,15 +319,20 @@ class ParameterChartView(APIView):
         # Handle different cases based on station parameter
         if station == 'all':
             # Get all stations, including those with no data for this period
-            all_stations = Station.objects.all()
+            all_stations = registry.stations.all()
             
             # Create a lookup for station names
             station_lookup = {s.id: s.name for s in all_stations}
             
+            # Fetch the parameters of all stations with one query and split them by station
+            params_by_station = {}
+            for param in parameters:
+                params_by_station.setdefault(param.station_id, []).append(param)
+            
             # Process each station separately
             for station_id, station_name in station_lookup.items():
-                # Filter parameters for this station
-                station_params = parameters.filter(station_id=station_id)
+                # Parameters of this station
+                station_params = params_by_station.get(station_id, [])
                 
                 # Convert to pandas DataFrame for easier processing
                 data = []
@@ -470,6 +480,8 @@ class ParameterChartView(APIView):
         Returns:
             list: Chart data items
         """
+        import pandas as pd
+
         # Build filter
         filters = Q(parameter_name=parameter_name)
         filters &= Q(datetime__gte=start_date)
@@ -487,15 +499,20 @@ class ParameterChartView(APIView):
         
         if station == 'all':
             # Get all stations, including those with no data for this period
-            all_stations = Station.objects.all()
+            all_stations = registry.stations.all()
             
             # Create a lookup for station names
             station_lookup = {s.id: s.name for s in all_stations}
             
+            # Fetch the parameters of all stations with one query and split them by station
+            params_by_station = {}
+            for param in parameters:
+                params_by_station.setdefault(param.station_id, []).append(param)
+            
             # Process each station separately
             for station_id, station_name in station_lookup.items():
-                # Filter parameters for this station
-                station_params = parameters.filter(station_id=station_id)
+                # Parameters of this station
+                station_params = params_by_station.get(station_id, [])
                 
                 # Convert to pandas DataFrame for easier processing
                 data = []
@@ -635,6 +652,8 @@ class ParameterChartView(APIView):
         Returns:
             list: Chart data items
         """
+        import pandas as pd
+
         # Build filter
         filters = Q(parameter_name=parameter_name)
         filters &= Q(datetime__gte=start_date)
@@ -652,15 +671,20 @@ class ParameterChartView(APIView):
         
         if station == 'all':
             # Get all stations, including those with no data for this period
-            all_stations = Station.objects.all()
+            all_stations = registry.stations.all()
             
             # Create a lookup for station names
             station_lookup = {s.id: s.name for s in all_stations}
             
+            # Fetch the parameters of all stations with one query and split them by station
+            params_by_station = {}
+            for param in parameters:
+                params_by_station.setdefault(param.station_id, []).append(param)
+            
             # Process each station separately
             for station_id, station_name in station_lookup.items():
-                # Filter parameters for this station
-                station_params = parameters.filter(station_id=station_id)
+                # Parameters of this station
+                station_params = params_by_station.get(station_id, [])
                 
                 # Convert to pandas DataFrame for easier processing
                 data = []
@@ -887,6 +911,7 @@ class ParameterAvgChartView(ParameterChartView):
             404: "Parametr nomi topilmadi",
         }
     )
+    @cached_response('parameter_charts_avg', scopes=data_scopes, coalesce=True)
     def get(self, request):
         """Get chart data with average values across all stations"""
         # Validate and get parameter name
@@ -899,7 +924,7 @@ class ParameterAvgChartView(ParameterChartView):
             )
         
         try:
-            parameter_name = ParameterName.objects.get(slug=parameter_slug)
+            parameter_name = registry.parameter_names.get(slug=parameter_slug)
         except ParameterName.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Parametr nomi"),
@@ -960,33 +985,9 @@ class ParameterAvgChartView(ParameterChartView):
                 success=False
             )
         
-        # Get all stations from the database instead of filtering by parameter data
-        all_stations = Station.objects.all()
-        stations_list = []
-        
-        # For each station, find its highest parameter value or set to null if no data
-        for station_obj in all_stations:
-            station_data = {
-                'number': station_obj.number,
-                'name': station_obj.name
-            }
-            
-            # Try to find parameter data for this station
-            highest_param = Parameter.objects.filter(
-                parameter_name=parameter_name,
-                station=station_obj,
-                datetime__gte=start_date,
-                datetime__lte=end_date
-            ).order_by('-value').first()
-            
-            # Add the parameter value with the parameter name as the key
-            # Set to null if no data is found
-            if highest_param and highest_param.value is not None:
-                station_data[parameter_name.slug] = highest_param.value
-            else:
-                station_data[parameter_name.slug] = None
-                
-            stations_list.append(station_data)
+        # Get all stations instead of filtering by parameter data
+        all_stations = registry.stations.all()
+        stations_list = highest_values_by_station(all_stations, parameter_name, start_date, end_date)
         
         # Prepare response
         result = {
@@ -1097,6 +1098,7 @@ class ParameterAllChartView(ParameterChartView):
             404: "Parametr nomi topilmadi",
         }
     )
+    @cached_response('parameter_charts_all', scopes=data_scopes, coalesce=True)
     def get(self, request):
         """Get chart data for all stations individually"""
         # Validate and get parameter name
@@ -1109,7 +1111,7 @@ class ParameterAllChartView(ParameterChartView):
             )
         
         try:
-            parameter_name = ParameterName.objects.get(slug=parameter_slug)
+            parameter_name = registry.parameter_names.get(slug=parameter_slug)
         except ParameterName.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Parametr nomi"),
@@ -1170,33 +1172,9 @@ class ParameterAllChartView(ParameterChartView):
                 success=False
             )
         
-        # Get all stations from the database instead of filtering by parameter data
-        all_stations = Station.objects.all()
-        stations_list = []
-        
-        # For each station, find its highest parameter value or set to null if no data
-        for station_obj in all_stations:
-            station_data = {
-                'number': station_obj.number,
-                'name': station_obj.name
-            }
-            
-            # Try to find parameter data for this station
-            highest_param = Parameter.objects.filter(
-                parameter_name=parameter_name,
-                station=station_obj,
-                datetime__gte=start_date,
-                datetime__lte=end_date
-            ).order_by('-value').first()
-            
-            # Add the parameter value with the parameter name as the key
-            # Set to null if no data is found
-            if highest_param and highest_param.value is not None:
-                station_data[parameter_name.slug] = highest_param.value
-            else:
-                station_data[parameter_name.slug] = None
-                
-            stations_list.append(station_data)
+        # Get all stations instead of filtering by parameter data
+        all_stations = registry.stations.all()
+        stations_list = highest_values_by_station(all_stations, parameter_name, start_date, end_date)
         
         # Prepare response
         result = {
@@ -1,11 +1,19 @@
 from rest_framework import views, status
 from rest_framework.response import Response
 import json
-from web.models import GeographicArea, Station, Parameter, ParameterName
-from web.utils.idw_interpolation import IDWInterpolator, generate_hexgrid, interpolate_hexgrid
+import numpy as np
+from web.models import GeographicArea, LatestObservation
+from web.utils.idw_interpolation import IDWInterpolator
+from web.utils import registry
+from web.utils.hex_index import get_hex_pyramid, parse_bbox, parse_zoom
 from web.utils.logger import logger
 from web.utils.response_utils import custom_response
-from django.db.models import Max, F, Subquery, OuterRef, Q
+from web.utils.response_cache import cached_response, data_scopes
+from web.utils.snapshot import snapshot_at, parse_tolerance, DEFAULT_TOLERANCE
+from web.utils.hex_frames import floor_hour, load_frame
+from web.utils.metrics import INTERPOLATION_SECONDS
+from django.conf import settings
+from django.db.models import Max, F, Q
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ..error_messages import VALIDATION_ERROR_MESSAGES, HEX_ERROR_MESSAGES
@@ -13,6 +21,10 @@ from rest_framework.permissions import IsAuthenticated
 from datetime import datetime, timedelta
 from django.utils.dateparse import parse_datetime
 
+# Supported values of the 'output' query parameter ('format' is reserved by DRF for renderer selection)
+DATA_OUTPUTS = ('rows', 'columns')
+
+
 class HexagonDataAPIView(views.APIView):
     """API view to get interpolated data for hexagons"""
     
@@ -36,6 +48,49 @@ class HexagonDataAPIView(views.APIView):
                 type=openapi.TYPE_STRING,
                 required=False
             ),
+            openapi.Parameter(
+                'tolerance',
+                openapi.IN_QUERY,
+                description="Maximum distance in minutes between datetime and the used observation (default: 60)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'bbox',
+                openapi.IN_QUERY,
+                description="Viewport as west,south,east,north. Only hexagons intersecting it are returned.",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'output',
+                openapi.IN_QUERY,
+                description="Response format: rows (default, list of {hex_id, value}) or columns (parallel hex_ids and values arrays)",
+                type=openapi.TYPE_STRING,
+                enum=list(DATA_OUTPUTS),
+                required=False
+            ),
+            openapi.Parameter(
+                'zoom',
+                openapi.IN_QUERY,
+                description="Map zoom level (0-22). Selects the hexagon resolution so the number of cells stays bounded.",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'neighbors',
+                openapi.IN_QUERY,
+                description="Number of nearest stations used for each hexagon (0 = all stations)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'radius',
+                openapi.IN_QUERY,
+                description="Only stations within this distance in kilometers are used",
+                type=openapi.TYPE_NUMBER,
+                required=False
+            ),
         ],
         responses={
             200: openapi.Response(
@@ -64,6 +119,7 @@ class HexagonDataAPIView(views.APIView):
             500: f"Internal Server Error: {HEX_ERROR_MESSAGES['interpolation_error']}"
         }
     )
+    @cached_response('hex_data', scopes=data_scopes, coalesce=True)
     def get(self, request, *args, **kwargs):
         # Get the parameter name from the request (now required)
         parameter_name_slug = request.query_params.get('parameter_name')
@@ -72,6 +128,49 @@ class HexagonDataAPIView(views.APIView):
         datetime_str = request.query_params.get('datetime')
         specific_datetime = None
         
+        # Get tolerance in minutes (optional)
+        try:
+            tolerance = parse_tolerance(request.query_params.get('tolerance'))
+        except ValueError:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="tolerance"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        # Get the response format (optional)
+        output = request.query_params.get('output', 'rows')
+        if output not in DATA_OUTPUTS:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="output"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        # Get the viewport bbox and zoom (optional)
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox'))
+            zoom = parse_zoom(request.query_params.get('zoom'))
+        except ValueError as e:
+            return custom_response(
+                detail=HEX_ERROR_MESSAGES['invalid_bounds'].format(error=str(e)),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        # Get IDW neighbor search limits (optional)
+        try:
+            neighbors = int(request.query_params.get('neighbors', settings.IDW_NEIGHBORS))
+            radius_km = float(request.query_params.get('radius', settings.IDW_RADIUS_KM))
+            if neighbors < 0 or radius_km <= 0:
+                raise ValueError
+        except ValueError:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="neighbors/radius"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
         # Check if parameter_name is provided
         if not parameter_name_slug:
             return custom_response(
@@ -107,26 +206,16 @@ class HexagonDataAPIView(views.APIView):
             area = GeographicArea.objects.first()
             
             if area:
-                bounds = {
-                    'north': area.north,
-                    'south': area.south,
-                    'east': area.east,
-                    'west': area.west,
-                }
-                resolution = area.preferred_resolution
-                
-                # Check for custom polygon
-                polygon_coords = None
-                if area.coordinates:
-                    try:
-                        polygon_coords = json.loads(area.coordinates)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse coordinates: {e}")
-                        return custom_response(
-                            detail=HEX_ERROR_MESSAGES['parsing_failed'].format(error=str(e)),
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            success=False
-                        )
+                # Get the cached grids of the area (uses custom polygon coordinates if set)
+                try:
+                    pyramid = get_hex_pyramid(area)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse coordinates: {e}")
+                    return custom_response(
+                        detail=HEX_ERROR_MESSAGES['parsing_failed'].format(error=str(e)),
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        success=False
+                    )
             else:
                 # If no area exists, return empty result
                 return custom_response([])
@@ -137,7 +226,7 @@ class HexagonDataAPIView(views.APIView):
         
         try:
             # Get parameter name
-            parameter_name = ParameterName.objects.filter(slug=parameter_name_slug).first()
+            parameter_name = registry.parameter_names.in_bulk([parameter_name_slug], field='slug').get(parameter_name_slug)
             if not parameter_name:
                 return custom_response(
                     detail=HEX_ERROR_MESSAGES['parameter_not_found'].format(parameter_name=parameter_name_slug),
@@ -145,110 +234,74 @@ class HexagonDataAPIView(views.APIView):
                     success=False
                 )
             
-            stations_with_values = []
+            # Precomputed frame of the hour, if the request matches the frame's inputs
+            frame = None
+            if (
+                settings.HEX_FRAMES_ENABLED
+                and specific_datetime
+                and specific_datetime == floor_hour(specific_datetime)
+                and tolerance == DEFAULT_TOLERANCE
+                and neighbors == settings.IDW_NEIGHBORS
+                and radius_km == settings.IDW_RADIUS_KM
+            ):
+                base = pyramid.levels[pyramid.base_resolution]
+                frame = load_frame(area, base, parameter_name, specific_datetime)
             
-            if specific_datetime:
-                # For specific datetime, get all stations with that parameter at that time
-                # Find the closest time for each station (within a window, e.g., ±1 hour)
-                time_window = 1  # hour
-                start_time = specific_datetime - timedelta(hours=time_window)
-                end_time = specific_datetime + timedelta(hours=time_window)
-                
-                # Find parameters within the time window for each station
-                station_params = {}
-                
-                # Get all parameters within the time window
-                params = Parameter.objects.filter(
-                    parameter_name=parameter_name,
-                    datetime__gte=start_time,
-                    datetime__lte=end_time
-                ).select_related('station')
-                
-                # For each parameter, check if it's the closest to the target time for its station
-                for param in params:
-                    station_id = param.station.id
-                    time_diff = abs((param.datetime - specific_datetime).total_seconds())
-                    
-                    if station_id not in station_params or time_diff < station_params[station_id]['time_diff']:
-                        station_params[station_id] = {
-                            'parameter': param,
-                            'time_diff': time_diff
-                        }
-                
-                # Convert to the format needed by the interpolator
-                for station_id, data in station_params.items():
-                    param = data['parameter']
-                    stations_with_values.append({
-                        'lat': param.station.lat,
-                        'lng': param.station.lon,
-                        'value': param.value,
-                        'station_name': param.station.name,
-                        'parameter_value': param.value,
-                        'parameter_datetime': param.datetime + timedelta(hours=5)  # Convert back to UTC+5 for display
-                    })
+            # Resolution for the zoom, only the cells that intersect the viewport
+            level, positions = pyramid.select(zoom, bbox)
+            
+            if frame is not None:
+                base_values, stations_count = frame
+                values = np.round(pyramid.aggregate(level.resolution, positions, base_values), 2)
             else:
-                # Get latest parameters for each station of the specified name
-                latest_params = Parameter.objects.filter(
-                    station=OuterRef('pk'),
-                    parameter_name=parameter_name
-                ).order_by('-datetime').values('value', 'datetime')[:1]
+                stations_with_values = self.station_values(parameter_name, specific_datetime, tolerance)
                 
-                # Get stations with their latest parameter values
-                stations = Station.objects.annotate(
-                    parameter_value=Subquery(latest_params.values('value')),
-                    parameter_datetime=Subquery(latest_params.values('datetime'))
-                ).filter(parameter_value__isnull=False)
+                if not stations_with_values:
+                    return custom_response(
+                        detail=HEX_ERROR_MESSAGES['no_station_data'].format(parameter_name=parameter_name.name),
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        success=False
+                    )
+                stations_count = len(stations_with_values)
                 
-                # Convert to the format needed by the interpolator
-                for station in stations:
-                    stations_with_values.append({
-                        'lat': station.lat,
-                        'lng': station.lon,
-                        'value': station.parameter_value,
-                        'station_name': station.name,
-                        'parameter_value': station.parameter_value,
-                        'parameter_datetime': station.parameter_datetime + timedelta(hours=5) if station.parameter_datetime else None
-                    })
-            
-            if not stations_with_values:
-                return custom_response(
-                    detail=HEX_ERROR_MESSAGES['no_station_data'].format(parameter_name=parameter_name.name),
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    success=False
-                )
+                # Create the interpolator with parameter name slug as the value field
+                interpolator = IDWInterpolator(stations_with_values, value_field='value', radius=radius_km * 1000, k=neighbors or None)
                 
-            # Use the prepared station data for interpolation
-            station_data = stations_with_values
-            logger.info(f"Station data: {station_data}")
-            
-            # Create the interpolator with parameter name slug as the value field
-            interpolator = IDWInterpolator(station_data, value_field='value')
+                # Interpolate values for each hexagon (coarse levels aggregate their base children)
+                with INTERPOLATION_SECONDS.labels('live').time():
+                    values = np.round(pyramid.interpolate(level.resolution, positions, interpolator), 2)
             
-            # Generate the hexgrid
-            hexgrid = generate_hexgrid(bounds, resolution, polygon_coords=polygon_coords)
-            
-            # Interpolate values for each hexagon
-            hex_data = interpolate_hexgrid(hexgrid, interpolator)
+            metadata = {
+                'parameter_name': parameter_name.name,
+                'parameter_slug': parameter_name.slug,
+                'datetime': datetime_str,
+                'stations_count': stations_count,
+                'resolution': level.resolution,
+                'precomputed': frame is not None
+            }
             
-            # Convert to list format for response
-            data_list = [
-                {
-                    'hex_id': hex_id,
-                    **hex_values
+            if output == 'columns':
+                # Parallel arrays instead of one dict per hexagon
+                response_data = {
+                    'hex_ids': list(level.hex_ids[positions]),
+                    'values': values,
+                    'metadata': metadata
                 }
-                for hex_id, hex_values in hex_data.items()
-            ]
-            
-            # Return the data with metadata
-            response_data = {
-                'hexagons': data_list,
-                'metadata': {
-                    'parameter_name': parameter_name.name,
-                    'parameter_slug': parameter_name.slug,
-                    'datetime': datetime_str,
-                    'stations_count': len(stations_with_values)
+            else:
+                # Convert to list format for response
+                data_list = [
+                    {
+                        'hex_id': hex_id,
+                        'value': float(value)
+                    }
+                    for hex_id, value in zip(level.hex_ids[positions], values)
+                ]
+                
+                # Return the data with metadata
+                response_data = {
+                    'hexagons': data_list,
+                    'metadata': metadata
                 }
-            }
             
             return custom_response(response_data)
             
@@ -258,4 +311,43 @@ class HexagonDataAPIView(views.APIView):
                 detail=HEX_ERROR_MESSAGES['interpolation_error'].format(error=str(e)),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 success=False
-            ) 
\ No newline at end of file
+            ) 
+    
+    def station_values(self, parameter_name, specific_datetime, tolerance):
+        """Get the station points to interpolate: the snapshot at specific_datetime or the latest observations"""
+        stations_with_values = []
+        
+        if specific_datetime:
+            # Closest observation of each station within the tolerance
+            snapshot = snapshot_at(specific_datetime, [parameter_name.id], tolerance)
+            stations = registry.stations.in_bulk([station_id for station_id, _ in snapshot])
+            
+            # Convert to the format needed by the interpolator
+            for (station_id, _), (param_datetime, value) in snapshot.items():
+                station = stations[station_id]
+                stations_with_values.append({
+                    'lat': station.lat,
+                    'lng': station.lon,
+                    'value': value,
+                    'station_name': station.name,
+                    'parameter_value': value,
+                    'parameter_datetime': param_datetime + timedelta(hours=5)  # Convert back to UTC+5 for display
+                })
+        else:
+            # Get latest parameters for each station from the materialized table
+            latest_observations = LatestObservation.objects.filter(
+                parameter_name=parameter_name
+            ).select_related('station')
+            
+            # Convert to the format needed by the interpolator
+            for observation in latest_observations:
+                stations_with_values.append({
+                    'lat': observation.station.lat,
+                    'lng': observation.station.lon,
+                    'value': observation.value,
+                    'station_name': observation.station.name,
+                    'parameter_value': observation.value,
+                    'parameter_datetime': observation.datetime + timedelta(hours=5)
+                })
+        
+        return stations_with_values
@@ -2,15 +2,20 @@ from django.http import JsonResponse
 from rest_framework import views, status
 from rest_framework.response import Response
 import json
-import geojson
 from web.models import GeographicArea, ParameterName
-from web.utils.idw_interpolation import generate_hexgrid
+from web.utils.hex_index import get_hex_pyramid, parse_bbox, parse_zoom
 from web.utils.logger import logger
 from web.utils.response_utils import custom_response
+from web.utils.response_cache import cached_response, metadata_scopes
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ..error_messages import VALIDATION_ERROR_MESSAGES, HEX_ERROR_MESSAGES
 from rest_framework.permissions import IsAuthenticated
+
+# Supported values of the 'output' query parameter ('format' is reserved by DRF for renderer selection)
+GRID_OUTPUTS = ('geojson', 'ids', 'compact')
+
+
 class HexGridAPIView(views.APIView):
     """API view to generate hexagonal grid as GeoJSON"""
     
@@ -19,6 +24,30 @@ class HexGridAPIView(views.APIView):
     @swagger_auto_schema(
         tags=['Interpolation Map'],
         operation_description="Generate hexagonal grid as GeoJSON",
+        manual_parameters=[
+            openapi.Parameter(
+                'bbox',
+                openapi.IN_QUERY,
+                description="Viewport as west,south,east,north. Only hexagons intersecting it are returned.",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'output',
+                openapi.IN_QUERY,
+                description="Response format: geojson (default), ids (array of H3 indexes) or compact (h3.compact set of H3 indexes, uncompact to 'resolution' on the client)",
+                type=openapi.TYPE_STRING,
+                enum=list(GRID_OUTPUTS),
+                required=False
+            ),
+            openapi.Parameter(
+                'zoom',
+                openapi.IN_QUERY,
+                description="Map zoom level (0-22). Selects the hexagon resolution so the number of cells stays bounded.",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+        ],
         responses={
             200: openapi.Response(
                 description="Hexagonal grid as GeoJSON",
@@ -36,45 +65,60 @@ class HexGridAPIView(views.APIView):
             500: f"Internal Server Error: {HEX_ERROR_MESSAGES['grid_generation_error']}"
         }
     )
+    @cached_response('hex_grid', scopes=metadata_scopes)
     def get(self, request, *args, **kwargs):
+        # Get the response format (optional)
+        output = request.query_params.get('output', 'geojson')
+        if output not in GRID_OUTPUTS:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="output"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        # Get the viewport bbox and zoom (optional)
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox'))
+            zoom = parse_zoom(request.query_params.get('zoom'))
+        except ValueError as e:
+            return custom_response(
+                detail=HEX_ERROR_MESSAGES['invalid_bounds'].format(error=str(e)),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
         try:
             # Get the single geographic area (assumes only one exists)
             area = GeographicArea.objects.first()
             
             if area:
-                bounds = {
-                    'north': area.north,
-                    'south': area.south,
-                    'east': area.east,
-                    'west': area.west,
-                }
-                resolution = area.preferred_resolution
+                # Get the cached grids of the area (uses custom polygon coordinates if set)
+                try:
+                    pyramid = get_hex_pyramid(area)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse coordinates JSON: {e}")
+                    return custom_response(
+                        detail=HEX_ERROR_MESSAGES['parsing_failed'].format(error=str(e)),
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        success=False
+                    )
+                
+                # Resolution for the zoom, only the cells that intersect the viewport
+                level, positions = pyramid.select(zoom, bbox)
                 
-                # Check if the area has custom polygon coordinates
-                polygon_coords = None
-                if area.coordinates:
-                    try:
-                        # Parse the polygon coordinates from the area
-                        polygon_coords = json.loads(area.coordinates)
-                        
-                        # Generate the hexagonal grid using the polygon coordinates
-                        hexgrid = generate_hexgrid(bounds, resolution, polygon_coords=polygon_coords)
-                        return custom_response(hexgrid['geojson'])
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse coordinates JSON: {e}")
-                        return custom_response(
-                            detail=HEX_ERROR_MESSAGES['parsing_failed'].format(error=str(e)),
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            success=False
-                        )
+                # The client can rebuild hexagon boundaries from the H3 indexes itself
+                if output == 'ids':
+                    return custom_response({'hex_ids': list(level.hex_ids[positions]), 'resolution': level.resolution})
+                if output == 'compact':
+                    import h3
+                    return custom_response({'hex_ids': list(h3.compact(level.hex_ids[positions])), 'resolution': level.resolution})
                 
-                # If no polygon or parsing failed, fall back to bounding box
-                hexgrid = generate_hexgrid(bounds, resolution)
-                return custom_response(hexgrid['geojson'])
+                hexgrid = level.hexgrid(positions)
+                return custom_response({**hexgrid['geojson'], 'resolution': level.resolution})
             else:
                 # If no area exists, return empty result
                 return custom_response(
-                    geojson.FeatureCollection([])
+                    {'type': 'FeatureCollection', 'features': []}
                 )
                 
         except Exception as e:
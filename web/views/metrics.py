@@ -0,0 +1,30 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from ..utils import metrics
+from ..error_messages import AUTH_ERROR_MESSAGES
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint.
+
+    A plain Django view: Prometheus expects the text exposition format, not
+    the API envelope, and authenticates with a static bearer token
+    (METRICS_TOKEN; the endpoint is open when it is empty).
+    """
+
+    def get(self, request):
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+                return HttpResponse(AUTH_ERROR_MESSAGES['invalid_token'], status=401, content_type='text/plain; charset=utf-8')
+
+        if not metrics.available():
+            return HttpResponse(
+                "prometheus_client o'rnatilmagan", status=501, content_type='text/plain; charset=utf-8'
+            )
+
+        body, content_type = metrics.render()
+        return HttpResponse(body, content_type=content_type)
@@ -2,16 +2,19 @@ from rest_framework import status, permissions
 from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from ..utils import custom_response
+from ..utils import custom_response, registry
+from ..utils.response_cache import cached_response, data_scopes, metadata_scopes, station_data_scopes
 from ..error_messages import AUTH_ERROR_MESSAGES
-from ..models import Station, ParameterName, Parameter
+from ..models import Station, ParameterName, Parameter, LatestObservation
 import asyncio
-import pandas as pd
 from datetime import datetime, timedelta
-from django.db.models import Max, Avg
-from ..utils import weather_scraper
+from django.db.models import Max, Avg, F, DateTimeField, ExpressionWrapper
+from django.db.models.functions import TruncHour
 from ..utils.logger import logger
+from ..utils.ingest_hooks import observations_changed
+from ..utils.metrics import SCRAPER_ROWS
 from django.db.models import Q
+from django.db import transaction
 from django.utils.dateparse import parse_datetime
 
 
@@ -56,8 +59,9 @@ class ParameterNameView(APIView):
             401: f"Unauthorized: {AUTH_ERROR_MESSAGES['not_authenticated']}",
         }
     )
+    @cached_response('parameter_names', scopes=metadata_scopes)
     def get(self, request):
-        parameter_names = ParameterName.objects.all()
+        parameter_names = registry.parameter_names.all()
         parameter_names_data = []
         
         for parameter_name in parameter_names:
@@ -184,6 +188,7 @@ class ParametersView(APIView):
             401: "Autentifikatsiya muvaffaqiyatsiz",
         }
     )
+    @cached_response('parameters_all', scopes=data_scopes)
     def get(self, request):
         """
         Get parameters for all stations
@@ -250,7 +255,7 @@ class ParametersView(APIView):
         # If station_number is provided, filter by station
         if station_number:
             try:
-                station = Station.objects.get(number=station_number)
+                station = registry.stations.get(number=station_number)
                 filters &= Q(station=station)
             except Station.DoesNotExist:
                 return custom_response(
@@ -267,7 +272,7 @@ class ParametersView(APIView):
         parameter_names = []
         if param_name_slug:
             try:
-                parameter_name = ParameterName.objects.get(slug=param_name_slug)
+                parameter_name = registry.parameter_names.get(slug=param_name_slug)
                 filters &= Q(parameter_name=parameter_name)
                 parameter_names = [parameter_name]
             except ParameterName.DoesNotExist:
@@ -278,7 +283,7 @@ class ParametersView(APIView):
                 )
         else:
             # Get all parameter names if not specified
-            parameter_names = ParameterName.objects.all()
+            parameter_names = registry.parameter_names.all()
         
         # Get filtered parameters
         parameters = Parameter.objects.filter(filters).select_related('station', 'parameter_name')
@@ -292,8 +297,10 @@ class ParametersView(APIView):
             stations = [station]
         else:
             # Get all unique stations from filtered parameters or all stations if no parameters
-            station_ids = parameters.values_list('station_id', flat=True).distinct()
-            stations = Station.objects.filter(id__in=station_ids) if station_ids.exists() else Station.objects.all()
+            station_ids = set(parameters.values_list('station_id', flat=True).distinct())
+            stations = registry.stations.all()
+            if station_ids:
+                stations = [s for s in stations if s.id in station_ids]
             stations_data = [{
                 'number': s.number,
                 'name': s.name
@@ -423,7 +430,7 @@ class ParametersView(APIView):
         # Filter by parameter name if provided
         if param_name_slug:
             try:
-                parameter_name = ParameterName.objects.get(slug=param_name_slug)
+                parameter_name = registry.parameter_names.get(slug=param_name_slug)
                 filters &= Q(parameter_name=parameter_name)
                 parameter_names = [parameter_name]
             except ParameterName.DoesNotExist:
@@ -434,7 +441,7 @@ class ParametersView(APIView):
                 )
         else:
             # Get all parameter names if not specified
-            parameter_names = ParameterName.objects.all()
+            parameter_names = registry.parameter_names.all()
         
         # Generate a dictionary to hold data grouped by datetime
         parameters_by_datetime = {}
@@ -453,15 +460,26 @@ class ParametersView(APIView):
             # Move to next hour
             current_dt = current_dt + timedelta(hours=1)
         
-        # Calculate averages for each parameter name and each hour
+        # Average of each parameter name and hour in one grouped query; hours are
+        # counted from start_date, so shift by its offset from the full hour
+        hour_offset = start_date - start_date.replace(minute=0, second=0, microsecond=0)
+        hour_expression = F('datetime')
+        if hour_offset:
+            hour_expression = ExpressionWrapper(F('datetime') - hour_offset, output_field=DateTimeField())
+        averages = Parameter.objects.filter(
+            filters, parameter_name__in=parameter_names
+        ).order_by().annotate(hour=TruncHour(hour_expression)).values(
+            'parameter_name_id', 'hour'
+        ).annotate(avg_value=Avg('value'))
+        
+        averages_by_key = {
+            (row['parameter_name_id'], row['hour'] + hour_offset): row['avg_value'] for row in averages
+        }
+        
         for param_name in parameter_names:
-            param_filters = filters & Q(parameter_name=param_name)
-            
-            # Group by hour and calculate average
             current_dt = start_date
             while current_dt <= end_date:
-                hour_filters = param_filters & Q(datetime__gte=current_dt) & Q(datetime__lt=current_dt + timedelta(hours=1))
-                avg_value = Parameter.objects.filter(hour_filters).aggregate(avg_value=Avg('value'))['avg_value']
+                avg_value = averages_by_key.get((param_name.id, current_dt))
                 
                 # Convert datetime from UTC to UTC+5 by adding 5 hours
                 local_dt = current_dt + timedelta(hours=5)
@@ -640,6 +658,7 @@ class StationParametersView(APIView):
             404: "Stansiya topilmadi",
         }
     )
+    @cached_response('parameters_by_station', scopes=station_data_scopes)
     def get(self, request, station_number):
         """
         Get parameters for a specific station
@@ -737,7 +756,7 @@ class StationParametersView(APIView):
         
         # Get station
         try:
-            station = Station.objects.get(number=station_number)
+            station = registry.stations.get(number=station_number)
         except Station.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Stansiya"),
@@ -752,7 +771,7 @@ class StationParametersView(APIView):
         # Add parameter name filter if provided
         if param_name_slug:
             try:
-                parameter_name = ParameterName.objects.get(slug=param_name_slug)
+                parameter_name = registry.parameter_names.get(slug=param_name_slug)
                 filters &= Q(parameter_name=parameter_name)
             except ParameterName.DoesNotExist:
                 return custom_response(
@@ -761,9 +780,14 @@ class StationParametersView(APIView):
                     success=False
                 )
         
-        # Count and delete filtered parameters
-        parameters_count = Parameter.objects.filter(filters).count()
-        Parameter.objects.filter(filters).delete()
+        # Count and delete filtered parameters, updating derived data in the same transaction
+        with transaction.atomic():
+            parameters_count = Parameter.objects.filter(filters).count()
+            Parameter.objects.filter(filters).delete()
+            
+            # Update derived data that depends on the deleted parameters
+            if parameters_count:
+                observations_changed(station, [dt_utc])
         
         # Create response with deletion info
         result = {
@@ -863,7 +887,7 @@ class StationParametersView(APIView):
         
         # Get station
         try:
-            station = Station.objects.get(number=station_number)
+            station = registry.stations.get(number=station_number)
         except Station.DoesNotExist:
             return custom_response(
                 detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Stansiya"),
@@ -885,7 +909,7 @@ class StationParametersView(APIView):
         
         # Get all parameter names to map slug to object
         parameter_names = {}
-        for param_name in ParameterName.objects.all():
+        for param_name in registry.parameter_names.all():
             parameter_names[param_name.slug] = param_name
         
         # Process each item
@@ -969,7 +993,11 @@ class StationParametersView(APIView):
         
         # Bulk create parameters (if any)
         if parameters_to_create:
-            Parameter.objects.bulk_create(parameters_to_create, batch_size=1000, ignore_conflicts=True)
+            with transaction.atomic():
+                Parameter.objects.bulk_create(parameters_to_create, batch_size=1000, ignore_conflicts=True)
+                
+                # Update derived data that depends on the new parameters
+                observations_changed(station, [p.datetime for p in parameters_to_create])
         
         # Prepare response
         result = {
@@ -1062,17 +1090,20 @@ class ParameterScrapeView(APIView):
         3. Processes and stores the data as Parameter objects
         4. Returns a summary of what was processed
         """
+        # Imported here: aiohttp, BeautifulSoup and pandas are only needed for scraping
+        from ..utils import weather_scraper
+
         # Get parameters from request
         station_numbers = request.data.get('station_numbers', [38264, 38141, 38023, 38149, 38146, 38265, 38263, 38262])
         max_concurrent = request.data.get('max_concurrent', 10000)
         
         # If station_numbers is empty, get all stations
         if not station_numbers:
-            stations = Station.objects.all()
+            stations = registry.stations.all()
         else:
-            stations = Station.objects.filter(number__in=station_numbers)
+            stations = list(registry.stations.in_bulk(station_numbers, field='number').values())
         
-        if not stations.exists():
+        if not stations:
             return custom_response(
                 detail="Belgilangan stansiyalar topilmadi",
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1092,7 +1123,7 @@ class ParameterScrapeView(APIView):
                 logger.info(f"Processing station {station.number} ({station.name})")
                 
                 # Find the last parameter datetime for this station (if any)
-                last_parameter = Parameter.objects.filter(station=station).aggregate(Max('datetime'))
+                last_parameter = LatestObservation.objects.filter(station=station).aggregate(Max('datetime'))
                 start_date = last_parameter['datetime__max'] + timedelta(hours=1) if last_parameter['datetime__max'] else None
                 
                 if not start_date:
@@ -1154,6 +1185,8 @@ class ParameterScrapeView(APIView):
         Returns:
             int: Number of parameters added
         """
+        import pandas as pd
+
         parameters_added = 0
         
         if weather_data.empty:
@@ -1177,7 +1210,7 @@ class ParameterScrapeView(APIView):
         parameter_name_objects = {}
         for _, (slug, _) in parameter_mappings.items():
             try:
-                parameter_name_objects[slug] = ParameterName.objects.get(slug=slug)
+                parameter_name_objects[slug] = registry.parameter_names.get(slug=slug)
             except ParameterName.DoesNotExist:
                 logger.error(f"Parameter name does not exist: {slug}")
         
@@ -1277,6 +1310,11 @@ class ParameterScrapeView(APIView):
             Parameter.objects.bulk_create(parameters_to_create, batch_size=1000, ignore_conflicts=True)
             logger.info(f"Created {len(parameters_to_create)} parameters in final bulk create")
         
+        # Update derived data that depends on the new parameters
+        if parameters_added:
+            observations_changed(station, all_datetimes)
+            SCRAPER_ROWS.labels(str(station.number)).inc(parameters_added)
+        
         return parameters_added
     
     def _convert_to_float(self, value):
@@ -0,0 +1,59 @@
+from django.http import FileResponse
+from rest_framework import status, permissions
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from ..utils import custom_response
+from ..utils.profiling import profile_path
+from ..error_messages import AUTH_ERROR_MESSAGES, VALIDATION_ERROR_MESSAGES
+
+PROFILE_FILES = ('profile', 'sql')
+
+
+class ProfileView(APIView):
+    """
+    View for downloading a stored request profile (staff only)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['Profiling'],
+        operation_description=(
+            "X-Profile sarlavhasi yoki _profile parametri bilan profillangan so'rov natijasini yuklab olish. "
+            "file=profile: cProfile (.prof) yoki speedscope JSON; file=sql: so'rov ma'lumotlari va barcha SQL so'rovlari"
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'file',
+                openapi.IN_QUERY,
+                description="File to download: profile (default) or sql",
+                type=openapi.TYPE_STRING,
+                enum=list(PROFILE_FILES),
+                required=False
+            ),
+        ],
+        responses={
+            200: "Profile file",
+            400: f"Noto'g'ri so'rov: {VALIDATION_ERROR_MESSAGES['invalid'].format(field='file')}",
+            401: f"Ruxsat mavjud emas: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+            403: f"Ruxsat mavjud emas: {AUTH_ERROR_MESSAGES['permission_denied']}",
+            404: f"Topilmadi: {AUTH_ERROR_MESSAGES['not_found'].format(item='Profil')}",
+        }
+    )
+    def get(self, request, profile_id):
+        file = request.query_params.get('file', 'profile')
+        if file not in PROFILE_FILES:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field='file'),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        path = profile_path(profile_id, file)
+        if path is None:
+            return custom_response(
+                detail=AUTH_ERROR_MESSAGES['not_found'].format(item='Profil'),
+                status_code=status.HTTP_404_NOT_FOUND,
+                success=False
+            )
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
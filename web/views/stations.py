@@ -2,9 +2,13 @@ from rest_framework import status, permissions
 from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from ..utils import custom_response
+from ..utils import custom_response, registry
+from ..utils.response_cache import cached_response, data_scopes, metadata_scopes
 from ..error_messages import VALIDATION_ERROR_MESSAGES, AUTH_ERROR_MESSAGES, STATION_ERROR_MESSAGES
-from ..models import Station
+from ..models import Station, LatestObservation
+from ..utils.snapshot import snapshot_at, parse_tolerance
+from datetime import timedelta
+from django.utils.dateparse import parse_datetime
 
 
 class StationView(APIView):
@@ -52,8 +56,9 @@ class StationView(APIView):
             401: f"Unauthorized: {AUTH_ERROR_MESSAGES['not_authenticated']}",
         }
     )
+    @cached_response('stations_list', scopes=metadata_scopes)
     def get(self, request):
-        stations = Station.objects.all()
+        stations = registry.stations.all()
         stations_data = []
         
         for station in stations:
@@ -191,6 +196,244 @@ class StationView(APIView):
             )
 
 
+class StationCurrentView(APIView):
+    """
+    View for retrieving current conditions (latest parameter values) for all stations
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @swagger_auto_schema(
+        tags=['Stations'],
+        operation_description="Barcha stansiyalarning joriy holati (har bir parametrning oxirgi qiymati)",
+        responses={
+            200: openapi.Response(
+                description="Joriy holat muvaffaqiyatli olindi",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'result': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'items': openapi.Schema(
+                                    type=openapi.TYPE_ARRAY,
+                                    items=openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            'number': openapi.Schema(type=openapi.TYPE_STRING),
+                                            'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                            'lon': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                            'lat': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                            'parameters': openapi.Schema(
+                                                type=openapi.TYPE_OBJECT,
+                                                additionalProperties=openapi.Schema(
+                                                    type=openapi.TYPE_OBJECT,
+                                                    properties={
+                                                        'value': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                                        'datetime': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME)
+                                                    }
+                                                )
+                                            )
+                                        }
+                                    )
+                                )
+                            }
+                        ),
+                        'detail': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                    }
+                )
+            ),
+            401: f"Unauthorized: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+        }
+    )
+    @cached_response('stations_current', scopes=data_scopes)
+    def get(self, request):
+        # Group latest observations by station
+        current = {}
+        for observation in LatestObservation.objects.select_related('parameter_name'):
+            slug = observation.parameter_name.slug
+            # wind_direction = -1 means calm, reported as null like the parameters endpoint
+            value = None if slug == 'wind_direction' and observation.value == -1 else observation.value
+            current.setdefault(observation.station_id, {})[slug] = {
+                'value': value,
+                'datetime': observation.datetime + timedelta(hours=5)  # Convert to UTC+5
+            }
+        
+        stations_data = []
+        for station in registry.stations.all():
+            stations_data.append({
+                'number': station.number,
+                'name': station.name,
+                'lon': station.lon,
+                'lat': station.lat,
+                'parameters': current.get(station.id, {})
+            })
+        
+        return custom_response(
+            data={
+                'items': stations_data
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+
+class StationSnapshotView(APIView):
+    """
+    View for retrieving the state of all stations at a given time (closest value of each parameter)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @swagger_auto_schema(
+        tags=['Stations'],
+        operation_description="Berilgan vaqtdagi barcha stansiyalar holati (har bir parametrning eng yaqin qiymati)",
+        manual_parameters=[
+            openapi.Parameter(
+                'datetime',
+                openapi.IN_QUERY,
+                description="Vaqt (UTC+5, YYYY-MM-DD HH:MM:SS)",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'parameter_name',
+                openapi.IN_QUERY,
+                description="Parametr nomi (slug); berilmasa barcha parametrlar",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'tolerance',
+                openapi.IN_QUERY,
+                description="Vaqtdan maksimal farq, daqiqada (standart: 60)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Holat muvaffaqiyatli olindi",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'result': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'datetime': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                                'tolerance': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'items': openapi.Schema(
+                                    type=openapi.TYPE_ARRAY,
+                                    items=openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            'number': openapi.Schema(type=openapi.TYPE_STRING),
+                                            'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                            'lon': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                            'lat': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                            'parameters': openapi.Schema(
+                                                type=openapi.TYPE_OBJECT,
+                                                additionalProperties=openapi.Schema(
+                                                    type=openapi.TYPE_OBJECT,
+                                                    properties={
+                                                        'value': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                                        'datetime': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME)
+                                                    }
+                                                )
+                                            )
+                                        }
+                                    )
+                                )
+                            }
+                        ),
+                        'detail': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                    }
+                )
+            ),
+            400: f"Bad Request: {VALIDATION_ERROR_MESSAGES['required']}",
+            401: f"Unauthorized: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+            404: f"Not Found: {AUTH_ERROR_MESSAGES['not_found']}",
+        }
+    )
+    @cached_response('stations_snapshot', scopes=data_scopes)
+    def get(self, request):
+        datetime_str = request.query_params.get('datetime')
+        if not datetime_str:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['required'].format(field="datetime"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        target = parse_datetime(datetime_str)
+        if not target:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="datetime"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        try:
+            tolerance = parse_tolerance(request.query_params.get('tolerance'))
+        except ValueError:
+            return custom_response(
+                detail=VALIDATION_ERROR_MESSAGES['invalid'].format(field="tolerance"),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+        
+        parameter_names = registry.parameter_names.all()
+        parameter_name_slug = request.query_params.get('parameter_name')
+        if parameter_name_slug:
+            parameter_names = [p for p in parameter_names if p.slug == parameter_name_slug]
+            if not parameter_names:
+                return custom_response(
+                    detail=AUTH_ERROR_MESSAGES['not_found'].format(item="Parametr"),
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    success=False
+                )
+        slugs = {parameter_name.id: parameter_name.slug for parameter_name in parameter_names}
+        
+        # Convert from UTC+5 to UTC for database query
+        snapshot = snapshot_at(
+            target - timedelta(hours=5),
+            slugs.keys() if parameter_name_slug else None,
+            tolerance
+        )
+        
+        # Group snapshot values by station
+        values = {}
+        for (station_id, parameter_name_id), (param_datetime, value) in snapshot.items():
+            slug = slugs[parameter_name_id]
+            # wind_direction = -1 means calm, reported as null like the parameters endpoint
+            if slug == 'wind_direction' and value == -1:
+                value = None
+            values.setdefault(station_id, {})[slug] = {
+                'value': value,
+                'datetime': param_datetime + timedelta(hours=5)  # Convert to UTC+5
+            }
+        
+        stations_data = []
+        for station in registry.stations.all():
+            stations_data.append({
+                'number': station.number,
+                'name': station.name,
+                'lon': station.lon,
+                'lat': station.lat,
+                'parameters': values.get(station.id, {})
+            })
+        
+        return custom_response(
+            data={
+                'datetime': target,
+                'tolerance': int(tolerance.total_seconds() // 60),
+                'items': stations_data
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+
 class StationDetailView(APIView):
     """
     View for retrieving and updating an existing station
@@ -243,10 +486,11 @@ class StationDetailView(APIView):
             404: f"Not Found: {STATION_ERROR_MESSAGES['not_found']}"
         }
     )
+    @cached_response('stations_detail', scopes=metadata_scopes)
     def get(self, request, station_number):
         # Check if station exists
         try:
-            station = Station.objects.get(number=station_number)
+            station = registry.stations.get(number=station_number)
         except Station.DoesNotExist:
             return custom_response(
                 detail=STATION_ERROR_MESSAGES['not_found'].format(number=station_number),
@@ -6,13 +6,19 @@ from django.db.models import Avg, Min, Max, StdDev, Count, Q
 from django.utils.dateparse import parse_datetime
 from datetime import datetime, timedelta, timezone
 import numpy as np
-import pandas as pd
-from scipy import stats
 from itertools import combinations
 
-from ..utils import custom_response
+from ..utils import custom_response, registry
+from ..utils.response_cache import cached_response, data_scopes, counters as response_cache_counters
+from ..utils.single_flight import metrics as single_flight_metrics
+from ..utils.stats_cache import cached_stats, counters as stats_cache_counters
+from ..utils.correlation import (
+    CORRELATION_METHODS, RESAMPLE_RULES, build_observation_matrix, correlation_matrix
+)
 from ..error_messages import AUTH_ERROR_MESSAGES
-from ..models import Station, ParameterName, Parameter
+from ..models import Station, ParameterName, Parameter, MonthlyAggregate
+from ..utils.trend import seasonal_mann_kendall
+from ..utils.quantile_sketch import TDigest
 
 
 class StatisticsView(APIView):
@@ -133,7 +139,12 @@ class StatisticsView(APIView):
             404: "Parametr nomi yoki stansiya topilmadi",
         }
     )
+    @cached_stats('stats', options=('parameter_name',))
     def get(self, request):
+        # Imported on first use rather than at URLconf load (slow imports)
+        import pandas as pd
+        from scipy import stats
+
         try:
             # Get query parameters
             param_name_slug = request.query_params.get('parameter_name')
@@ -178,7 +189,7 @@ class StatisticsView(APIView):
             
             # Check if parameter name exists
             try:
-                param_name = ParameterName.objects.get(slug=param_name_slug)
+                param_name = registry.parameter_names.get(slug=param_name_slug)
             except ParameterName.DoesNotExist:
                 return custom_response(
                     detail=f"'{param_name_slug}' parametri topilmadi",
@@ -191,7 +202,7 @@ class StatisticsView(APIView):
             
             # Get station
             try:
-                station = Station.objects.get(number=station_number)
+                station = registry.stations.get(number=station_number)
                 filters &= Q(station=station)
             except Station.DoesNotExist:
                 return custom_response(
@@ -570,6 +581,9 @@ class MonthlyStatsView(APIView):
         }
     )
     def get(self, request):
+        import pandas as pd
+        from scipy import stats
+
         # Get query parameters
         param_name_slug = request.query_params.get('parameter_name')
         year_str = request.query_params.get('year')
@@ -595,7 +609,7 @@ class MonthlyStatsView(APIView):
         
         # Check if parameter name exists
         try:
-            param_name = ParameterName.objects.get(slug=param_name_slug)
+            param_name = registry.parameter_names.get(slug=param_name_slug)
         except ParameterName.DoesNotExist:
             return custom_response(
                 detail=f"'{param_name_slug}' parametri topilmadi",
@@ -614,7 +628,7 @@ class MonthlyStatsView(APIView):
         station = None
         if station_number:
             try:
-                station = Station.objects.get(number=station_number)
+                station = registry.stations.get(number=station_number)
                 filters &= Q(station=station)
             except Station.DoesNotExist:
                 return custom_response(
@@ -710,6 +724,13 @@ class MonthlyStatsView(APIView):
         )
 
 
+def _correlation_station(params):
+    """Cross-station correlation depends on all stations"""
+    if params.get('mode', 'parameters').lower() == 'stations':
+        return None
+    return params.get('station_number')
+
+
 class CorrelationView(APIView):
     """
     View for calculating correlation between parameters
@@ -730,9 +751,33 @@ class CorrelationView(APIView):
             openapi.Parameter(
                 'station_number',
                 openapi.IN_QUERY,
-                description="Stansiya raqami",
+                description="Stansiya raqami (mode=parameters uchun talab qilinadi)",
                 type=openapi.TYPE_STRING,
-                required=True
+                required=False
+            ),
+            openapi.Parameter(
+                'mode',
+                openapi.IN_QUERY,
+                description="Korrelyatsiya rejimi: parameters (stansiya parametrlari orasida) yoki stations (bitta parametr bo'yicha stansiyalar orasida)",
+                type=openapi.TYPE_STRING,
+                enum=['parameters', 'stations'],
+                default='parameters',
+                required=False
+            ),
+            openapi.Parameter(
+                'parameter_name',
+                openapi.IN_QUERY,
+                description="Parametr nomi (mode=stations uchun talab qilinadi)",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'resample',
+                openapi.IN_QUERY,
+                description="Vaqt belgilarini tekislash: hour yoki day (ixtiyoriy)",
+                type=openapi.TYPE_STRING,
+                enum=['hour', 'day'],
+                required=False
             ),
             # openapi.Parameter(
             #     'correlation_type',
@@ -785,21 +830,45 @@ class CorrelationView(APIView):
             404: "Parametr nomlari yoki stansiya topilmadi",
         }
     )
+    @cached_stats(
+        'correlation',
+        options=('parameter_name', 'correlation_type', 'mode', 'resample'),
+        station=_correlation_station
+    )
     def get(self, request):
         try:
             # Get query parameters
             year_str = request.query_params.get('year')
             station_number = request.query_params.get('station_number')
+            param_name_slug = request.query_params.get('parameter_name')
             correlation_type = request.query_params.get('correlation_type', 'pearson').lower()
+            mode = request.query_params.get('mode', 'parameters').lower()
+            resample = request.query_params.get('resample')
             
             # Validate correlation type
-            if correlation_type not in ['pearson', 'spearman', 'kendall']:
+            if correlation_type not in CORRELATION_METHODS:
                 return custom_response(
                     detail="correlation_type 'pearson', 'spearman', yoki 'kendall' bo'lishi kerak",
                     status_code=status.HTTP_400_BAD_REQUEST,
                     success=False
                 )
             
+            # Validate mode
+            if mode not in ['parameters', 'stations']:
+                return custom_response(
+                    detail="mode 'parameters' yoki 'stations' bo'lishi kerak",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    success=False
+                )
+            
+            # Validate resample
+            if resample and resample not in RESAMPLE_RULES:
+                return custom_response(
+                    detail="resample 'hour' yoki 'day' bo'lishi kerak",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    success=False
+                )
+            
             # Validate year parameter
             if not year_str:
                 return custom_response(
@@ -808,13 +877,19 @@ class CorrelationView(APIView):
                     success=False
                 )
                 
-            # Validate station_number parameter
-            if not station_number:
+            # Validate station_number / parameter_name depending on mode
+            if mode == 'parameters' and not station_number:
                 return custom_response(
                     detail="station_number parametri talab qilinadi",
                     status_code=status.HTTP_400_BAD_REQUEST,
                     success=False
                 )
+            if mode == 'stations' and not param_name_slug:
+                return custom_response(
+                    detail="parameter_name parametri talab qilinadi",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    success=False
+                )
             
             # Parse year parameter
             try:
@@ -828,144 +903,100 @@ class CorrelationView(APIView):
                     success=False
                 )
             
-            # Get station
-            try:
-                station = Station.objects.get(number=station_number)
-            except Station.DoesNotExist:
-                return custom_response(
-                    detail=f"'{station_number}' stansiyasi topilmadi",
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    success=False
-                )
-            
-            # Get all parameter names with data
-            param_data = {}
-            param_names = []
-            
-            # Get all parameter names for this station in the time range
-            parameter_names = ParameterName.objects.filter(
-                parameters__station=station,
-                parameters__datetime__gte=start_date,
-                parameters__datetime__lte=end_date
-            ).distinct()
-            
-            # Check if we have enough parameters for correlation
-            if parameter_names.count() < 2:
-                return custom_response(
-                    detail="Korrelyatsiyani hisoblash uchun kamida ikkita parametr kerak",
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    success=False
-                )
-            
-            # Get all parameters with their names as a single query
-            all_parameters = Parameter.objects.filter(
-                station=station,
-                datetime__gte=start_date,
-                datetime__lte=end_date
-            ).select_related('parameter_name').values(
-                'parameter_name__id', 
-                'parameter_name__name',
-                'parameter_name__slug',
-                'datetime', 
-                'value'
-            )
-            
-            # Group data by parameter
-            for param in all_parameters:
-                param_id = param['parameter_name__id']
-                param_name = param['parameter_name__name']
-                param_slug = param['parameter_name__slug']
+            if mode == 'stations':
+                # Cross-station mode: one parameter across all stations
+                try:
+                    param_name = registry.parameter_names.get(slug=param_name_slug)
+                except ParameterName.DoesNotExist:
+                    return custom_response(
+                        detail=f"'{param_name_slug}' parametri topilmadi",
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        success=False
+                    )
                 
-                if param_id not in param_data:
-                    param_data[param_id] = {
-                        'name': param_name,
-                        'slug': param_slug,
-                        'data': []
-                    }
-                    param_names.append(param_name)
+                rows = Parameter.objects.filter(
+                    parameter_name=param_name,
+                    datetime__gte=start_date,
+                    datetime__lte=end_date
+                ).values_list('datetime', 'station__number', 'value')
+                not_enough_detail = "Korrelyatsiyani hisoblash uchun kamida ikkita stansiya kerak"
+            else:
+                # Get station
+                try:
+                    station = registry.stations.get(number=station_number)
+                except Station.DoesNotExist:
+                    return custom_response(
+                        detail=f"'{station_number}' stansiyasi topilmadi",
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        success=False
+                    )
                 
-                param_data[param_id]['data'].append({
-                    'datetime': param['datetime'],
-                    'value': param['value']
-                })
-            
-            # Convert to pandas DataFrames for efficient correlation calculation
-            dfs = {}
-            param_map = {}  # Map to store slug:name pairs
-            
-            for param_id, data in param_data.items():
-                df = pd.DataFrame(data['data'])
-                if len(df) > 1:  # Only include parameters with multiple data points
-                    dfs[data['slug']] = df.set_index('datetime')
-                    param_map[data['slug']] = data['name']
-            
-            # Check again if we have enough parameters
-            if len(dfs) < 2:
+                rows = Parameter.objects.filter(
+                    station=station,
+                    datetime__gte=start_date,
+                    datetime__lte=end_date
+                ).values_list('datetime', 'parameter_name__slug', 'value')
+                not_enough_detail = "Korrelyatsiyani hisoblash uchun kamida ikkita parametr kerak"
+            
+            # Pivot observations once into a datetime x column matrix
+            matrix = build_observation_matrix(rows.order_by(), resample=resample)
+            
+            # Check if we have enough columns for correlation
+            if len(matrix.columns) < 2:
                 return custom_response(
-                    detail="Korrelyatsiyani hisoblash uchun kamida ikkita parametr kerak",
+                    detail=not_enough_detail,
                     status_code=status.HTTP_404_NOT_FOUND,
                     success=False
                 )
             
-            # Create a list of parameter slugs based on available dataframes
-            param_slugs = list(dfs.keys())
-            
-            # Initialize correlation dict to store results
-            correlation_result = []
-            
-            # Calculate correlations between pairs
-            for param1 in param_slugs:
-                param_result = {'parameter_name': param_map[param1]}
-                
-                # Self-correlation is always 1
-                param_result[param1] = 1.0
+            # Compute the full matrix in one call with pairwise-complete observations
+            correlations = correlation_matrix(matrix, method=correlation_type)
+            
+            if mode == 'stations':
+                station_map = {
+                    number: station.name
+                    for number, station in registry.stations.in_bulk(correlations.keys(), field='number').items()
+                }
+                correlation_result = []
+                for number, row in correlations.items():
+                    item = {'station_name': station_map.get(number)}
+                    item.update({str(other): value for other, value in row.items()})
+                    correlation_result.append(item)
                 
-                for param2 in param_slugs:
-                    if param1 == param2:
-                        continue
-                    
-                    # Merge the dataframes on datetime index
-                    merged = pd.merge(
-                        dfs[param1][['value']], 
-                        dfs[param2][['value']], 
-                        left_index=True,  
-                        right_index=True,
-                        suffixes=('_1', '_2')
-                    )
-                    
-                    # Only calculate if we have enough matching data points
-                    if len(merged) >= 2:
-                        try:
-                            if correlation_type == 'pearson':
-                                corr = merged['value_1'].corr(merged['value_2'], method='pearson')
-                            elif correlation_type == 'spearman':
-                                corr = merged['value_1'].corr(merged['value_2'], method='spearman')
-                            elif correlation_type == 'kendall':
-                                corr = merged['value_1'].corr(merged['value_2'], method='kendall')
-                            
-                            # Round to 2 decimal places
-                            if not pd.isna(corr):
-                                param_result[param2] = round(float(corr), 2)
-                            else:
-                                param_result[param2] = 0
-                        except:
-                            param_result[param2] = 0
-                    else:
-                        param_result[param2] = 0
+                result = {
+                    'year': year,
+                    'parameter': {
+                        'name': param_name.name,
+                        'slug': param_name.slug,
+                        'unit': param_name.unit
+                    },
+                    'correlation_type': correlation_type,
+                    'resample': resample,
+                    'stations': {str(number): station_map.get(number) for number in correlations},
+                    'items': correlation_result
+                }
+            else:
+                param_map = {
+                    slug: parameter_name.name
+                    for slug, parameter_name in registry.parameter_names.in_bulk(correlations.keys(), field='slug').items()
+                }
+                correlation_result = []
+                for slug, row in correlations.items():
+                    item = {'parameter_name': param_map.get(slug)}
+                    item.update(row)
+                    correlation_result.append(item)
                 
-                correlation_result.append(param_result)
-            
-            # Prepare response
-            result = {
-                'year': year,
-                'station': {
-                    'number': str(station.number),
-                    'name': station.name
-                },
-                'correlation_type': correlation_type,
-                'parameters': param_map,
-                'items': correlation_result
-            }
+                result = {
+                    'year': year,
+                    'station': {
+                        'number': str(station.number),
+                        'name': station.name
+                    },
+                    'correlation_type': correlation_type,
+                    'resample': resample,
+                    'parameters': {slug: param_map.get(slug) for slug in correlations},
+                    'items': correlation_result
+                }
             
             return custom_response(
                 data=result,
@@ -1050,7 +1081,12 @@ class ModeStatsView(APIView):
             404: "Parametr nomi yoki stansiya topilmadi",
         }
     )
+    @cached_stats('mode', options=('parameter_name',))
     def get(self, request):
+        # Imported on first use rather than at URLconf load (slow imports)
+        import pandas as pd
+        from scipy import stats
+
         try:
             # Get query parameters
             param_name_slug = request.query_params.get('parameter_name')
@@ -1095,7 +1131,7 @@ class ModeStatsView(APIView):
             
             # Check if parameter name exists
             try:
-                param_name = ParameterName.objects.get(slug=param_name_slug)
+                param_name = registry.parameter_names.get(slug=param_name_slug)
             except ParameterName.DoesNotExist:
                 return custom_response(
                     detail=f"'{param_name_slug}' parametri topilmadi",
@@ -1108,7 +1144,7 @@ class ModeStatsView(APIView):
             
             # Get station
             try:
-                station = Station.objects.get(number=station_number)
+                station = registry.stations.get(number=station_number)
                 filters &= Q(station=station)
             except Station.DoesNotExist:
                 return custom_response(
@@ -1204,3 +1240,476 @@ class ModeStatsView(APIView):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 success=False
             )
+
+
+class TrendView(APIView):
+    """
+    View for multi-year trend analysis on monthly aggregates
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Statistics'],
+        operation_description="Oylik o'rtacha qiymatlar bo'yicha ko'p yillik trend (mavsumiy Mann-Kendall testi va Sen qiyaligi)",
+        manual_parameters=[
+            openapi.Parameter(
+                'parameter_name',
+                openapi.IN_QUERY,
+                description="Parametr nomi",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'station_number',
+                openapi.IN_QUERY,
+                description="Stansiya raqami yoki vergul bilan ajratilgan raqamlar (ko'rsatilmasa barcha stansiyalar)",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'start_year',
+                openapi.IN_QUERY,
+                description="Boshlang'ich yil (ixtiyoriy)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'end_year',
+                openapi.IN_QUERY,
+                description="Oxirgi yil (ixtiyoriy)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'min_count',
+                openapi.IN_QUERY,
+                description="Oylik o'rtacha hisobga olinishi uchun minimal o'lchovlar soni",
+                type=openapi.TYPE_INTEGER,
+                default=1,
+                required=False
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Trend muvaffaqiyatli hisoblandi",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'result': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'parameter': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'slug': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'unit': openapi.Schema(type=openapi.TYPE_STRING)
+                                    }
+                                ),
+                                'items': openapi.Schema(
+                                    type=openapi.TYPE_ARRAY,
+                                    items=openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            'station': openapi.Schema(
+                                                type=openapi.TYPE_OBJECT,
+                                                properties={
+                                                    'number': openapi.Schema(type=openapi.TYPE_STRING),
+                                                    'name': openapi.Schema(type=openapi.TYPE_STRING)
+                                                }
+                                            ),
+                                            'start_year': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                            'end_year': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                            'months': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                            'trend': openapi.Schema(type=openapi.TYPE_STRING),
+                                            'tau': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                            'z': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                            'p_value': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                            'significant': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                            'slope_per_year': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                            'slope_per_decade': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True)
+                                        }
+                                    )
+                                )
+                            }
+                        ),
+                        'detail': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                    }
+                )
+            ),
+            400: "So'rov parametrlari noto'g'ri",
+            401: f"Ruxsat mavjud emas: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+            404: "Parametr nomi yoki stansiya topilmadi",
+        }
+    )
+    @cached_response('trend', scopes=data_scopes, coalesce=True)
+    def get(self, request):
+        param_name_slug = request.query_params.get('parameter_name')
+        station_numbers_str = request.query_params.get('station_number')
+
+        # Validate parameter_name
+        if not param_name_slug:
+            return custom_response(
+                detail="parameter_name parametri talab qilinadi",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        # Parse optional integer parameters
+        try:
+            start_year = int(request.query_params['start_year']) if request.query_params.get('start_year') else None
+            end_year = int(request.query_params['end_year']) if request.query_params.get('end_year') else None
+            min_count = int(request.query_params.get('min_count', 1))
+        except ValueError:
+            return custom_response(
+                detail="start_year, end_year va min_count butun son bo'lishi kerak",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        # Check if parameter name exists
+        try:
+            param_name = registry.parameter_names.get(slug=param_name_slug)
+        except ParameterName.DoesNotExist:
+            return custom_response(
+                detail=f"'{param_name_slug}' parametri topilmadi",
+                status_code=status.HTTP_404_NOT_FOUND,
+                success=False
+            )
+
+        # Resolve stations
+        stations = sorted(registry.stations.all(), key=lambda station: station.number)
+        if station_numbers_str:
+            try:
+                station_numbers = [int(n) for n in station_numbers_str.split(',') if n.strip()]
+            except ValueError:
+                return custom_response(
+                    detail="station_number butun son yoki vergul bilan ajratilgan sonlar bo'lishi kerak",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    success=False
+                )
+            stations = [station for station in stations if station.number in station_numbers]
+            if not stations:
+                return custom_response(
+                    detail=f"'{station_numbers_str}' stansiyasi topilmadi",
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    success=False
+                )
+        stations = {station.id: station for station in stations}
+
+        # Read monthly means of all requested stations in one query
+        filters = Q(parameter_name=param_name, station_id__in=list(stations.keys()), count__gte=max(min_count, 1))
+        if start_year:
+            filters &= Q(year__gte=start_year)
+        if end_year:
+            filters &= Q(year__lte=end_year)
+
+        rows = MonthlyAggregate.objects.filter(filters).order_by('station_id', 'year', 'month').values_list(
+            'station_id', 'year', 'month', 'count', 'total'
+        )
+
+        monthly = {}
+        for station_id, year, month, count, total in rows:
+            monthly.setdefault(station_id, []).append((year, month, total / count))
+
+        items = []
+        for station_id, station in stations.items():
+            series = np.array(monthly.get(station_id, []), dtype=float).reshape(-1, 3)
+            result = seasonal_mann_kendall(series[:, 0], series[:, 1], series[:, 2]) if len(series) else None
+
+            item = {
+                'station': {
+                    'number': str(station.number),
+                    'name': station.name
+                },
+                'start_year': int(series[:, 0].min()) if len(series) else None,
+                'end_year': int(series[:, 0].max()) if len(series) else None,
+                'months': len(series),
+            }
+
+            if result is None:
+                item.update({
+                    'trend': "Stabil",
+                    'tau': None,
+                    'z': None,
+                    'p_value': None,
+                    'significant': False,
+                    'slope_per_year': None,
+                    'slope_per_decade': None
+                })
+            else:
+                if not result['significant']:
+                    trend_direction = "Stabil"
+                elif result['slope'] > 0 or (result['slope'] == 0 and result['s'] > 0):
+                    trend_direction = "O'sayotgan ↑"
+                else:
+                    trend_direction = "Pasayuvchi ↓"
+
+                item.update({
+                    'trend': trend_direction,
+                    'tau': round(result['tau'], 4),
+                    'z': round(result['z'], 4),
+                    'p_value': round(result['p_value'], 6),
+                    'significant': bool(result['significant']),
+                    'slope_per_year': round(result['slope'], 4),
+                    'slope_per_decade': round(result['slope'] * 10, 4)
+                })
+
+            items.append(item)
+
+        return custom_response(
+            data={
+                'parameter': {
+                    'name': param_name.name,
+                    'slug': param_name.slug,
+                    'unit': param_name.unit
+                },
+                'items': items
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+
+class PercentileView(APIView):
+    """
+    View for quantiles over arbitrary month ranges and station sets, answered by merging monthly sketches
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Statistics'],
+        operation_description="Oylar oralig'i va stansiyalar to'plami uchun persentillar (oylik t-digest eskizlarini birlashtirish orqali)",
+        manual_parameters=[
+            openapi.Parameter(
+                'parameter_name',
+                openapi.IN_QUERY,
+                description="Parametr nomi",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'start',
+                openapi.IN_QUERY,
+                description="Boshlang'ich oy (YYYY-MM, UTC+5)",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'end',
+                openapi.IN_QUERY,
+                description="Oxirgi oy (YYYY-MM, UTC+5, oraliqqa kiradi)",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'station_number',
+                openapi.IN_QUERY,
+                description="Stansiya raqami yoki vergul bilan ajratilgan raqamlar (ko'rsatilmasa barcha stansiyalar)",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'percentiles',
+                openapi.IN_QUERY,
+                description="Vergul bilan ajratilgan persentillar (0-100)",
+                type=openapi.TYPE_STRING,
+                default='5,50,95',
+                required=False
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Persentillar muvaffaqiyatli hisoblandi",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'result': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'parameter': openapi.Schema(type=openapi.TYPE_OBJECT),
+                                'stations': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING)),
+                                'start': openapi.Schema(type=openapi.TYPE_STRING),
+                                'end': openapi.Schema(type=openapi.TYPE_STRING),
+                                'months': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'min': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                'max': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                'percentiles': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    additionalProperties=openapi.Schema(type=openapi.TYPE_NUMBER)
+                                )
+                            }
+                        ),
+                        'detail': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                    }
+                )
+            ),
+            400: "So'rov parametrlari noto'g'ri",
+            401: f"Ruxsat mavjud emas: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+            404: "Parametr nomi, stansiya yoki ma'lumotlar topilmadi",
+        }
+    )
+    @cached_response('percentile', scopes=data_scopes, coalesce=True)
+    def get(self, request):
+        param_name_slug = request.query_params.get('parameter_name')
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+        station_numbers_str = request.query_params.get('station_number')
+        percentiles_str = request.query_params.get('percentiles', '5,50,95')
+
+        # Validate required parameters
+        if not param_name_slug or not start_str or not end_str:
+            return custom_response(
+                detail="parameter_name, start va end parametrlari talab qilinadi",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        # Parse month range
+        try:
+            start = datetime.strptime(start_str, '%Y-%m')
+            end = datetime.strptime(end_str, '%Y-%m')
+        except ValueError:
+            return custom_response(
+                detail="start va end 'YYYY-MM' formatida bo'lishi kerak",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        # Parse percentiles
+        try:
+            percentiles = [float(p) for p in percentiles_str.split(',') if p.strip()]
+            if not percentiles or any(p < 0 or p > 100 for p in percentiles):
+                raise ValueError
+        except ValueError:
+            return custom_response(
+                detail="percentiles 0 va 100 orasidagi sonlar bo'lishi kerak",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                success=False
+            )
+
+        # Check if parameter name exists
+        try:
+            param_name = registry.parameter_names.get(slug=param_name_slug)
+        except ParameterName.DoesNotExist:
+            return custom_response(
+                detail=f"'{param_name_slug}' parametri topilmadi",
+                status_code=status.HTTP_404_NOT_FOUND,
+                success=False
+            )
+
+        filters = Q(parameter_name=param_name, sketch__isnull=False)
+        filters &= Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month)
+        filters &= Q(year__lt=end.year) | Q(year=end.year, month__lte=end.month)
+
+        # Filter by stations if provided
+        if station_numbers_str:
+            try:
+                station_numbers = [int(n) for n in station_numbers_str.split(',') if n.strip()]
+            except ValueError:
+                return custom_response(
+                    detail="station_number butun son yoki vergul bilan ajratilgan sonlar bo'lishi kerak",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    success=False
+                )
+            filters &= Q(station__number__in=station_numbers)
+
+        # Merge the monthly sketches instead of scanning raw parameters
+        rows = list(MonthlyAggregate.objects.filter(filters).values_list('station__number', 'year', 'month', 'sketch'))
+        if not rows:
+            return custom_response(
+                detail="Berilgan parametrlar va vaqt davri uchun ma'lumotlar topilmadi",
+                status_code=status.HTTP_404_NOT_FOUND,
+                success=False
+            )
+
+        digest = TDigest.merge([TDigest.from_bytes(sketch) for *_, sketch in rows])
+
+        return custom_response(
+            data={
+                'parameter': {
+                    'name': param_name.name,
+                    'slug': param_name.slug,
+                    'unit': param_name.unit
+                },
+                'stations': sorted({str(number) for number, *_ in rows}),
+                'start': start_str,
+                'end': end_str,
+                # Distinct months with data (rows are per station and month)
+                'months': len({(year, month) for _, year, month, _ in rows}),
+                'count': int(digest.count),
+                'min': digest.minimum,
+                'max': digest.maximum,
+                'percentiles': {
+                    f"p{p:g}": round(digest.quantile(p / 100), 2) for p in percentiles
+                }
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+
+class StatsCacheView(APIView):
+    """
+    View for retrieving the statistics result cache hit/miss rate
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Statistics'],
+        operation_description="Statistika natijalari keshining hit/miss ko'rsatkichlari (joriy jarayon uchun)",
+        responses={
+            200: openapi.Response(
+                description="Kesh ko'rsatkichlari muvaffaqiyatli olindi",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'result': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'hits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'misses': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'hit_rate': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True),
+                                'response_cache': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    description="Read endpoint response cache",
+                                    properties={
+                                        'hits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'misses': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'hit_rate': openapi.Schema(type=openapi.TYPE_NUMBER, nullable=True)
+                                    }
+                                ),
+                                'single_flight': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    description="Coalescing of identical concurrent requests",
+                                    properties={
+                                        'computed': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'coalesced': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'remote_waits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'fallbacks': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'wait_seconds': openapi.Schema(type=openapi.TYPE_NUMBER)
+                                    }
+                                )
+                            }
+                        ),
+                        'detail': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                    }
+                )
+            ),
+            401: f"Ruxsat mavjud emas: {AUTH_ERROR_MESSAGES['not_authenticated']}",
+        }
+    )
+    def get(self, request):
+        return custom_response(
+            data={
+                **stats_cache_counters.as_dict(),
+                'response_cache': response_cache_counters.as_dict(),
+                'single_flight': single_flight_metrics.as_dict()
+            },
+            status_code=status.HTTP_200_OK
+        )